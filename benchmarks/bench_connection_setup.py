@@ -0,0 +1,134 @@
+"""Data connection setup latency: trickle ICE, full gathering, multiplexing.
+
+Connects two in-process Peers over real aiortc peer connections on the local
+host; an in-memory relay stands in for the signaling server. For each mode it
+reports the median time until both ends are open, and the negotiator stage
+timings of the connecting side (ms since start_connection). The multiplexed
+run then opens every further connection to the same peer as a new channel on
+the first one's peer connection, and the pre-warmed run takes connections
+from a pool of one idle connection.
+
+    python benchmarks/bench_connection_setup.py [connections]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from peerjs_py.enums import PeerEventType  # noqa: E402
+from peerjs_py.logger import LogLevel, logger  # noqa: E402
+from peerjs_py.peer import Peer  # noqa: E402
+
+STAGES = ("local_description", "gathered", "sdp_sent", "remote_description", "connected")
+
+
+class Relay:
+    """Delivers signaling messages between peers like the PeerServer would."""
+
+    def __init__(self, peer):
+        self.peer = peer
+        self.peers = {}
+
+    async def send(self, message):
+        destination = self.peers[message["dst"]]
+        # Round-trip through JSON, as over the websocket.
+        codec = self.peer._json_codec
+        destination._dispatcher.dispatch(codec.loads(codec.dumps({**message, "src": self.peer._id})))
+
+    async def close(self):
+        pass
+
+    async def _cleanup(self):
+        pass
+
+
+def make_peers(trickle):
+    peers = {}
+    for peer_id in ("left", "right"):
+        peer = Peer(peer_id, {"trickle_ice": trickle, "config": None})
+        peer._socket = Relay(peer)
+        peer._socket.peers = peers
+        peer._open = True
+        peers[peer_id] = peer
+    return peers["left"], peers["right"]
+
+
+async def connect_once(left, right):
+    accepted = asyncio.get_running_loop().create_future()
+    right.once(PeerEventType.Connection.value, lambda connection: accepted.set_result(connection))
+    start = time.perf_counter()
+    connection = await left.connect("right", {"serialization": "raw"})
+    await asyncio.wait_for(asyncio.gather(connection.open_future, accepted), 30)
+    elapsed = time.perf_counter() - start
+    timings = dict(connection._negotiator.timings)
+    await connection.close()
+    return elapsed, timings
+
+
+async def run(trickle, count):
+    left, right = make_peers(trickle)
+    results = [await connect_once(left, right) for _ in range(count)]
+    await left.destroy()
+    await right.destroy()
+    return results
+
+
+async def run_multiplexed(count):
+    left, right = make_peers(True)
+    results = []
+    for _ in range(count):
+        accepted = asyncio.get_running_loop().create_future()
+        right.once(PeerEventType.Connection.value, lambda connection: accepted.set_result(connection))
+        start = time.perf_counter()
+        connection = await left.connect("right", {"serialization": "raw", "multiplex": True})
+        await asyncio.wait_for(asyncio.gather(connection.open_future, accepted), 30)
+        results.append(time.perf_counter() - start)
+    await left.destroy()
+    await right.destroy()
+    return results
+
+
+async def run_prewarmed(count):
+    left, right = make_peers(True)
+    left.prewarm("right", size=1, serialization="raw")
+    left._pool.start()
+    results = []
+    for _ in range(count):
+        while not left.pool_stats["idle"]:
+            await asyncio.sleep(0.005)
+        start = time.perf_counter()
+        connection = await left.connect("right", {"serialization": "raw"})
+        await connection.open_future
+        results.append(time.perf_counter() - start)
+    stats = left.pool_stats
+    await left.destroy()
+    await right.destroy()
+    return results, stats
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    logger.set_log_level(LogLevel.All if os.environ.get("BENCH_DEBUG") else LogLevel.Disabled)
+    for label, trickle in (("trickle", True), ("full gather", False)):
+        results = asyncio.run(run(trickle, count))
+        setup = statistics.median(elapsed for elapsed, _ in results) * 1000
+        stages = "  ".join(
+            f"{stage} {statistics.median(t[stage] for _, t in results if stage in t):6.1f}"
+            for stage in STAGES if any(stage in t for _, t in results)
+        )
+        print(f"{label:<12} open after {setup:7.1f} ms   {stages}")
+
+    results = asyncio.run(run_multiplexed(count))
+    print(f"{'multiplexed':<12} first open after {results[0] * 1000:7.1f} ms, "
+          f"further channels {statistics.median(results[1:]) * 1000:6.2f} ms (median of {len(results) - 1})")
+
+    results, stats = asyncio.run(run_prewarmed(count))
+    print(f"{'pre-warmed':<12} connect() returned open after {statistics.median(results) * 1000:6.3f} ms   "
+          f"hits {stats['hits']} misses {stats['misses']}")
+
+
+if __name__ == '__main__':
+    main()
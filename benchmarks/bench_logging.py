@@ -0,0 +1,122 @@
+"""Logging overhead on the data-message path.
+
+Sends messages between two Raw connections over an in-memory data channel
+and counts how often the payload is turned into a string and how many log
+records are created, first with logging disabled and then with full logging
+and trace points on.
+
+    python benchmarks/bench_logging.py
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pyee.asyncio import AsyncIOEventEmitter  # noqa: E402
+
+import peerjs_py.dataconnection.DataConnection as data_connection_module  # noqa: E402
+from peerjs_py.dataconnection.BufferedConnection.Raw import Raw  # noqa: E402
+from peerjs_py.logger import LogLevel, logger  # noqa: E402
+
+MESSAGES = 20000
+
+
+class Probe(bytes):
+    """Payload that counts every conversion to text."""
+
+    formatted = 0
+
+    def __str__(self):
+        Probe.formatted += 1
+        return bytes.__repr__(self)
+
+    __repr__ = __str__
+
+    def __format__(self, spec):
+        Probe.formatted += 1
+        return bytes.__repr__(self)
+
+
+class LoopbackChannel(AsyncIOEventEmitter):
+    readyState = "open"
+    bufferedAmount = 0
+    bufferedAmountLowThreshold = 0
+
+    def __init__(self):
+        super().__init__()
+        self.remote = None
+
+    def send(self, data):
+        self.remote.emit("message", data)
+
+
+class RecordCounter(logging.Filter):
+    """Counts and formats records like a handler would, without printing them."""
+
+    records = 0
+
+    def filter(self, record):
+        RecordCounter.records += 1
+        record.getMessage()
+        return False
+
+
+async def connected_pair():
+    provider = Mock(_id="local")
+    left, right = Raw("right", provider, {}), Raw("left", provider, {})
+    left_channel, right_channel = LoopbackChannel(), LoopbackChannel()
+    left_channel.remote, right_channel.remote = right_channel, left_channel
+    await left._initialize_data_channel(left_channel)
+    await right._initialize_data_channel(right_channel)
+    left._open = right._open = True
+    return left, right
+
+
+async def round_trips(count):
+    left, right = await connected_pair()
+    done = asyncio.Event()
+    received = 0
+
+    def on_data(_data):
+        nonlocal received
+        received += 1
+        if received == count:
+            done.set()
+
+    right.on("data", on_data)
+    payload = Probe(b"x" * 64)
+    start = time.perf_counter()
+    for _ in range(count):
+        await left.send(payload)
+    await done.wait()
+    return time.perf_counter() - start
+
+
+def run(label):
+    Probe.formatted = 0
+    RecordCounter.records = 0
+    elapsed = asyncio.run(round_trips(MESSAGES))
+    print(f"{label:<28} {elapsed / MESSAGES * 1e6:7.2f} us/message  "
+          f"payload formatted {Probe.formatted:>6}x  log records {RecordCounter.records:>6}")
+
+
+def main():
+    logger.addFilter(RecordCounter())
+
+    logger.set_log_level(LogLevel.Disabled)
+    run("logging disabled")
+
+    logger.set_log_level(LogLevel.All)
+    data_connection_module.TRACE = True
+    run("debug logging + trace")
+
+    data_connection_module.TRACE_SAMPLE = 100
+    run("debug logging + trace 1/100")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Startup time of many ID-less peers: one by one vs. start_peers().
+
+Runs a local stand-in for the PeerServer (ID endpoint and WebSocket OPEN
+handshake) that answers every request after a fixed delay, to model the
+round trip to a remote server, and starts the peers against it three ways:
+sequentially, each fetching its own ID; with start_peers() and IDs reserved
+from the server; and with start_peers() and locally generated IDs.
+
+    python benchmarks/bench_peer_startup.py [peers] [latency_ms] [concurrency]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from peerjs_py.enums import PeerEventType  # noqa: E402
+from peerjs_py.logger import LogLevel, logger  # noqa: E402
+from peerjs_py.peer import Peer  # noqa: E402
+from peerjs_py.peer_startup import start_peers  # noqa: E402
+
+
+async def serve(latency):
+    issued = 0
+
+    async def handle_id(request):
+        nonlocal issued
+        await asyncio.sleep(latency)
+        issued += 1
+        return web.Response(text=f"peer{issued}")
+
+    async def handle_socket(request):
+        await asyncio.sleep(latency)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"type": "OPEN"}))
+        async for _ in ws:
+            pass
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/peerjs/id", handle_id)
+    app.router.add_get("/peerjs", handle_socket)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner, {"host": "127.0.0.1", "port": runner.addresses[0][1], "secure": False}
+
+
+async def start_sequentially(count, options):
+    peers = []
+    for _ in range(count):
+        peer = Peer(None, dict(options))
+        opened = asyncio.get_running_loop().create_future()
+        peer.once(PeerEventType.Open.value, lambda _id, opened=opened: opened.set_result(None))
+        await peer.start()
+        await asyncio.wait_for(opened, 10)
+        peers.append(peer)
+    return peers
+
+
+async def measure(label, count, latency, start):
+    runner, options = await serve(latency)
+    began = time.perf_counter()
+    peers = await start(count, options)
+    elapsed = time.perf_counter() - began
+    opened = sum(1 for peer in peers if peer.open)
+    print(f"{label:<26} {opened:4d}/{count} open in {elapsed:7.2f} s")
+    for peer in peers:
+        await peer.destroy()
+    await runner.shutdown()
+    await runner.cleanup()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    logger.set_log_level(LogLevel.All if os.environ.get("BENCH_DEBUG") else LogLevel.Disabled)
+    print(f"{count} peers, {latency * 1000:.0f} ms per server round trip, concurrency {concurrency}")
+    asyncio.run(measure("sequential", count, latency, start_sequentially))
+    asyncio.run(measure("start_peers, server IDs", count, latency,
+                        lambda n, options: start_peers(n, options, concurrency=concurrency)))
+    asyncio.run(measure("start_peers, local IDs", count, latency,
+                        lambda n, options: start_peers(n, options, concurrency=concurrency, local_ids=True)))
+
+
+if __name__ == '__main__':
+    main()
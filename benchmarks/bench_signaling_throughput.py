@@ -0,0 +1,103 @@
+"""Signaling messages per second through Socket.send().
+
+Starts a local aiohttp WebSocket server standing in for the PeerServer, in
+its own process, which counts the frames it receives, and sends a burst of
+CANDIDATE messages to a handful of destinations. "direct" awaits one send_str() per
+message, as Socket.send() used to; "queued" goes through Socket.send() and
+its single writer task. Both finish when the server has received every
+message.
+
+    python benchmarks/bench_signaling_throughput.py [messages]
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from peerjs_py.enums import ServerMessageType, SocketEventType  # noqa: E402
+from peerjs_py.logger import LogLevel, logger  # noqa: E402
+from peerjs_py.socket import Socket  # noqa: E402
+
+CANDIDATE = {
+    "candidate": "candidate:842163049 1 udp 1677729535 203.0.113.7 46154 typ srflx "
+                 "raddr 192.168.1.23 rport 46154 generation 0 ufrag sXtT network-cost 999",
+    "sdpMid": "0",
+    "sdpMLineIndex": 0,
+}
+
+
+def messages(count):
+    return [{
+        "type": ServerMessageType.Candidate.value,
+        "payload": {"candidate": CANDIDATE, "type": "data", "connectionId": f"dc_{i % 10}"},
+        "dst": f"peer{i % 10}",
+    } for i in range(count)]
+
+
+def serve(expected, ready):
+    """Server process: reports its port, then sends a DONE message after ``expected`` frames."""
+
+    async def handle_socket(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        received = 0
+        async for _ in ws:
+            received += 1
+            if received == expected:
+                await ws.send_str('{"type": "DONE"}')
+        return ws
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/peerjs", handle_socket)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        ready.send(runner.addresses[0][1])
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+async def measure(port, count, queued):
+    socket = Socket(False, "127.0.0.1", port, "/", "peerjs")
+    done = asyncio.get_running_loop().create_future()
+    socket.on(SocketEventType.Message.value, lambda message: done.set_result(None))
+    await socket.start("bench", "token")
+    burst = messages(count)
+    start = time.perf_counter()
+    if queued:
+        for message in burst:
+            await socket.send(message)
+    else:
+        for message in burst:
+            await socket._ws.send_str(socket._codec.dumps(message))
+    await asyncio.wait_for(done, 60)
+    elapsed = time.perf_counter() - start
+    passes = socket.writer_passes
+    await socket.close()
+    return elapsed, passes
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logger.set_log_level(LogLevel.All if os.environ.get("BENCH_DEBUG") else LogLevel.Disabled)
+    for label, queued in (("direct", False), ("queued", True)):
+        ready, child = multiprocessing.Pipe()
+        server = multiprocessing.Process(target=serve, args=(count, child), daemon=True)
+        server.start()
+        try:
+            elapsed, passes = asyncio.run(measure(ready.recv(), count, queued))
+        finally:
+            server.terminate()
+        extra = f"   {passes} writer passes" if queued else ""
+        print(f"{label:<8} {count / elapsed:10.0f} msg/s  ({count} messages in {elapsed * 1000:.0f} ms){extra}")
+
+
+if __name__ == '__main__':
+    main()
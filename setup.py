@@ -16,7 +16,6 @@ setup(
         "aiortc>=1.9.0,<2.0.0",
         "pyee>=12.0.0,<13.0.0",
         "aiohttp>=3.7.4,<4.0.0",
-        "requests>=2.25.1,<3.0.0",
         # "websockets>=9.1,<10.0",
     ],
     author="Mansu Kim",
@@ -34,6 +33,7 @@ setup(
     include_package_data=True,
     license="MIT",
     keywords="peerjs webrtc networking",
+    extras_require={'fast': ['orjson>=3.6']},
     tests_require=['pytest'],
     cmdclass={'test': PyTest},
 )
\ No newline at end of file
@@ -35,11 +35,12 @@
 from peerjs_py.enums import ConnectionType, ServerMessageType, BaseConnectionErrorType, PeerErrorType
 from peerjs_py.peer import Peer, PeerOptions
 from peerjs_py.msgPackPeer import MsgPackPeer
+from peerjs_py.peer_startup import IdPool, start_peers
 from peerjs_py.enums import *
 from peerjs_py.logger import LogLevel
 from peerjs_py.peer_error import PeerError
 from peerjs_py.mediaconnection import MediaConnection
 
 __all__ = [
-    'Peer', 'PeerOptions', 'MsgPackPeer', 'LogLevel', 'PeerError','MediaConnection'
+    'Peer', 'PeerOptions', 'MsgPackPeer', 'IdPool', 'start_peers', 'LogLevel', 'PeerError','MediaConnection'
 ]
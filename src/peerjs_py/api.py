@@ -1,40 +1,110 @@
-import json
+import asyncio
 import random
 import time
-from urllib.parse import urlencode
-import requests
+from enum import Enum
+from typing import Any, Optional
+
+import aiohttp
+
 # from peerjs_py.util import util
 from peerjs_py.logger import logger
 from peerjs_py.option_interfaces import PeerJSOption
+from peerjs_py.session_registry import sessions
 
 version = "0.1.0"
 
+
+class APIError(Exception):
+    """The PeerServer answered with an error status."""
+
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message or f"Error. Status:{status}")
+        self.status = status
+
+
 class API:
+    """PeerServer REST API (ID retrieval and peer listing).
+
+    Requests go through the process-wide keep-alive ``aiohttp.ClientSession``
+    of the server (shared with the signaling sockets), acquired on first use
+    and released by ``close()``. Each attempt is bounded by
+    ``api_timeout`` seconds; connection errors, timeouts and 5xx answers are
+    retried up to ``api_retries`` times with full-jitter exponential backoff.
+    """
+
+    DEFAULT_TIMEOUT = 10.0
+    DEFAULT_RETRIES = 3
+    BACKOFF_BASE = 0.2
+    BACKOFF_MAX = 5.0
+
     def __init__(self, options: PeerJSOption):
         self._options = options
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.timeout = self._option('api_timeout', self.DEFAULT_TIMEOUT)
+        self.retries = self._option('api_retries', self.DEFAULT_RETRIES)
+
+    def _option(self, name: str, default: Any = None) -> Any:
+        if isinstance(self._options, dict):
+            value = self._options.get(name)
+        else:
+            value = getattr(self._options, name, None)
+        return default if value is None else value
+
+    def _url(self, method: str) -> str:
+        protocol = "https" if self._option('secure', True) else "http"
+        host = self._option('host', 'localhost')
+        port = self._option('port', 9000)
+        path = self._option('path', '/')
+        key = self._option('key', 'peerjs')
+        return f"{protocol}://{host}:{port}{path}{key}/{method}"
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = sessions.acquire(
+                self._option('secure', True), self._option('host', 'localhost'), self._option('port', 9000))
+        return self._session
+
+    async def _request(self, method: str, parse_json: bool = False) -> Any:
+        url = self._url(method)
+        headers = {}
+        # Peer options spell it referrerPolicy, PeerJSOption referrer_policy.
+        referrer_policy = self._option('referrerPolicy', self._option('referrer_policy'))
+        if isinstance(referrer_policy, Enum):
+            referrer_policy = referrer_policy.value
+        if referrer_policy:
+            headers["Referrer-Policy"] = str(referrer_policy)
 
-    def _build_request(self, method: str) -> requests.Response:
-        protocol = "https" if self._options.secure else "http"
-        host, port, path, key = self._options.host, self._options.port, self._options.path, self._options.key
-        url = f"{protocol}://{host}:{port}{path}{key}/{method}"
-        params = {
-            "ts": f"{int(time.time() * 1000)}{random.random()}",
-            "version": version
-        }
-        url_with_params = f"{url}?{urlencode(params)}"
-        return requests.get(url_with_params, headers={"Referrer-Policy": self._options.referrer_policy})
+        attempt = 0
+        while True:
+            params = {
+                "ts": f"{int(time.time() * 1000)}{random.random()}",
+                "version": version
+            }
+            try:
+                async with self._get_session().get(url, params=params, headers=headers,
+                                                   timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                    if response.status != 200:
+                        raise APIError(response.status)
+                    if parse_json:
+                        return await response.json(content_type=None)
+                    return await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError, APIError) as error:
+                retryable = not isinstance(error, APIError) or error.status >= 500
+                if not retryable or attempt >= self.retries:
+                    raise
+                delay = random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** attempt))
+                attempt += 1
+                logger.debug("API %s failed (%s), retry %d in %.2fs", method, error, attempt, delay)
+                await asyncio.sleep(delay)
 
     async def retrieve_id(self) -> str:
         try:
-            logger.debug(f'API retrieve_id: {self._options}')
-            response = self._build_request("id")
-            if response.status_code != 200:
-                raise Exception(f"Error. Status:{response.status_code}")
-            return response.text
+            logger.debug('API retrieve_id: %s', self._options)
+            return await self._request("id")
         except Exception as error:
-            logger.error("Error retrieving ID", error)
+            logger.error("Error retrieving ID: %s", error)
             path_error = ""
-            if self._options.get('path') == "/": #and self._options.get('host') != util.CLOUD_HOST:
+            if self._option('path') == "/": #and self._options.get('host') != util.CLOUD_HOST:
                 path_error = (" If you passed in a `path` to your self-hosted PeerServer, "
                               "you'll also need to pass in that same path when creating a new "
                               "Peer.")
@@ -42,9 +112,10 @@ class API:
 
     async def list_all_peers(self) -> list:
         try:
-            response = self._build_request("peers")
-            if response.status_code != 200:
-                if response.status_code == 401:
+            try:
+                return await self._request("peers", parse_json=True)
+            except APIError as error:
+                if error.status == 401:
                     helpful_error = ("You need to enable `allow_discovery` on your self-hosted "
                                         "PeerServer to use this feature.")
                     # if self._options.host == util.CLOUD_HOST:
@@ -54,12 +125,13 @@ class API:
                     #     helpful_error = ("You need to enable `allow_discovery` on your self-hosted "
                     #                      "PeerServer to use this feature.")
                     raise Exception("It doesn't look like you have permission to list peers IDs. " + helpful_error)
-                raise Exception(f"Error. Status:{response.status_code}")
-            return response.json()
+                raise
         except Exception as error:
-            logger.error("Error retrieving list peers", error)
+            logger.error("Error retrieving list peers: %s", error)
             raise Exception("Could not get list peers from the server." + str(error))
 
-    # async def close(self):
-    #     """Close any open http pooling resources."""
-    #     await self._http_session.close()
+    async def close(self):
+        """Release the shared session."""
+        if self._session is not None:
+            await sessions.release(self._session)
+            self._session = None
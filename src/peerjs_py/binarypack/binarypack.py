@@ -1,230 +1,495 @@
 import struct
-from typing import Any, Union, List, Dict
-from io import BytesIO
+from typing import Any, Union, List, Dict, Optional, Tuple
 
 Packable = Union[None, str, int, float, bool, bytes, List['Packable'], Dict[str, 'Packable']]
 Unpackable = Union[None, str, int, float, bool, bytes, List['Unpackable'], Dict[str, 'Unpackable']]
 
-def unpack(data: bytes) -> Unpackable:
-    unpacker = Unpacker(data)
+def unpack(data: bytes, zero_copy: bool = False) -> Unpackable:
+    unpacker = Unpacker(data, zero_copy=zero_copy)
     return unpacker.unpack()
 
 def pack(data: Packable) -> bytes:
     packer = Packer()
     return packer.pack(data)
 
-class Unpacker:
-    def __init__(self, data: bytes):
-        self.buffer = BytesIO(data)
+_UINT8 = struct.Struct('!B')
+_UINT16 = struct.Struct('!H')
+_UINT32 = struct.Struct('!I')
+_UINT64 = struct.Struct('!Q')
+_INT8 = struct.Struct('!b')
+_INT16 = struct.Struct('!h')
+_INT32 = struct.Struct('!i')
+_INT64 = struct.Struct('!q')
+_FLOAT = struct.Struct('!f')
+_DOUBLE = struct.Struct('!d')
 
-    def unpack(self) -> Unpackable:
-        type_byte = self.unpack_uint8()
-        
-        if type_byte < 0x80:
-            return type_byte
-        elif (type_byte ^ 0xe0) < 0x20:
-            return (type_byte ^ 0xe0) - 0x20
-
-        size = 0
-        if (size := type_byte ^ 0xa0) <= 0x0f:
-            return self.unpack_raw(size)
-        elif (size := type_byte ^ 0xb0) <= 0x0f:
-            return self.unpack_string(size)
-        elif (size := type_byte ^ 0x90) <= 0x0f:
-            return self.unpack_array(size)
-        elif (size := type_byte ^ 0x80) <= 0x0f:
-            return self.unpack_map(size)
-
-        if type_byte == 0xc0:
-            return None
-        elif type_byte == 0xc2:
-            return False
-        elif type_byte == 0xc3:
-            return True
-        elif type_byte == 0xca:
-            return self.unpack_float()
-        elif type_byte == 0xcb:
-            return self.unpack_double()
-        elif type_byte == 0xcc:
-            return self.unpack_uint8()
-        elif type_byte == 0xcd:
-            return self.unpack_uint16()
-        elif type_byte == 0xce:
-            return self.unpack_uint32()
-        elif type_byte == 0xcf:
-            return self.unpack_uint64()
-        elif type_byte == 0xd0:
-            return self.unpack_int8()
-        elif type_byte == 0xd1:
-            return self.unpack_int16()
-        elif type_byte == 0xd2:
-            return self.unpack_int32()
-        elif type_byte == 0xd3:
-            return self.unpack_int64()
-        elif type_byte == 0xd8:
-            size = self.unpack_uint16()
-            return self.unpack_string(size)
-        elif type_byte == 0xd9:
-            size = self.unpack_uint32()
-            return self.unpack_string(size)
-        elif type_byte == 0xda:
-            size = self.unpack_uint16()
-            return self.unpack_raw(size)
-        elif type_byte == 0xdb:
-            size = self.unpack_uint32()
-            return self.unpack_raw(size)
-        elif type_byte == 0xdc:
-            size = self.unpack_uint16()
-            return self.unpack_array(size)
-        elif type_byte == 0xdd:
-            size = self.unpack_uint32()
-            return self.unpack_array(size)
-        elif type_byte == 0xde:
-            size = self.unpack_uint16()
-            return self.unpack_map(size)
-        elif type_byte == 0xdf:
-            size = self.unpack_uint32()
-            return self.unpack_map(size)
-        
-        raise ValueError(f"Unknown type byte: {type_byte}")
+# Dispatch tables indexed by type byte.
+# _IMMEDIATE: values fully encoded in the type byte (fixnums, nil, booleans).
+_NOT_IMMEDIATE = object()
+_IMMEDIATE: List[Any] = [_NOT_IMMEDIATE] * 256
+for _type in range(0x00, 0x80):
+    _IMMEDIATE[_type] = _type
+for _type in range(0xe0, 0x100):
+    _IMMEDIATE[_type] = _type - 0x100
+_IMMEDIATE[0xc0] = None
+_IMMEDIATE[0xc2] = False
+_IMMEDIATE[0xc3] = True
 
-    def unpack_uint8(self) -> int:
-        return struct.unpack('!B', self.buffer.read(1))[0]
+# _SCALARS: fixed width numbers following the type byte.
+_SCALARS: List[Optional[struct.Struct]] = [None] * 256
+for _type, _reader in ((0xca, _FLOAT), (0xcb, _DOUBLE),
+                       (0xcc, _UINT8), (0xcd, _UINT16), (0xce, _UINT32), (0xcf, _UINT64),
+                       (0xd0, _INT8), (0xd1, _INT16), (0xd2, _INT32), (0xd3, _INT64)):
+    _SCALARS[_type] = _reader
 
-    def unpack_uint16(self) -> int:
-        return struct.unpack('!H', self.buffer.read(2))[0]
+# _SIZED: (kind, size reader) for containers, raw and strings. A size reader of
+# None means the size lives in the low nibble of the type byte.
+_MAP, _ARRAY, _RAW, _STRING = 0, 1, 2, 3
+_SIZED: List[Optional[Tuple[int, Optional[struct.Struct]]]] = [None] * 256
+for _type in range(0x80, 0xc0):
+    _SIZED[_type] = ((_type >> 4) & 0x03, None)
+for _type, _kind, _reader in ((0xd8, _STRING, _UINT16), (0xd9, _STRING, _UINT32),
+                              (0xda, _RAW, _UINT16), (0xdb, _RAW, _UINT32),
+                              (0xdc, _ARRAY, _UINT16), (0xdd, _ARRAY, _UINT32),
+                              (0xde, _MAP, _UINT16), (0xdf, _MAP, _UINT32)):
+    _SIZED[_type] = (_kind, _reader)
+del _type, _kind, _reader
 
-    def unpack_uint32(self) -> int:
-        return struct.unpack('!I', self.buffer.read(4))[0]
+class OutOfData(ValueError):
+    """Raised when the input ends in the middle of a value."""
 
-    def unpack_uint64(self) -> int:
-        return struct.unpack('!Q', self.buffer.read(8))[0]
-
-    def unpack_int8(self) -> int:
-        return struct.unpack('!b', self.buffer.read(1))[0]
+class Unpacker:
+    """Single pass BinaryPack decoder working on offsets into the input.
 
-    def unpack_int16(self) -> int:
-        return struct.unpack('!h', self.buffer.read(2))[0]
+    With ``zero_copy=True`` raw (binary) fields are returned as ``memoryview``
+    slices of the input rather than ``bytes`` copies. Those views are only valid
+    while the input buffer is alive and unmodified.
 
-    def unpack_int32(self) -> int:
-        return struct.unpack('!i', self.buffer.read(4))[0]
+    The unpacker also works incrementally: ``feed()`` appends bytes as they
+    arrive and iterating yields every message that is complete so far, leaving
+    a partial trailing message buffered until the rest of it is fed.
+    """
 
-    def unpack_int64(self) -> int:
-        return struct.unpack('!q', self.buffer.read(8))[0]
+    def __init__(self, data: bytes = b'', zero_copy: bool = False):
+        if not isinstance(data, (bytes, bytearray)):
+            data = bytes(data)
+        self._data = data
+        self._view = memoryview(data) if zero_copy else None
+        self._offset = 0
+        self._streaming = False
+        # Buffer length needed before a pending partial message is worth retrying.
+        self._needed = 0
+        # Progress of _skip over a partial message: resume offset and values still to skip.
+        self._skip_pos = 0
+        self._pending = 0
 
-    def unpack_float(self) -> float:
-        return struct.unpack('!f', self.buffer.read(4))[0]
+    @property
+    def offset(self) -> int:
+        return self._offset
 
-    def unpack_double(self) -> float:
-        return struct.unpack('!d', self.buffer.read(8))[0]
+    @property
+    def buffered(self) -> int:
+        """Number of fed bytes not yet consumed by a complete message."""
+        return len(self._data) - self._offset
 
-    def unpack_raw(self, size: int) -> bytes:
-        return self.buffer.read(size)
+    def unpack(self) -> Unpackable:
+        try:
+            value, self._offset = _decode(self._data, self._view, self._offset, len(self._data))
+        except (IndexError, struct.error):
+            raise OutOfData(f"Unexpected end of data at offset {self._offset}") from None
+        return value
 
-    def unpack_string(self, size: int) -> str:
-        return self.buffer.read(size).decode('utf-8')
+    def feed(self, data: bytes) -> None:
+        if self._view is not None:
+            raise ValueError("zero_copy unpackers cannot be fed")
+        if not self._streaming:
+            # Take ownership of the buffer, the initial data may belong to the caller.
+            self._data = bytearray(self._data[self._offset:])
+            self._needed = max(self._needed - self._offset, 0)
+            self._skip_pos = max(self._skip_pos - self._offset, 0)
+            self._offset = 0
+            self._streaming = True
+        elif self._offset:
+            # Drop consumed messages. bytearray trims its head without moving the tail.
+            del self._data[:self._offset]
+            self._needed = max(self._needed - self._offset, 0)
+            self._skip_pos = max(self._skip_pos - self._offset, 0)
+            self._offset = 0
+        self._data += data
 
-    def unpack_array(self, size: int) -> List[Unpackable]:
-        return [self.unpack() for _ in range(size)]
+    def __iter__(self):
+        return self
 
-    def unpack_map(self, size: int) -> Dict[str, Unpackable]:
-        return {self.unpack(): self.unpack() for _ in range(size)}
+    def __next__(self) -> Unpackable:
+        data = self._data
+        end_of_data = len(data)
+        if self._offset >= end_of_data or end_of_data < self._needed:
+            raise StopIteration
+        if self._pending:
+            # Carry on measuring the partial message rather than decoding it again from its first byte.
+            self._skip_pos, self._pending, self._needed = _skip(data, self._skip_pos, self._pending, end_of_data)
+            if self._pending:
+                raise StopIteration
+        try:
+            value, self._offset = _decode(data, self._view, self._offset, end_of_data)
+        except (IndexError, struct.error):
+            self._skip_pos, self._pending, self._needed = _skip(data, self._offset, 1, end_of_data)
+            raise StopIteration from None
+        self._needed = 0
+        return value
 
-class Packer:
-    def __init__(self):
-        self.buffer = BytesIO()
+def _skip(data: bytes, pos: int, pending: int, end_of_data: int) -> Tuple[int, int, int]:
+    """Step over ``pending`` values starting at ``pos`` without decoding them.
 
-    def pack(self, data: Packable) -> bytes:
-        if data is None:
-            self.buffer.write(b'\xc0')
-        elif isinstance(data, bool):
-            self.buffer.write(b'\xc3' if data else b'\xc2')
-        elif isinstance(data, int):
-            self.pack_integer(data)
-        elif isinstance(data, float):
-            self.pack_float(data)
-        elif isinstance(data, str):
-            self.pack_string(data)
-        elif isinstance(data, bytes):
-            self.pack_binary(data)
-        elif isinstance(data, list):
-            self.pack_array(data)
-        elif isinstance(data, dict):
-            self.pack_map(data)
+    Returns the offset reached, the number of values still to skip (nested
+    container items count as values) and the buffer length needed to make
+    progress. Stopping only between values makes the skip resumable, so a
+    message arriving in small pieces is walked once instead of once per piece.
+    """
+    while pending:
+        if pos >= end_of_data:
+            return pos, pending, pos + 1
+        type_byte = data[pos]
+        if _IMMEDIATE[type_byte] is not _NOT_IMMEDIATE:
+            end = pos + 1
+        elif (reader := _SCALARS[type_byte]) is not None:
+            end = pos + 1 + reader.size
         else:
-            raise TypeError(f"Cannot pack object of type {type(data)}")
-        
-        return self.buffer.getvalue()
-
-    def pack_integer(self, num: int):
-        if num >= 0:
-            if num < 128:
-                self.buffer.write(struct.pack('B', num))
-            elif num < 256:
-                self.buffer.write(b'\xcc' + struct.pack('B', num))
-            elif num < 65536:
-                self.buffer.write(b'\xcd' + struct.pack('!H', num))
-            elif num < 4294967296:
-                self.buffer.write(b'\xce' + struct.pack('!I', num))
+            entry = _SIZED[type_byte]
+            if entry is None:
+                raise ValueError(f"Unknown type byte: {type_byte}")
+            kind, reader = entry
+            if reader is None:
+                size = type_byte & 0x0f
+                end = pos + 1
             else:
-                self.buffer.write(b'\xcf' + struct.pack('!Q', num))
-        else:
-            if num >= -32:
-                self.buffer.write(struct.pack('b', num))
-            elif num >= -128:
-                self.buffer.write(b'\xd0' + struct.pack('b', num))
-            elif num >= -32768:
-                self.buffer.write(b'\xd1' + struct.pack('!h', num))
-            elif num >= -2147483648:
-                self.buffer.write(b'\xd2' + struct.pack('!i', num))
+                end = pos + 1 + reader.size
+                if end > end_of_data:
+                    return pos, pending, end
+                size = reader.unpack_from(data, pos + 1)[0]
+            if kind == _MAP:
+                pending += 2 * size
+            elif kind == _ARRAY:
+                pending += size
             else:
-                self.buffer.write(b'\xd3' + struct.pack('!q', num))
-
-    def pack_float(self, num: float):
-        self.buffer.write(b'\xcb' + struct.pack('!d', num))
-
-    def pack_string(self, s: str):
-        data = s.encode('utf-8')
-        length = len(data)
-        if length < 32:
-            self.buffer.write(struct.pack('B', 0xa0 | length))
-        elif length < 256:
-            self.buffer.write(b'\xd9' + struct.pack('B', length))
-        elif length < 65536:
-            self.buffer.write(b'\xda' + struct.pack('!H', length))
-        else:
-            self.buffer.write(b'\xdb' + struct.pack('!I', length))
-        self.buffer.write(data)
-
-    def pack_binary(self, data: bytes):
-        length = len(data)
-        if length < 256:
-            self.buffer.write(b'\xc4' + struct.pack('B', length))
-        elif length < 65536:
-            self.buffer.write(b'\xc5' + struct.pack('!H', length))
+                end += size
+        if end > end_of_data:
+            return pos, pending, end
+        pos = end
+        pending -= 1
+    return pos, 0, pos
+
+def _decode(data: bytes, view: Optional[memoryview], pos: int, end_of_data: int) -> Tuple[Unpackable, int]:
+    """Decode one value at ``pos`` and return it with the offset just past it.
+
+    Immediates, fixstrings and fixed width scalars inside arrays and maps are
+    decoded inline; only nested containers, long strings and raw fields recurse.
+    """
+    type_byte = data[pos]
+    value = _IMMEDIATE[type_byte]
+    if value is not _NOT_IMMEDIATE:
+        return value, pos + 1
+    reader = _SCALARS[type_byte]
+    if reader is not None:
+        return reader.unpack_from(data, pos + 1)[0], pos + 1 + reader.size
+    entry = _SIZED[type_byte]
+    if entry is None:
+        raise ValueError(f"Unknown type byte: {type_byte}")
+    kind, reader = entry
+    if reader is None:
+        size = type_byte & 0x0f
+        pos += 1
+    else:
+        size = reader.unpack_from(data, pos + 1)[0]
+        pos += 1 + reader.size
+
+    if kind == _STRING or kind == _RAW:
+        end = pos + size
+        if end > end_of_data:
+            raise IndexError(end)
+        if kind == _STRING:
+            return data[pos:end].decode('utf-8'), end
+        if view is not None:
+            return view[pos:end], end
+        raw = data[pos:end]
+        return (raw if type(raw) is bytes else bytes(raw)), end
+
+    if kind == _ARRAY:
+        result = []
+        append = result.append
+        for _ in range(size):
+            type_byte = data[pos]
+            value = _IMMEDIATE[type_byte]
+            if value is not _NOT_IMMEDIATE:
+                pos += 1
+            elif 0xb0 <= type_byte < 0xc0:
+                end = pos + 1 + (type_byte & 0x0f)
+                if end > end_of_data:
+                    raise IndexError(end)
+                value = data[pos + 1:end].decode('utf-8')
+                pos = end
+            elif (reader := _SCALARS[type_byte]) is not None:
+                value = reader.unpack_from(data, pos + 1)[0]
+                pos += 1 + reader.size
+            else:
+                value, pos = _decode(data, view, pos, end_of_data)
+            append(value)
+        return result, pos
+
+    result = {}
+    for _ in range(size):
+        type_byte = data[pos]
+        if 0xb0 <= type_byte < 0xc0:
+            end = pos + 1 + (type_byte & 0x0f)
+            if end > end_of_data:
+                raise IndexError(end)
+            key = data[pos + 1:end].decode('utf-8')
+            pos = end
         else:
-            self.buffer.write(b'\xc6' + struct.pack('!I', length))
-        self.buffer.write(data)
-
-    def pack_array(self, arr: List[Packable]):
-        length = len(arr)
-        if length < 16:
-            self.buffer.write(struct.pack('B', 0x90 | length))
-        elif length < 65536:
-            self.buffer.write(b'\xdc' + struct.pack('!H', length))
+            key, pos = _decode(data, view, pos, end_of_data)
+            if type(key) is memoryview:
+                key = key.tobytes()
+        type_byte = data[pos]
+        value = _IMMEDIATE[type_byte]
+        if value is not _NOT_IMMEDIATE:
+            pos += 1
+        elif 0xb0 <= type_byte < 0xc0:
+            end = pos + 1 + (type_byte & 0x0f)
+            if end > end_of_data:
+                raise IndexError(end)
+            value = data[pos + 1:end].decode('utf-8')
+            pos = end
+        elif (reader := _SCALARS[type_byte]) is not None:
+            value = reader.unpack_from(data, pos + 1)[0]
+            pos += 1 + reader.size
         else:
-            self.buffer.write(b'\xdd' + struct.pack('!I', length))
-        for item in arr:
-            self.pack(item)
-
-    def pack_map(self, m: Dict[str, Packable]):
-        length = len(m)
-        if length < 16:
-            self.buffer.write(struct.pack('B', 0x80 | length))
-        elif length < 65536:
-            self.buffer.write(b'\xde' + struct.pack('!H', length))
+            value, pos = _decode(data, view, pos, end_of_data)
+        result[key] = value
+    return result, pos
+
+_TYPE_UINT16 = struct.Struct('!BH')
+_TYPE_UINT32 = struct.Struct('!BI')
+
+def _integer_format(num: int) -> Tuple[int, Optional[struct.Struct]]:
+    """Type byte and payload writer for ``num``; a writer of None means fixnum."""
+    if -0x20 <= num <= 0x7f:
+        return num & 0xff, None
+    if num >= 0:
+        if num <= 0xff:
+            return 0xcc, _UINT8
+        if num <= 0xffff:
+            return 0xcd, _UINT16
+        if num <= 0xffffffff:
+            return 0xce, _UINT32
+        if num <= 0xffffffffffffffff:
+            return 0xcf, _UINT64
+    else:
+        if num >= -0x80:
+            return 0xd0, _INT8
+        if num >= -0x8000:
+            return 0xd1, _INT16
+        if num >= -0x80000000:
+            return 0xd2, _INT32
+        if num >= -0x8000000000000000:
+            return 0xd3, _INT64
+    raise OverflowError(f"Integer out of range: {num}")
+
+def _sized_header_size(length: int, fix_limit: int) -> int:
+    if length <= fix_limit:
+        return 1
+    if length <= 0xffff:
+        return 3
+    if length <= 0xffffffff:
+        return 5
+    raise OverflowError(f"Length out of range: {length}")
+
+def _measure(data: Packable, strings: List[bytes]) -> int:
+    """Return the encoded size of ``data``.
+
+    UTF-8 encodings of strings are appended to ``strings`` in traversal order so
+    the write pass does not have to encode them a second time.
+    """
+    if data is None or data is True or data is False:
+        return 1
+    data_type = type(data)
+    if data_type is str:
+        encoded = data.encode('utf-8')
+        strings.append(encoded)
+        return _sized_header_size(len(encoded), 0x0f) + len(encoded)
+    if data_type is int:
+        if -0x20 <= data <= 0x7f:
+            return 1
+        reader = _integer_format(data)[1]
+        return 1 if reader is None else 1 + reader.size
+    if data_type is float:
+        return 9
+    if data_type is bytes or data_type is bytearray:
+        return _sized_header_size(len(data), 0x0f) + len(data)
+    if data_type is memoryview:
+        return _sized_header_size(data.nbytes, 0x0f) + data.nbytes
+    if data_type is list or data_type is tuple:
+        size = _sized_header_size(len(data), 0x0f)
+        for item in data:
+            size += _measure(item, strings)
+        return size
+    if data_type is dict:
+        size = _sized_header_size(len(data), 0x0f)
+        for key, value in data.items():
+            size += _measure(key, strings)
+            size += _measure(value, strings)
+        return size
+    # subclasses (IntEnum, OrderedDict, ...) take the slow path
+    if isinstance(data, str):
+        encoded = str.encode(data, 'utf-8')
+        strings.append(encoded)
+        return _sized_header_size(len(encoded), 0x0f) + len(encoded)
+    if isinstance(data, int):
+        reader = _integer_format(data)[1]
+        return 1 if reader is None else 1 + reader.size
+    if isinstance(data, float):
+        return 9
+    if isinstance(data, (bytes, bytearray)):
+        return _sized_header_size(len(data), 0x0f) + len(data)
+    if isinstance(data, (list, tuple)):
+        return _measure(list(data), strings)
+    if isinstance(data, dict):
+        return _measure(dict(data), strings)
+    raise TypeError(f"Cannot pack object of type {type(data)}")
+
+def _write_header(buffer: bytearray, pos: int, length: int, fix_base: int, type16: int) -> int:
+    if length <= 0x0f:
+        buffer[pos] = fix_base | length
+        return pos + 1
+    if length <= 0xffff:
+        _TYPE_UINT16.pack_into(buffer, pos, type16, length)
+        return pos + 3
+    _TYPE_UINT32.pack_into(buffer, pos, type16 + 1, length)
+    return pos + 5
+
+def _write(data: Packable, buffer: bytearray, pos: int, strings) -> int:
+    """Write ``data`` at ``pos`` and return the offset just past it.
+
+    ``strings`` iterates over the encodings collected by ``_measure``.
+    """
+    data_type = type(data)
+    if data_type is str:
+        encoded = next(strings)
+        length = len(encoded)
+        if length <= 0x0f:
+            buffer[pos] = 0xb0 | length
+            pos += 1
         else:
-            self.buffer.write(b'\xdf' + struct.pack('!I', length))
-        for key, value in m.items():
-            self.pack(key)
-            self.pack(value)
\ No newline at end of file
+            pos = _write_header(buffer, pos, length, 0xb0, 0xd8)
+        end = pos + length
+        buffer[pos:end] = encoded
+        return end
+    if data_type is int and -0x20 <= data <= 0x7f:
+        buffer[pos] = data & 0xff
+        return pos + 1
+    if data_type is dict:
+        pos = _write_header(buffer, pos, len(data), 0x80, 0xde)
+        for key, value in data.items():
+            pos = _write(key, buffer, pos, strings)
+            pos = _write(value, buffer, pos, strings)
+        return pos
+    if data is None:
+        buffer[pos] = 0xc0
+        return pos + 1
+    if data is True:
+        buffer[pos] = 0xc3
+        return pos + 1
+    if data is False:
+        buffer[pos] = 0xc2
+        return pos + 1
+    if isinstance(data, str):
+        encoded = next(strings)
+        pos = _write_header(buffer, pos, len(encoded), 0xb0, 0xd8)
+        end = pos + len(encoded)
+        buffer[pos:end] = encoded
+        return end
+    if isinstance(data, int):
+        type_byte, writer = _integer_format(data)
+        buffer[pos] = type_byte
+        if writer is None:
+            return pos + 1
+        writer.pack_into(buffer, pos + 1, data)
+        return pos + 1 + writer.size
+    if isinstance(data, float):
+        buffer[pos] = 0xcb
+        _DOUBLE.pack_into(buffer, pos + 1, data)
+        return pos + 9
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        length = data.nbytes if isinstance(data, memoryview) else len(data)
+        pos = _write_header(buffer, pos, length, 0xa0, 0xda)
+        end = pos + length
+        buffer[pos:end] = data
+        return end
+    if isinstance(data, (list, tuple)):
+        pos = _write_header(buffer, pos, len(data), 0x90, 0xdc)
+        for item in data:
+            pos = _write(item, buffer, pos, strings)
+        return pos
+    if isinstance(data, dict):
+        pos = _write_header(buffer, pos, len(data), 0x80, 0xde)
+        for key, value in data.items():
+            pos = _write(key, buffer, pos, strings)
+            pos = _write(value, buffer, pos, strings)
+        return pos
+    raise TypeError(f"Cannot pack object of type {type(data)}")
+
+def packed_size(data: Packable) -> int:
+    """Exact number of bytes ``pack(data)`` produces."""
+    return _measure(data, [])
+
+def pack_into(data: Packable, buffer: bytearray, offset: int = 0) -> int:
+    """Encode ``data`` into ``buffer`` at ``offset`` and return the end offset.
+
+    The buffer must already be large enough; see ``packed_size``.
+    """
+    strings: List[bytes] = []
+    end = offset + _measure(data, strings)
+    if end > len(buffer):
+        raise ValueError(f"Buffer too small: need {end} bytes, have {len(buffer)}")
+    _write(data, buffer, offset, iter(strings))
+    return end
+
+def pack_array_header(length: int) -> bytes:
+    """Encode the header of an array of ``length`` items.
+
+    The header followed by the ``pack`` output of each item is the encoding of
+    the whole array, so already packed items can be joined without repacking.
+    """
+    buffer = bytearray(_sized_header_size(length, 0x0f))
+    _write_header(buffer, 0, length, 0x90, 0xdc)
+    return bytes(buffer)
+
+class Packer:
+    """BinaryPack encoder.
+
+    Every message is measured first and then written into a buffer of exactly
+    the right size, so no intermediate header objects or resizes are produced.
+    ``pack`` returns a fresh ``bytes``; ``pack_to_buffer`` reuses one output
+    buffer across calls, owned by the packer or supplied by the caller.
+    """
+
+    def __init__(self, buffer: Optional[bytearray] = None):
+        self.buffer = buffer if buffer is not None else bytearray()
+
+    def pack(self, data: Packable) -> bytes:
+        strings: List[bytes] = []
+        buffer = bytearray(_measure(data, strings))
+        _write(data, buffer, 0, iter(strings))
+        return bytes(buffer)
+
+    def pack_to_buffer(self, data: Packable) -> memoryview:
+        """Encode into the reusable buffer and return a view of the encoded bytes.
+
+        The view is only valid until the next call. The buffer is replaced, never
+        resized, when it is too small, so views handed out earlier stay readable.
+        """
+        strings: List[bytes] = []
+        size = _measure(data, strings)
+        if size > len(self.buffer):
+            self.buffer = bytearray(max(size, 2 * len(self.buffer)))
+        _write(data, self.buffer, 0, iter(strings))
+        return memoryview(self.buffer)[:size]
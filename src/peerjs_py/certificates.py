@@ -0,0 +1,181 @@
+import asyncio
+import contextlib
+import os
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+import aiortc.rtcpeerconnection
+from aiortc.rtcdtlstransport import RTCCertificate, generate_certificate
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from peerjs_py.logger import logger
+
+# Certificate that RTCPeerConnections created inside CertificateStore.use() get.
+_current_certificate: ContextVar[Optional[RTCCertificate]] = ContextVar("peerjs_dtls_certificate", default=None)
+
+
+class _ReusableCertificate(RTCCertificate):
+    """RTCPeerConnection calls generateCertificate() in its constructor; hand it the stored one instead."""
+
+    @classmethod
+    def generateCertificate(cls):
+        certificate = _current_certificate.get()
+        if certificate is not None:
+            return certificate
+        return super().generateCertificate()
+
+
+class CertificateStore:
+    """One DTLS certificate shared by every RTCPeerConnection of a Peer.
+
+    aiortc generates a new key pair and certificate for each peer connection.
+    The store generates (or loads from ``path``) a single one instead, saves
+    it to ``path`` if given, and replaces it once it is ``rotate_after``
+    seconds old or about to expire. Replacement certificates are generated in
+    the default executor, off the event loop; connections keep using the
+    current one in the meantime.
+    """
+
+    DEFAULT_ROTATION = 7 * 24 * 3600.0
+    # aiortc certificates are valid for 30 days; never hand out one this close to expiry.
+    EXPIRY_MARGIN = 24 * 3600.0
+
+    def __init__(self, path: Optional[str] = None, rotate_after: float = DEFAULT_ROTATION,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.rotate_after = rotate_after
+        self._clock = clock
+        self._certificate: Optional[RTCCertificate] = None
+        self._issued_at = 0.0
+        self._rotation: Optional[asyncio.Future] = None
+        # Only updated on the event loop thread, never from the executor.
+        self.generated = 0
+        self.loaded = 0
+        self.uses = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"generated": self.generated, "loaded": self.loaded, "uses": self.uses}
+
+    @property
+    def certificate(self) -> RTCCertificate:
+        """The current certificate; generated synchronously only if there is none yet."""
+        if self._certificate is None or self._expiring():
+            self._set(*self._load_or_generate())
+        elif self._rotation_due():
+            self._rotate_in_background()
+        return self._certificate
+
+    async def prepare(self) -> None:
+        """Load or generate the certificate in the executor, ahead of the first connection."""
+        if self._certificate is None or self._expiring():
+            loop = asyncio.get_running_loop()
+            self._set(*await loop.run_in_executor(None, self._load_or_generate))
+
+    def rotate(self) -> RTCCertificate:
+        """Replace the certificate now."""
+        self._set(*self._generate())
+        return self._certificate
+
+    @contextlib.contextmanager
+    def use(self) -> Iterator[RTCCertificate]:
+        """RTCPeerConnections created in this block use the stored certificate.
+
+        aiortc's RTCCertificate is swapped for _ReusableCertificate only for
+        the duration of the block, which must not await: peer connections
+        created elsewhere in the meantime would get the certificate too.
+        """
+        certificate = self.certificate
+        self.uses += 1
+        token = _current_certificate.set(certificate)
+        original = aiortc.rtcpeerconnection.RTCCertificate
+        aiortc.rtcpeerconnection.RTCCertificate = _ReusableCertificate
+        try:
+            yield certificate
+        finally:
+            aiortc.rtcpeerconnection.RTCCertificate = original
+            _current_certificate.reset(token)
+
+    def _set(self, certificate: RTCCertificate, issued_at: float, loaded: bool = False) -> None:
+        self._certificate = certificate
+        self._issued_at = issued_at
+        if loaded:
+            self.loaded += 1
+        else:
+            self.generated += 1
+
+    def _rotation_due(self) -> bool:
+        return self._clock() - self._issued_at >= self.rotate_after
+
+    def _expiring(self) -> bool:
+        expires = self._certificate.expires.timestamp()
+        return expires - self._clock() < self.EXPIRY_MARGIN
+
+    def _rotate_in_background(self) -> None:
+        if self._rotation is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.rotate()
+            return
+
+        def done(future: asyncio.Future) -> None:
+            self._rotation = None
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                logger.error("DTLS certificate rotation failed: %s", future.exception())
+            else:
+                self._set(*future.result())
+                logger.info("DTLS certificate rotated")
+
+        self._rotation = loop.run_in_executor(None, self._generate)
+        self._rotation.add_done_callback(done)
+
+    def _load_or_generate(self):
+        if self.path and os.path.exists(self.path):
+            try:
+                certificate, issued_at = self._load()
+            except (OSError, ValueError) as err:
+                logger.warning("Ignoring unreadable DTLS certificate %s: %s", self.path, err)
+            else:
+                if (certificate.expires.timestamp() - self._clock() >= self.EXPIRY_MARGIN
+                        and self._clock() - issued_at < self.rotate_after):
+                    return certificate, issued_at, True
+        return self._generate()
+
+    def _generate(self):
+        # Built from our own key and certificate, as RTCCertificate does not expose them.
+        key = ec.generate_private_key(ec.SECP256R1())
+        cert = generate_certificate(key)
+        issued_at = self._clock()
+        if self.path:
+            try:
+                self._save(key, cert)
+            except OSError as err:
+                logger.warning("Could not save DTLS certificate to %s: %s", self.path, err)
+        return RTCCertificate(key=key, cert=cert), issued_at, False
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        key = serialization.load_pem_private_key(data, password=None)
+        cert = x509.load_pem_x509_certificate(data)
+        return RTCCertificate(key=key, cert=cert), os.path.getmtime(self.path)
+
+    def _save(self, key: ec.EllipticCurvePrivateKey, cert: x509.Certificate) -> None:
+        data = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ) + cert.public_bytes(serialization.Encoding.PEM)
+        # Write next to the target and rename, so readers never see half a file.
+        temporary = f"{self.path}.tmp"
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temporary, self.path)
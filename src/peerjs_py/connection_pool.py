@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from peerjs_py.enums import ConnectionEventType
+from peerjs_py.logger import logger
+
+PoolKey = Tuple[str, str, bool]
+
+# The only connect() options a pooled connection can honour: they make up its
+# pool key. Any other option set (metadata and label, which the remote peer got
+# with the offer, or anything tuning negotiation, batching, buffering or
+# chunking) needs a connection of its own.
+_POOLABLE_OPTIONS = frozenset(('serialization', 'reliable'))
+
+
+class _Idle:
+    __slots__ = ("connection", "deadline", "on_close")
+
+    def __init__(self, connection, deadline: float, on_close: Callable[[], None]):
+        self.connection = connection
+        self.deadline = deadline
+        self.on_close = on_close
+
+
+class ConnectionPool:
+    """Idle, already negotiated data connections to designated remote peers.
+
+    For each target (remote peer, serialization, reliability) the pool keeps
+    ``size`` open connections, created in the background by ``connect``.
+    ``take`` hands one out to ``Peer.connect`` and starts replacing it; idle
+    connections are closed and replaced ``ttl`` seconds after they opened.
+    The remote peer sees pooled connections as soon as they are created.
+    """
+
+    DEFAULT_TTL = 60.0
+    OPEN_TIMEOUT = 10.0
+    RETRY_DELAY = 1.0
+
+    def __init__(self, connect: Callable[[str, Dict[str, Any]], Awaitable[Any]], ttl: float = DEFAULT_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self._connect = connect
+        self.ttl = ttl
+        self._clock = clock
+        self._targets: Dict[PoolKey, int] = {}
+        self._idle: Dict[PoolKey, Deque[_Idle]] = {}
+        self._fillers: Dict[PoolKey, asyncio.Task] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._started = False
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.expired = 0
+        self.failed = 0
+
+    @staticmethod
+    def key(peer_id: str, options: Optional[Dict[str, Any]]) -> Optional[PoolKey]:
+        """Pool key of a connect() call, or None if a pooled connection cannot serve it."""
+        options = options or {}
+        if any(value is not None for name, value in options.items() if name not in _POOLABLE_OPTIONS):
+            return None
+        return peer_id, options.get('serialization', 'json'), bool(options.get('reliable', True))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "idle": sum(len(idle) for idle in self._idle.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "created": self.created,
+            "expired": self.expired,
+            "failed": self.failed,
+        }
+
+    def idle_count(self, peer_id: str) -> int:
+        return sum(len(idle) for key, idle in self._idle.items() if key[0] == peer_id)
+
+    def add_target(self, peer_id: str, size: int, serialization: str = 'json', reliable: bool = True) -> None:
+        if size < 0:
+            raise ValueError("size must not be negative")
+        key = (peer_id, serialization, bool(reliable))
+        if size:
+            self._targets[key] = size
+            self._idle.setdefault(key, deque())
+        else:
+            self._targets.pop(key, None)
+        if self._started:
+            self._fill(key)
+
+    def start(self) -> None:
+        """Begin filling the pool; connections need an open signaling connection."""
+        self._started = True
+        for key in list(self._targets):
+            self._fill(key)
+
+    def take(self, peer_id: str, options: Optional[Dict[str, Any]] = None):
+        """Hand out an idle connection matching a connect() call, or None."""
+        key = self.key(peer_id, options)
+        if key not in self._targets:
+            return None
+        idle = self._idle[key]
+        while idle:
+            entry = idle.popleft()
+            entry.connection.remove_listener(ConnectionEventType.Close.value, entry.on_close)
+            if entry.connection.open:
+                self.hits += 1
+                self._fill(key)
+                return entry.connection
+            asyncio.ensure_future(entry.connection.close())
+        self.misses += 1
+        self._fill(key)
+        return None
+
+    def _fill(self, key: PoolKey) -> None:
+        if not self._started or key not in self._targets:
+            return
+        filler = self._fillers.get(key)
+        if filler is None or filler.done():
+            self._fillers[key] = asyncio.get_running_loop().create_task(self._run_filler(key))
+
+    async def _run_filler(self, key: PoolKey) -> None:
+        peer_id, serialization, reliable = key
+        while len(self._idle.get(key, ())) < self._targets.get(key, 0):
+            connection = await self._connect(peer_id, {'serialization': serialization, 'reliable': reliable})
+            if connection is not None and not connection.open:
+                try:
+                    await asyncio.wait_for(asyncio.shield(connection.open_future), self.OPEN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    pass
+            if connection is None or not connection.open:
+                self.failed += 1
+                logger.warning("Could not pre-warm a connection to %s", peer_id)
+                if connection is not None:
+                    await connection.close()
+                await asyncio.sleep(self.RETRY_DELAY)
+                continue
+            self.created += 1
+            self._add_idle(key, connection)
+
+    def _add_idle(self, key: PoolKey, connection) -> None:
+        idle = self._idle.setdefault(key, deque())
+
+        def on_close():
+            if entry in idle:
+                idle.remove(entry)
+                self._fill(key)
+
+        entry = _Idle(connection, self._clock() + self.ttl, on_close)
+        connection.once(ConnectionEventType.Close.value, on_close)
+        idle.append(entry)
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        deadlines = [idle[0].deadline for idle in self._idle.values() if idle]
+        if deadlines:
+            delay = max(0.0, min(deadlines) - self._clock())
+            self._timer = asyncio.get_running_loop().call_later(delay, self._expire)
+
+    def _expire(self) -> None:
+        self._timer = None
+        now = self._clock()
+        for key, idle in self._idle.items():
+            expired = False
+            while idle and idle[0].deadline <= now:
+                entry = idle.popleft()
+                entry.connection.remove_listener(ConnectionEventType.Close.value, entry.on_close)
+                asyncio.ensure_future(entry.connection.close())
+                self.expired += 1
+                expired = True
+            if expired:
+                self._fill(key)
+        self._schedule()
+
+    async def close(self) -> None:
+        """Stop refilling and close every idle connection."""
+        self._started = False
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for filler in self._fillers.values():
+            filler.cancel()
+        self._fillers.clear()
+        for idle in self._idle.values():
+            while idle:
+                entry = idle.popleft()
+                entry.connection.remove_listener(ConnectionEventType.Close.value, entry.on_close)
+                await entry.connection.close()
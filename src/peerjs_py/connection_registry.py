@@ -0,0 +1,108 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from peerjs_py.logger import logger
+
+
+class ConnectionRegistry:
+    """The connections of a peer, indexed by connection id, remote peer id and type.
+
+    Adding, removing and looking up a connection are O(1) whatever the number
+    of connections. For compatibility with the former ``Dict[peer_id, List]``
+    layout, ``peer_id in registry`` and ``registry[peer_id]`` work per remote
+    peer, while ``len(registry)`` and iteration cover individual connections.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[str, Any] = {}
+        self._by_peer: Dict[str, Dict[str, Any]] = {}
+        self._by_type: Dict[Any, Dict[Tuple[str, str], Any]] = {}
+        # Keys each connection was registered under, its connection_id may change later.
+        self._keys: Dict[int, Tuple[str, str, Any]] = {}
+
+    def add(self, peer_id: str, connection) -> None:
+        if id(connection) in self._keys:
+            self.remove(connection)
+        connection_id = connection.connection_id
+        connection_type = connection.type
+        previous = self.get(peer_id, connection_id)
+        if previous is not None:
+            logger.warning(f"Connection ID {connection_id} registered again for {peer_id}, replacing the previous connection")
+            self.remove(previous)
+
+        self._by_id[connection_id] = connection
+        self._by_peer.setdefault(peer_id, {})[connection_id] = connection
+        self._by_type.setdefault(connection_type, {})[peer_id, connection_id] = connection
+        self._keys[id(connection)] = (connection_id, peer_id, connection_type)
+
+    def remove(self, connection) -> bool:
+        keys = self._keys.pop(id(connection), None)
+        if keys is None:
+            return False
+        connection_id, peer_id, connection_type = keys
+        # Another peer may have reused the ID; only drop the entry if it is ours.
+        if self._by_id.get(connection_id) is connection:
+            del self._by_id[connection_id]
+        for index, key, entry in ((self._by_peer, peer_id, connection_id),
+                                  (self._by_type, connection_type, (peer_id, connection_id))):
+            connections = index[key]
+            del connections[entry]
+            if not connections:
+                del index[key]
+        return True
+
+    def get(self, peer_id: Optional[str], connection_id: Optional[str]):
+        """Return the connection with ``connection_id`` to ``peer_id``, or None."""
+        connections = self._by_peer.get(peer_id)
+        return connections.get(connection_id) if connections else None
+
+    def get_by_id(self, connection_id: str):
+        return self._by_id.get(connection_id)
+
+    def by_peer(self, peer_id: str) -> List[Any]:
+        connections = self._by_peer.get(peer_id)
+        return list(connections.values()) if connections else []
+
+    def by_type(self, connection_type) -> List[Any]:
+        connections = self._by_type.get(connection_type)
+        return list(connections.values()) if connections else []
+
+    def pop_peer(self, peer_id: str) -> List[Any]:
+        """Unregister and return every connection to ``peer_id``."""
+        connections = self.by_peer(peer_id)
+        for connection in connections:
+            self.remove(connection)
+        return connections
+
+    def peer_ids(self) -> List[str]:
+        return list(self._by_peer)
+
+    def count(self, connection_type=None) -> int:
+        if connection_type is None:
+            return len(self._keys)
+        return len(self._by_type.get(connection_type, ()))
+
+    @property
+    def peer_count(self) -> int:
+        return len(self._by_peer)
+
+    def clear(self) -> None:
+        self._by_id.clear()
+        self._by_peer.clear()
+        self._by_type.clear()
+        self._keys.clear()
+
+    def __contains__(self, peer_id: str) -> bool:
+        return peer_id in self._by_peer
+
+    def __getitem__(self, peer_id: str) -> List[Any]:
+        return list(self._by_peer[peer_id].values())
+
+    def __iter__(self) -> Iterator[Any]:
+        # A snapshot, so connections may close (and unregister) while iterating.
+        return iter([connection for connections in self._by_peer.values() for connection in connections.values()])
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"<ConnectionRegistry connections={len(self._keys)} peers={len(self._by_peer)}>"
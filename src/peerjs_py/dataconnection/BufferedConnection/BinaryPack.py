@@ -2,80 +2,137 @@ import asyncio
 
 from peerjs_py.enums import SerializationType, ConnectionEventType
 from peerjs_py.logger import logger
-from peerjs_py.binarypack.binarypack import pack, unpack
+from peerjs_py.binarypack.binarypack import Packer, pack, pack_array_header, unpack
 from peerjs_py.dataconnection.BufferedConnection.BufferedConnection import BufferedConnection
-from peerjs_py.dataconnection.BufferedConnection.binaryPackChunker import BinaryPackChunker, concat_array_buffers
+from peerjs_py.dataconnection.BufferedConnection.binaryPackChunker import BinaryPackChunker
+from peerjs_py.dataconnection.BufferedConnection.chunkReassembler import ChunkReassembler
+from peerjs_py.dataconnection.BufferedConnection.fileTransfer import FileTransferManager
+
+# Everything in a packed batch frame before the array of packed messages.
+_BATCH_PREFIX = pack({"__peerData": {"type": "batch"}, "data": []})[:-1]
 
 class BinaryPack(BufferedConnection):
     serialization = SerializationType.Binary
+    supports_batching = True
 
     def __init__(self, peer_id, provider, options):
         super().__init__(peer_id, provider, options)
         self.chunker = BinaryPackChunker()
+        self._packer = Packer()
         # self.serialization = SerializationType.Binary
-        self._chunked_data = {}
+        self._reassembler = ChunkReassembler(
+            self.chunker.chunked_mtu,
+            timeout=options.get('chunkTimeout', ChunkReassembler.DEFAULT_TIMEOUT),
+            max_buffered_bytes=options.get('maxChunkedBytes', ChunkReassembler.DEFAULT_MAX_BUFFERED_BYTES),
+        )
+        self._files = FileTransferManager(self, window=self._chunk_window)
+        # Keep batch frames within a single chunk.
+        self._batch_max_bytes = min(self._batch_max_bytes, self.chunker.chunked_mtu - len(_BATCH_PREFIX) - 5)
 
     async def close(self, options=None):
         await super().close(options)
-        self._chunked_data = {}
+        self._reassembler.clear()
+        self._files.close()
+
+    async def send_file(self, path, transfer_id=None):
+        """Stream the file at ``path`` to the remote peer, memory-mapped."""
+        return await self._files.send_file(path, transfer_id)
+
+    async def receive_file(self, dest, transfer_id=None, offset=0):
+        """Write the next file the remote peer sends (or ``transfer_id``) to ``dest``."""
+        return await self._files.receive_file(dest, transfer_id, offset)
 
     async def _handle_data_message(self, data):
-        deserialized_data = unpack(data)
+        if isinstance(data, (bytes, bytearray)) and data.startswith(_BATCH_PREFIX):
+            await self._handle_batch(unpack(data)["data"])
+            return
 
-        peer_data = deserialized_data.get("__peerData")
-        if peer_data:
-            if peer_data.get("type") == "close":
-                await self.close()
+        # Chunk envelopes are decoded zero-copy so their payload is written
+        # straight into the reassembly buffer.
+        maybe_chunk = isinstance(data, (bytes, bytearray)) and data.find(b"__peerData", 0, 32) != -1
+        deserialized_data = unpack(data, zero_copy=maybe_chunk)
+
+        peer_data = deserialized_data.get("__peerData") if isinstance(deserialized_data, dict) else None
+        if peer_data is not None:
+            if isinstance(peer_data, dict):
+                peer_data_type = peer_data.get("type")
+                if peer_data_type == "close":
+                    await self.close()
+                elif isinstance(peer_data_type, str) and peer_data_type.startswith("file"):
+                    await self._files.handle(peer_data, deserialized_data.get("data"))
                 return
 
-            self._handle_chunk(deserialized_data)
+            await self._handle_chunk(deserialized_data)
             return
 
+        if maybe_chunk:
+            # Not a chunk after all; hand out bytes rather than views.
+            deserialized_data = unpack(data)
         # self.emit(ConnectionEventType.Data.value, deserialized_data)
         self.emit(ConnectionEventType.Data.value, deserialized_data)
 
-    def _handle_chunk(self, data):
-        chunk_id = data["__peerData"]
-        chunk_info = self._chunked_data.get(chunk_id, {
-            "data": [],
-            "count": 0,
-            "total": data["total"]
-        })
-
-        chunk_info["data"][data["n"]] = bytes(data["data"])
-        chunk_info["count"] += 1
-        self._chunked_data[chunk_id] = chunk_info
+    async def _handle_batch(self, messages):
+        for message in messages:
+            peer_data = message.get("__peerData") if isinstance(message, dict) else None
+            if isinstance(peer_data, dict) and peer_data.get("type") == "close":
+                await self.close()
+                return
+            self.emit(ConnectionEventType.Data.value, message)
 
-        if chunk_info["total"] == chunk_info["count"]:
-            del self._chunked_data[chunk_id]
-            complete_data = concat_array_buffers(chunk_info["data"])
-            self._handle_data_message({"data": complete_data})
+    async def _handle_chunk(self, data):
+        complete_data = self._reassembler.add(data["__peerData"], data["n"], data["total"], data["data"])
+        if complete_data is not None:
+            await self._handle_data_message(complete_data)
 
     async def _send(self, data, chunked):
-        blob = pack(data)
-        if isinstance(blob,  asyncio.Future):
-            return self._send_blob(blob)
+        # Encoded into the packer's reusable buffer; only the final bytes object
+        # handed to the data channel is allocated per message.
+        blob = self._packer.pack_to_buffer(data)
+
+        if not chunked:
+            if len(blob) > self.chunker.chunked_mtu:
+                # Chunks are packed through the same buffer, so detach the payload first.
+                blob = bytes(blob)
+                await self._flush_batch()
+                await self._send_chunks(blob)
+                return
+            if self.batching:
+                await self._send_batched(bytes(blob))
+                return
 
-        if not chunked and len(blob) > self.chunker.chunked_mtu:
-            await self._send_chunks(blob)
-            return
+        if self._batch:
+            blob = bytes(blob)
+            await self._flush_batch()
+        await self._buffered_send(bytes(blob))
+
+    def _frame_batch(self, messages):
+        return b"".join((_BATCH_PREFIX, pack_array_header(len(messages)), *messages))
 
-        if self.data_channel and self.data_channel.readyState == "open":
-            self.data_channel.send(data)
-        else:
-            await self._buffered_send(data)
+    async def _send_file_frame(self, envelope, data=None):
+        message = {"__peerData": envelope}
+        if data is not None:
+            message["data"] = data
+        await self._send(message, True)
 
     async def _send_blob(self, blob_promise: asyncio.Future):
         blob = await blob_promise
+        await self._flush_batch()
         if len(blob) > self.chunker.chunked_mtu:
             await self._send_chunks(blob)
             return
 
         await self._buffered_send(blob)
 
-    async def _send_chunks(self, blob):
-        blobs = self.chunker.chunk(blob)
-        logger.debug(f"DC#{self.connection_id} Try to send {len(blobs)} chunks...")
-
-        for blob in blobs:
-            await self.send(blob, True)
\ No newline at end of file
+    async def _send_chunks(self, blob, size=None):
+        """Send ``blob`` (or a streamed source of ``size`` bytes) as chunk envelopes.
+
+        Chunks are produced lazily and at most ``chunkWindow`` chunks worth of
+        bytes are left queued on the data channel at any time.
+        """
+        window = self.chunker.chunked_mtu * self._chunk_window
+        count = 0
+        async for chunk in self.chunker.aiter_chunks(blob, size):
+            await self._wait_for_buffered_amount(window)
+            await self.send(chunk, True)
+            count += 1
+        logger.debug("DC#%s Sent %d chunks", self.connection_id, count)
@@ -1,21 +1,103 @@
+import asyncio
+from collections import deque
+
 from peerjs_py.logger import logger
 from peerjs_py.dataconnection.DataConnection import DataConnection
+from peerjs_py.dataconnection.BufferedConnection.binaryPackChunker import CHUNKED_MTU
 
 class BufferedConnection(DataConnection):
+    """Data connection with flow control on outgoing messages.
+
+    Messages go straight to the data channel while it has less than the
+    ``highWaterMark`` option (bytes) queued. Beyond that they wait, in order, in
+    a local queue that is drained as the channel's ``bufferedamountlow`` event
+    reports room again. Once the local queue itself holds more than the high
+    water mark, ``send()`` blocks until it is back down to ``lowWaterMark``.
+    Everything waiting on the channel or the queue shares the ``_writable``
+    event and re-checks its own condition when it fires.
+
+    Serializers that set ``supports_batching`` can also coalesce small
+    messages: with the ``batchInterval`` (microseconds) or ``batchMaxBytes``
+    option set, encoded messages are collected until either limit is reached
+    and sent as a single frame built by ``_frame_batch``. Batches are only sent
+    to peers that advertised they can unbatch them during negotiation.
+    """
+
+    supports_batching = False
+    # Framing bytes each message adds to a batch beyond its own encoding.
+    _batch_item_overhead = 0
+    DEFAULT_BATCH_INTERVAL = 1000
+    DEFAULT_BATCH_MAX_BYTES = 16000
+
     def __init__(self, peer_id, provider, options):
         super().__init__(peer_id, provider, options)
-        self._buffer = []
-        self._buffer_size = 0
-        self._buffering = False
+        self._high_water_mark = options.get('highWaterMark', DataConnection.MAX_BUFFERED_AMOUNT)
+        self._low_water_mark = options.get('lowWaterMark', self._high_water_mark // 4)
+        if not 0 <= self._low_water_mark <= self._high_water_mark:
+            raise ValueError("lowWaterMark must be between 0 and highWaterMark")
+        self._buffer = deque()
+        self._buffered_bytes = 0
+        self._peak_buffer_size = 0
+        self._peak_buffered_bytes = 0
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._drain_task = None
+        # Chunked sends keep at most this many chunks queued on the channel.
+        self._chunk_window = options.get('chunkWindow', 64)
+        self._watched_channel = None
+
+        self._batch_enabled = 'batchInterval' in options or 'batchMaxBytes' in options
+        self._batch_interval = options.get('batchInterval', self.DEFAULT_BATCH_INTERVAL) / 1_000_000
+        self._batch_max_bytes = options.get('batchMaxBytes', self.DEFAULT_BATCH_MAX_BYTES)
+        self._batch = []
+        self._batch_bytes = 0
+        self._batch_timer = None
+
+    @property
+    def batching(self):
+        """Whether small messages are currently being batched."""
+        return self.supports_batching and self._batch_enabled and self._remote_batching
 
     @property
     def buffer_size(self):
-        return self._buffer_size
+        return len(self._buffer)
+
+    @property
+    def buffered_bytes(self):
+        return self._buffered_bytes
+
+    @property
+    def buffer_stats(self):
+        return {
+            "messages": len(self._buffer),
+            "bytes": self._buffered_bytes,
+            "peakMessages": self._peak_buffer_size,
+            "peakBytes": self._peak_buffered_bytes,
+            "highWaterMark": self._high_water_mark,
+            "lowWaterMark": self._low_water_mark,
+        }
 
     async def _initialize_data_channel(self, dc):
         await super()._initialize_data_channel(dc)
         self.data_channel.binaryType = "arraybuffer"
-        self.data_channel.on("message", self._handle_data_message)
+        # Messages reach _handle_data_message through DataConnection's handler.
+        self.data_channel.on("open", self._schedule_drain)
+        self._watch_buffered_amount(self.data_channel)
+
+    def _watch_buffered_amount(self, data_channel):
+        """Have ``data_channel``'s ``bufferedamountlow`` event set ``_writable``, once per channel."""
+        if self._watched_channel is data_channel:
+            return
+        self._unwatch_buffered_amount()
+        self._watched_channel = data_channel
+        # The lowest level anything waits for, so every waiter is woken by the event rather than its timeout.
+        data_channel.bufferedAmountLowThreshold = min(self._low_water_mark, CHUNKED_MTU * self._chunk_window)
+        data_channel.on("bufferedamountlow", self._writable.set)
+
+    def _unwatch_buffered_amount(self):
+        if self._watched_channel is not None:
+            self._watched_channel.remove_listener("bufferedamountlow", self._writable.set)
+            self._watched_channel = None
 
     async def _handle_data_message(self, e):
         # This method should be implemented in subclasses
@@ -23,52 +105,130 @@ class BufferedConnection(DataConnection):
 
     # _send for buffered case
     async def _buffered_send(self, msg):
-        if self._buffering or not await self._try_send(msg):
-            self._buffer.append(msg)
-            self._buffer_size = len(self._buffer)
+        if not self._buffer and self._channel_has_room():
+            await self._try_send(msg)
+            return
 
-    async def _try_send(self, msg):
-        if not self.open:
-            return False
+        self._buffer.append(msg)
+        self._buffered_bytes += len(msg)
+        self._peak_buffer_size = max(self._peak_buffer_size, len(self._buffer))
+        self._peak_buffered_bytes = max(self._peak_buffered_bytes, self._buffered_bytes)
+        self._schedule_drain()
 
-        if self.data_channel.bufferedAmount > DataConnection.MAX_BUFFERED_AMOUNT:
-            self._buffering = True
-            # Note: In Python, we'd typically use a threading.Timer or asyncio for this
-            # For simplicity, we'll use a basic approach here
-            self._buffering = False
-            await self._try_buffer()
-            return False
+        if self._buffered_bytes > self._high_water_mark:
+            # _writable also fires for the channel, so wait until the queue itself is down.
+            while self._buffered_bytes > self._low_water_mark:
+                self._writable.clear()
+                await self._writable.wait()
+
+    def _channel_has_room(self):
+        data_channel = self.data_channel
+        return (
+            self.open
+            and data_channel is not None
+            and data_channel.readyState == "open"
+            and data_channel.bufferedAmount <= self._high_water_mark
+        )
 
+    async def _try_send(self, msg):
         try:
             self.data_channel.send(msg)
         except Exception as e:
             logger.error(f"DC#{self.connection_id} Error when sending: {e}")
-            self._buffering = True
             await self.close()
             return False
 
         return True
 
-    async def _try_buffer(self):
-        if not self.open or not self._buffer:
+    def _schedule_drain(self):
+        if self._buffer and (self._drain_task is None or self._drain_task.done()):
+            self._drain_task = asyncio.create_task(self._drain_buffer())
+
+    async def _drain_buffer(self):
+        buffer = self._buffer
+        while buffer:
+            data_channel = self.data_channel
+            if not self.open or data_channel is None or data_channel.readyState != "open":
+                # Resumed by the data channel's open event.
+                return
+            if data_channel.bufferedAmount > self._high_water_mark:
+                await self._wait_for_buffered_amount(self._low_water_mark)
+                continue
+
+            msg = buffer.popleft()
+            self._buffered_bytes -= len(msg)
+            if self._buffered_bytes <= self._low_water_mark:
+                self._writable.set()
+            if not await self._try_send(msg):
+                return
+
+    async def _wait_for_buffered_amount(self, limit: int, timeout: float = 1.0) -> None:
+        """Wait until the data channel has at most ``limit`` bytes queued.
+
+        Woken through ``_writable`` by the channel's ``bufferedamountlow`` event;
+        ``timeout`` only bounds each wait so a channel that closes meanwhile
+        cannot hang us.
+        """
+        data_channel = self.data_channel
+        if data_channel is None:
             return
+        self._watch_buffered_amount(data_channel)
+        while self.open and data_channel.bufferedAmount > limit:
+            self._writable.clear()
+            try:
+                await asyncio.wait_for(self._writable.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send_batched(self, msg):
+        """Add an encoded message to the current batch, flushing as limits are hit."""
+        size = len(msg) + self._batch_item_overhead
+        if self._batch and self._batch_bytes + size > self._batch_max_bytes:
+            await self._flush_batch()
+        self._batch.append(msg)
+        self._batch_bytes += size
+        if self._batch_bytes >= self._batch_max_bytes:
+            await self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = asyncio.get_running_loop().call_later(
+                self._batch_interval, lambda: asyncio.ensure_future(self._flush_batch())
+            )
 
-        msg = self._buffer[0]
+    async def _flush_batch(self):
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        if not self._batch:
+            return
+        batch = self._batch
+        self._batch = []
+        self._batch_bytes = 0
+        # A lone message needs no batch framing, the remote handles it as usual.
+        await self._buffered_send(batch[0] if len(batch) == 1 else self._frame_batch(batch))
 
-        if await self._try_send(msg):
-            self._buffer.pop(0)
-            self._buffer_size = len(self._buffer)
-            await self._try_buffer()
+    def _frame_batch(self, messages):
+        raise NotImplementedError("_frame_batch must be implemented by serializers supporting batching")
 
     async def close(self, options=None):
         if options and options.get('flush'):
-            self.send({
+            await self.send({
                 "__peerData": {
                     "type": "close"
                 }
             })
+            await self._flush_batch()
             return
 
-        self._buffer = []
-        self._buffer_size = 0
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        self._batch = []
+        self._batch_bytes = 0
+        self._buffer.clear()
+        self._buffered_bytes = 0
+        self._writable.set()
+        self._unwatch_buffered_amount()
+        if self._drain_task is not None and self._drain_task is not asyncio.current_task():
+            self._drain_task.cancel()
+        self._drain_task = None
         await super().close()
\ No newline at end of file
@@ -1,55 +1,126 @@
 from peerjs_py.dataconnection.BufferedConnection.BufferedConnection import BufferedConnection
-from peerjs_py.enums import SerializationType, DataConnectionErrorType, EnumAwareJSONEncoder, ConnectionEventType
+from peerjs_py.dataconnection.BufferedConnection.binaryPackChunker import BinaryPackChunker
+from peerjs_py.dataconnection.BufferedConnection.chunkReassembler import ChunkReassembler
+from peerjs_py.enums import SerializationType, DataConnectionErrorType, ConnectionEventType
+from peerjs_py.json_codec import get_json_codec
 # from peerjs_py.util import util
-import json
 from peerjs_py.logger import logger
 
 from typing import Any, Callable, Dict, Union
 
 CHUNKED_MTU = 16300
+# A batch frame is this prefix, the comma separated messages and _BATCH_SUFFIX.
+_BATCH_PREFIX = b'{"__peerData": {"type": "batch"}, "data": ['
+_BATCH_SUFFIX = b']}'
+# Chunk data travel as latin-1 strings, one character per byte of the encoded
+# payload. Escaping them in the envelope at most doubles ASCII bytes and turns
+# other bytes into \u00XX, so chunks are sized for the worst case.
+_ENVELOPE_OVERHEAD = 128
+_ASCII_CHUNK_SIZE = (CHUNKED_MTU - _ENVELOPE_OVERHEAD) // 2
+_BINARY_CHUNK_SIZE = (CHUNKED_MTU - _ENVELOPE_OVERHEAD) // 6
+
+def _is_chunk(message: Dict[str, Any]) -> bool:
+    """Whether ``message`` has the shape of a chunk envelope, rather than being user data."""
+    return (type(message.get("__peerData")) is int
+            and type(message.get("n")) is int
+            and type(message.get("total")) is int
+            and isinstance(message.get("data"), str))
+
 class Json(BufferedConnection):
     serialization = SerializationType.JSON
+    supports_batching = True
+    supports_chunking = True
+    _batch_item_overhead = 1
 
     def __init__(self, peer_id: str, provider, options):
         super().__init__(peer_id, provider, options)
-        self.encoder = lambda s: s.encode('utf-8')
-        self.decoder = lambda b: b.decode('utf-8')
-        
-        # self.stringify = json.dumps
-        self.stringify = lambda obj: json.dumps(obj, cls=EnumAwareJSONEncoder)
-        self.parse = json.loads
+        # Shared codec picked by the peer's json_codec option, stdlib json by default.
+        self.codec = get_json_codec(options.get('json_codec'))
+        self.stringify = self.codec.dumps
+        self.parse = self.codec.loads
+        self._batch_max_bytes = min(self._batch_max_bytes, CHUNKED_MTU - len(_BATCH_PREFIX) - len(_BATCH_SUFFIX))
+
+        self.chunker = BinaryPackChunker()
+        self._reassembler = ChunkReassembler(
+            _ASCII_CHUNK_SIZE,
+            timeout=options.get('chunkTimeout', ChunkReassembler.DEFAULT_TIMEOUT),
+            max_buffered_bytes=options.get('maxChunkedBytes', ChunkReassembler.DEFAULT_MAX_BUFFERED_BYTES),
+        )
+
+    async def close(self, options=None):
+        await super().close(options)
+        self._reassembler.clear()
 
     async def _handle_data_message(self, data: bytes):
         if isinstance(data, str):
             try:
                 deserialized_data = self.parse(data.strip('"'))
-            except json.JSONDecodeError:
+            except ValueError:
                 # If it's not valid JSON, treat it as a plain string
                 deserialized_data = data.strip('"')
         else:
-            deserialized_data = self.parse(self.decoder(data))
+            deserialized_data = self.parse(data)
 
-        try:
         # PeerJS specific message
-            peer_data = deserialized_data.get("__peerData")
-            if peer_data and peer_data.get("type") == "close":
+        peer_data = deserialized_data.get("__peerData") if isinstance(deserialized_data, dict) else None
+        if isinstance(peer_data, dict):
+            if peer_data.get("type") == "close":
                 await self.close()
                 return
-        except:
-            # logger.error(f"_handle_data_message  no __peerData error: {deserialized_data}")
-            pass
+            if peer_data.get("type") == "batch":
+                await self._handle_batch(deserialized_data["data"])
+                return
+        elif peer_data is not None and _is_chunk(deserialized_data):
+            await self._handle_chunk(deserialized_data)
+            return
         # self.emit(ConnectionEventType.Data.value, deserialized_data)
         self.emit(ConnectionEventType.Data.value, deserialized_data)
 
     async def _send(self, data, _chunked):
-        encoded_data = self.encoder(self.stringify(data))
+        encoded_data = self.codec.encode(data)
         if len(encoded_data) >= CHUNKED_MTU:
-            self.emit_error(
-                DataConnectionErrorType.MessageToBig.value,
-                "Message too big for JSON channel"
-            )
+            # Only peerjs-py peers reassemble JSON chunks.
+            if not self._remote_chunking:
+                self.emit_error(
+                    DataConnectionErrorType.MessageToBig.value,
+                    "Message too big for JSON channel"
+                )
+                return
+            await self._flush_batch()
+            await self._send_chunks(encoded_data)
             return
-        if self.data_channel and self.data_channel.readyState == "open":
-            self.data_channel.send(encoded_data)
-        else:
-            await self._buffered_send(encoded_data)
\ No newline at end of file
+        if self.batching:
+            await self._send_batched(encoded_data)
+            return
+        await self._buffered_send(encoded_data)
+
+    async def _send_chunks(self, encoded_data: bytes):
+        """Send an encoded payload as ``__peerData`` chunk envelopes.
+
+        Envelopes are built one at a time and at most ``chunkWindow`` chunks
+        worth of bytes are left queued on the data channel.
+        """
+        chunk_size = _ASCII_CHUNK_SIZE if encoded_data.isascii() else _BINARY_CHUNK_SIZE
+        window = CHUNKED_MTU * self._chunk_window
+        for chunk in self.chunker.iter_chunks(encoded_data, chunk_size):
+            chunk["data"] = chunk["data"].tobytes().decode('latin-1')
+            await self._wait_for_buffered_amount(window)
+            await self._buffered_send(self.codec.encode(chunk))
+
+    async def _handle_chunk(self, data: Dict[str, Any]):
+        complete_data = self._reassembler.add(
+            data["__peerData"], data["n"], data["total"], data["data"].encode('latin-1')
+        )
+        if complete_data is not None:
+            await self._handle_data_message(complete_data)
+
+    def _frame_batch(self, messages):
+        return _BATCH_PREFIX + b",".join(messages) + _BATCH_SUFFIX
+
+    async def _handle_batch(self, messages):
+        for message in messages:
+            peer_data = message.get("__peerData") if isinstance(message, dict) else None
+            if isinstance(peer_data, dict) and peer_data.get("type") == "close":
+                await self.close()
+                return
+            self.emit(ConnectionEventType.Data.value, message)
\ No newline at end of file
@@ -1,15 +1,67 @@
+import struct
 from enum import Enum
+from peerjs_py.binarypack.binarypack import pack, unpack
 from peerjs_py.dataconnection.BufferedConnection.BufferedConnection import BufferedConnection
+from peerjs_py.dataconnection.BufferedConnection.fileTransfer import FileTransferManager
 from peerjs_py.enums import SerializationType, ConnectionEventType
 
+# File transfer frames: magic, BinaryPack envelope length, envelope, file data.
+FILE_FRAME_MAGIC = b"\x00PJF"
+_FILE_FRAME_HEADER = struct.Struct("!4sI")
+
 class Raw(BufferedConnection):
     serialization = SerializationType.Raw
-        
+
+    def __init__(self, peer_id, provider, options):
+        super().__init__(peer_id, provider, options)
+        self._files = FileTransferManager(self, window=self._chunk_window)
+
+    async def close(self, options=None):
+        await super().close(options)
+        self._files.close()
+
+    async def send_file(self, path, transfer_id=None):
+        """Stream the file at ``path`` to the remote peer, memory-mapped."""
+        return await self._files.send_file(path, transfer_id)
+
+    async def receive_file(self, dest, transfer_id=None, offset=0):
+        """Write the next file the remote peer sends (or ``transfer_id``) to ``dest``."""
+        return await self._files.receive_file(dest, transfer_id, offset)
+
     async def _handle_data_message(self, data):
+        frame = self._file_frame(data) if self._files.active else None
+        if frame is not None:
+            await self._files.handle(*frame)
+            return
         super().emit(ConnectionEventType.Data.value, data)
 
+    @staticmethod
+    def _file_frame(data):
+        """The envelope and file data of ``data`` if it is a well-formed file frame, else None.
+
+        Raw connections share the channel with arbitrary user bytes, so only
+        frames that parse completely are taken out of the data stream.
+        """
+        if not isinstance(data, (bytes, bytearray)) or len(data) < _FILE_FRAME_HEADER.size:
+            return None
+        magic, length = _FILE_FRAME_HEADER.unpack_from(data)
+        start = _FILE_FRAME_HEADER.size
+        if magic != FILE_FRAME_MAGIC or start + length > len(data):
+            return None
+        try:
+            envelope = unpack(data[start:start + length])
+        except ValueError:
+            return None
+        if not isinstance(envelope, dict) or not isinstance(envelope.get("type"), str):
+            return None
+        return envelope, memoryview(data)[start + length:]
+
     async def _send(self, data, _chunked):
-        if self.data_channel and self.data_channel.readyState == "open":
-            self.data_channel.send(data)
-        else:
-            await self._buffered_send(data)
\ No newline at end of file
+        await self._buffered_send(data)
+
+    async def _send_file_frame(self, envelope, data=None):
+        packed = pack(envelope)
+        header = _FILE_FRAME_HEADER.pack(FILE_FRAME_MAGIC, len(packed))
+        # The data channel only takes bytes; join allocates the frame once and copies the data into it once.
+        frame = b"".join((header, packed, data)) if data is not None else header + packed
+        await self._send(frame, True)
@@ -1,4 +1,8 @@
+import asyncio
 import math
+import mmap
+import os
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
 
 CHUNKED_MTU = 16300
 class BinaryPackChunker:
@@ -9,32 +13,106 @@ class BinaryPackChunker:
         self._data_count = 1
 
     def chunk(self, blob):
-        chunks = []
-        size = len(blob)
-        total = math.ceil(size / self.chunked_mtu)
+        return list(self.iter_chunks(blob))
 
-        index = 0
-        start = 0
+    def iter_chunks(self, blob, chunk_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the chunk envelopes for an in-memory blob.
 
-        while start < size:
-            end = min(size, start + self.chunked_mtu)
-            b = blob[start:end]
+        ``blob`` may be anything supporting the buffer protocol (``bytes``,
+        ``bytearray``, ``memoryview``, ``mmap``); chunk data are ``memoryview``
+        slices of it, so no chunk is copied until it is packed. ``chunk_size``
+        defaults to ``chunked_mtu``.
+        """
+        chunk_size = chunk_size or self.chunked_mtu
+        view = memoryview(blob).cast('B')
+        size = len(view)
+        total = math.ceil(size / chunk_size)
+        data_id = self._next_data_id()
 
-            chunk = {
-                "__peerData": self._data_count,
+        for index, start in enumerate(range(0, size, chunk_size)):
+            yield {
+                "__peerData": data_id,
                 "n": index,
-                "data": b,
+                "data": view[start:start + chunk_size],
                 "total": total,
             }
 
-            chunks.append(chunk)
+    async def aiter_chunks(self, source, size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield chunk envelopes for ``source`` while reading it incrementally.
+
+        ``source`` is an in-memory blob, a binary file object (sync or async
+        ``read``), an async iterator or an iterable of byte pieces. The number of
+        chunks travels in every envelope, so ``size`` is required unless it can
+        be taken from the blob or from the remaining length of a regular file.
+        Only one chunk worth of data is held at a time.
+        """
+        if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            for chunk in self.iter_chunks(source):
+                yield chunk
+            return
+
+        if size is None:
+            size = _remaining_size(source)
+        mtu = self.chunked_mtu
+        total = math.ceil(size / mtu)
+        data_id = self._next_data_id()
 
-            start = end
-            index += 1
+        index = 0
+        produced = 0
+        pending = bytearray()
+        async for piece in _read_pieces(source, mtu):
+            produced += len(piece)
+            if produced > size:
+                raise ValueError(f"Source produced more than the announced {size} bytes")
+            if not pending and len(piece) == mtu:
+                yield {"__peerData": data_id, "n": index, "data": piece, "total": total}
+                index += 1
+                continue
+            pending += piece
+            while len(pending) >= mtu:
+                data = bytes(pending[:mtu])
+                del pending[:mtu]
+                yield {"__peerData": data_id, "n": index, "data": data, "total": total}
+                index += 1
+
+        if produced != size:
+            raise ValueError(f"Source produced {produced} bytes, {size} were announced")
+        if pending:
+            yield {"__peerData": data_id, "n": index, "data": bytes(pending), "total": total}
 
+    def _next_data_id(self) -> int:
+        data_id = self._data_count
         self._data_count += 1
+        return data_id
+
+def _remaining_size(source) -> int:
+    try:
+        return os.fstat(source.fileno()).st_size - source.tell()
+    except (AttributeError, OSError, ValueError):
+        pass
+    try:
+        position = source.tell()
+        end = source.seek(0, os.SEEK_END)
+        source.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        raise ValueError("size is required for sources without a known length") from None
 
-        return chunks
+async def _read_pieces(source, piece_size: int) -> AsyncIterator[bytes]:
+    if hasattr(source, "read"):
+        while True:
+            piece = source.read(piece_size)
+            if asyncio.iscoroutine(piece):
+                piece = await piece
+            if not piece:
+                return
+            yield piece
+    elif hasattr(source, "__aiter__"):
+        async for piece in source:
+            yield piece
+    else:
+        for piece in source:
+            yield piece
 
 def concat_array_buffers(bufs):
-    return b''.join(bufs)
\ No newline at end of file
+    return b''.join(bufs)
@@ -0,0 +1,158 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Union
+
+from peerjs_py.logger import logger
+from peerjs_py.dataconnection.BufferedConnection.binaryPackChunker import CHUNKED_MTU
+
+Chunk = Union[bytes, bytearray, memoryview]
+
+class _PartialMessage:
+    __slots__ = ("buffer", "chunk_size", "sized", "total", "received", "count", "size", "last_seen")
+
+    def __init__(self, total: int, chunk_size: int, sized: bool, now: float):
+        self.buffer = bytearray(total * chunk_size)
+        self.chunk_size = chunk_size
+        # False while chunk_size is only a guess, i.e. just the last chunk has arrived.
+        self.sized = sized
+        self.total = total
+        self.received = bytearray((total + 7) // 8)
+        self.count = 0
+        self.size = total * chunk_size
+        self.last_seen = now
+
+class ChunkReassembler:
+    """Reassembles chunked BinaryPack messages in place.
+
+    Each message id gets a single ``bytearray`` of ``total * chunk_size`` bytes
+    and every chunk is copied straight to its offset, whatever order chunks
+    arrive in. A bitmap tracks which chunks have arrived so duplicates are
+    ignored. Partial messages idle for longer than ``timeout`` seconds are
+    dropped, and the oldest partial messages are dropped when a new one would
+    push the total past ``max_buffered_bytes``.
+    """
+
+    DEFAULT_TIMEOUT = 30.0
+    DEFAULT_MAX_BUFFERED_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, chunk_size: int = CHUNKED_MTU, timeout: float = DEFAULT_TIMEOUT,
+                 max_buffered_bytes: int = DEFAULT_MAX_BUFFERED_BYTES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.max_buffered_bytes = max_buffered_bytes
+        self._clock = clock
+        # Ordered by last activity, least recently active first.
+        self._messages: "OrderedDict[int, _PartialMessage]" = OrderedDict()
+        self._buffered_bytes = 0
+        self.evicted = 0
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._buffered_bytes
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def add(self, message_id: int, n: int, total: int, data: Chunk) -> Optional[bytearray]:
+        """Store chunk ``n`` of ``total`` and return the full payload once complete."""
+        now = self._clock()
+        self.evict_expired(now)
+
+        if total == 1:
+            return bytearray(data)
+        if not 0 <= n < total:
+            logger.warning(f"Dropping chunk {n} outside of 0..{total - 1} for message {message_id}")
+            return None
+
+        length = data.nbytes if isinstance(data, memoryview) else len(data)
+        message = self._messages.get(message_id)
+        if message is None:
+            # The sender's chunk size is known from any chunk but the last one.
+            sized = n < total - 1
+            chunk_size = length if sized else max(self.chunk_size, length)
+            message = self._allocate(message_id, total, chunk_size, sized, now)
+            if message is None:
+                return None
+        else:
+            self._messages.move_to_end(message_id)
+            message.last_seen = now
+
+        bit = 1 << (n & 7)
+        if message.received[n >> 3] & bit:
+            return None
+        if n < total - 1 and not message.sized:
+            if length != message.chunk_size and not self._resize(message_id, message, length):
+                return None
+            message.sized = True
+        start = n * message.chunk_size
+        if (n < total - 1 and length != message.chunk_size) or start + length > len(message.buffer):
+            logger.warning(f"Dropping message {message_id}: chunk {n} has unexpected size {length}")
+            self._discard(message_id)
+            return None
+
+        message.buffer[start:start + length] = data
+        message.received[n >> 3] |= bit
+        message.count += 1
+        if n == total - 1:
+            message.size = start + length
+
+        if message.count < total:
+            return None
+        self._discard(message_id)
+        buffer = message.buffer
+        # Shrinking a bytearray only trims its length, it does not copy the payload.
+        del buffer[message.size:]
+        return buffer
+
+    def evict_expired(self, now: Optional[float] = None) -> None:
+        now = self._clock() if now is None else now
+        while self._messages:
+            message_id, message = next(iter(self._messages.items()))
+            if now - message.last_seen < self.timeout:
+                break
+            logger.warning(f"Dropping message {message_id}: timed out with {message.count}/{message.total} chunks")
+            self._discard(message_id)
+            self.evicted += 1
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._buffered_bytes = 0
+
+    def _allocate(self, message_id: int, total: int, chunk_size: int, sized: bool,
+                  now: float) -> Optional[_PartialMessage]:
+        needed = total * chunk_size
+        if needed > self.max_buffered_bytes:
+            logger.warning(f"Dropping message {message_id}: {needed} bytes exceeds the reassembly budget")
+            return None
+        while self._messages and self._buffered_bytes + needed > self.max_buffered_bytes:
+            oldest_id = next(iter(self._messages))
+            logger.warning(f"Dropping message {oldest_id}: reassembly budget exceeded")
+            self._discard(oldest_id)
+            self.evicted += 1
+        message = _PartialMessage(total, chunk_size, sized, now)
+        self._messages[message_id] = message
+        self._buffered_bytes += needed
+        return message
+
+    def _resize(self, message_id: int, message: _PartialMessage, chunk_size: int) -> bool:
+        """Lay out ``message`` for ``chunk_size``, moving the last chunk that arrived first."""
+        last = message.total - 1
+        tail = message.buffer[last * message.chunk_size:message.size]
+        needed = message.total * chunk_size
+        if len(tail) > chunk_size or self._buffered_bytes - len(message.buffer) + needed > self.max_buffered_bytes:
+            logger.warning(f"Dropping message {message_id}: chunks of {chunk_size} bytes do not fit")
+            self._discard(message_id)
+            return False
+        buffer = bytearray(needed)
+        start = last * chunk_size
+        buffer[start:start + len(tail)] = tail
+        self._buffered_bytes += needed - len(message.buffer)
+        message.buffer = buffer
+        message.chunk_size = chunk_size
+        message.size = start + len(tail)
+        return True
+
+    def _discard(self, message_id: int) -> None:
+        message = self._messages.pop(message_id)
+        self._buffered_bytes -= len(message.buffer)
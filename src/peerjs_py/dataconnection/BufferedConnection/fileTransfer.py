@@ -0,0 +1,208 @@
+import asyncio
+import mmap
+import os
+from typing import Any, Dict, Optional
+
+from peerjs_py.enums import ConnectionEventType
+from peerjs_py.logger import logger
+from peerjs_py.utils.random_token import random_token
+from peerjs_py.dataconnection.BufferedConnection.binaryPackChunker import CHUNKED_MTU
+
+# Leaves room for the envelope so a packed file frame stays within one chunk.
+FILE_PIECE_SIZE = CHUNKED_MTU - 256
+
+class FileTransferError(Exception):
+    pass
+
+class _IncomingFile:
+    def __init__(self, transfer_id: str, dest: str, size: int, offset: int, done: asyncio.Future):
+        self.transfer_id = transfer_id
+        self.dest = dest
+        self.size = size
+        self.received = offset
+        self.done = done
+        self._file = open(dest, "r+b" if offset else "w+b")
+        self._file.truncate(size)
+        # mmap refuses empty files, there is nothing to write for those anyway.
+        self._map = mmap.mmap(self._file.fileno(), size) if size else None
+
+    def write(self, offset: int, data) -> None:
+        end = offset + len(data)
+        if end > self.size:
+            raise FileTransferError(f"File data at {offset}..{end} is past the announced size {self.size}")
+        self._map[offset:end] = data
+        if offset == self.received:
+            self.received = end
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+class FileTransferManager:
+    """Memory-mapped file transfer over a data connection.
+
+    The sender announces a transfer, the receiver answers with the offset to
+    start from (non-zero when resuming), then the file is streamed from an
+    ``mmap`` of the source in pieces written straight into an ``mmap`` of the
+    preallocated destination. Neither side holds more than the data channel's
+    send window in memory.
+
+    The connection provides ``_send_file_frame(envelope, data)`` to frame the
+    messages; incoming frames are passed to ``handle``.
+    """
+
+    def __init__(self, connection, window: int = 64, accept_timeout: float = 30.0):
+        self.connection = connection
+        self.window = window
+        self.accept_timeout = accept_timeout
+        self._expected: Dict[Optional[str], Dict[str, Any]] = {}
+        self._incoming: Dict[str, _IncomingFile] = {}
+        self._accepts: Dict[str, asyncio.Future] = {}
+
+    @property
+    def active(self) -> bool:
+        """Whether a transfer is expected, being accepted or in progress on this connection."""
+        return bool(self._expected or self._incoming or self._accepts)
+
+    async def send_file(self, path: str, transfer_id: Optional[str] = None) -> int:
+        """Send the file at ``path``; returns the number of bytes streamed."""
+        connection = self.connection
+        transfer_id = transfer_id or random_token()
+        size = os.path.getsize(path)
+
+        accepted = asyncio.get_running_loop().create_future()
+        self._accepts[transfer_id] = accepted
+        try:
+            await connection._send_file_frame({
+                "type": "file", "id": transfer_id, "name": os.path.basename(path), "size": size,
+            })
+            offset = await asyncio.wait_for(accepted, self.accept_timeout)
+        except asyncio.TimeoutError:
+            raise FileTransferError(f"Transfer {transfer_id} was not accepted within {self.accept_timeout}s") from None
+        finally:
+            self._accepts.pop(transfer_id, None)
+
+        if not 0 <= offset <= size:
+            raise FileTransferError(f"Receiver asked to resume {transfer_id} at invalid offset {offset}")
+
+        if offset < size:
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                await self._stream(transfer_id, mapped, offset, size)
+
+        await connection._send_file_frame({"type": "file-end", "id": transfer_id})
+        return size - offset
+
+    async def _stream(self, transfer_id: str, mapped: mmap.mmap, offset: int, size: int) -> None:
+        connection = self.connection
+        limit = CHUNKED_MTU * self.window
+        view = memoryview(mapped)
+        try:
+            for start in range(offset, size, FILE_PIECE_SIZE):
+                if not connection.open:
+                    raise FileTransferError(f"Connection closed while sending {transfer_id}")
+                await connection._wait_for_buffered_amount(limit)
+                piece = view[start:start + FILE_PIECE_SIZE]
+                await connection._send_file_frame({"type": "file-data", "id": transfer_id, "offset": start}, piece)
+                piece.release()
+                connection.emit(ConnectionEventType.FileProgress.value, {
+                    "id": transfer_id, "direction": "send", "transferred": min(start + FILE_PIECE_SIZE, size), "size": size,
+                })
+        finally:
+            view.release()
+
+    async def receive_file(self, dest: str, transfer_id: Optional[str] = None, offset: int = 0) -> str:
+        """Receive the next announced file (or ``transfer_id``) into ``dest``.
+
+        Must be called before the sender announces the transfer. A non-zero
+        ``offset`` resumes an interrupted transfer into an existing ``dest``.
+        Returns ``dest`` once every byte has been written.
+        """
+        done = asyncio.get_running_loop().create_future()
+        self._expected[transfer_id] = {"dest": dest, "offset": offset, "done": done}
+        try:
+            return await done
+        finally:
+            if self._expected.get(transfer_id, {}).get("done") is done:
+                del self._expected[transfer_id]
+
+    async def handle(self, envelope: Dict[str, Any], data=None) -> None:
+        message_type = envelope.get("type")
+        transfer_id = envelope.get("id")
+
+        if message_type == "file-data":
+            incoming = self._incoming.get(transfer_id)
+            if incoming is None:
+                return
+            try:
+                incoming.write(envelope["offset"], data)
+            except Exception as error:
+                self._finish(incoming, error)
+                return
+            self.connection.emit(ConnectionEventType.FileProgress.value, {
+                "id": transfer_id, "direction": "receive", "transferred": incoming.received, "size": incoming.size,
+            })
+        elif message_type == "file":
+            await self._start_incoming(envelope)
+        elif message_type == "file-end":
+            incoming = self._incoming.get(transfer_id)
+            if incoming is None:
+                return
+            if incoming.received != incoming.size:
+                self._finish(incoming, FileTransferError(
+                    f"Transfer {transfer_id} ended after {incoming.received} of {incoming.size} bytes"))
+            else:
+                self._finish(incoming)
+        elif message_type in ("file-accept", "file-reject"):
+            accepted = self._accepts.get(transfer_id)
+            if accepted is None or accepted.done():
+                return
+            if message_type == "file-accept":
+                accepted.set_result(envelope.get("offset", 0))
+            else:
+                accepted.set_exception(FileTransferError(f"Transfer {transfer_id} rejected: {envelope.get('reason')}"))
+        else:
+            logger.warning(f"DC#{self.connection.connection_id} Unknown file transfer message: {message_type}")
+
+    async def _start_incoming(self, envelope: Dict[str, Any]) -> None:
+        transfer_id = envelope["id"]
+        expected = self._expected.pop(transfer_id, None) or self._expected.pop(None, None)
+        if expected is None:
+            logger.warning(f"DC#{self.connection.connection_id} Rejecting unexpected file transfer {transfer_id}")
+            await self.connection._send_file_frame({"type": "file-reject", "id": transfer_id, "reason": "not-expected"})
+            return
+
+        try:
+            offset = min(expected["offset"], envelope["size"])
+            incoming = _IncomingFile(transfer_id, expected["dest"], envelope["size"], offset, expected["done"])
+        except Exception as error:
+            expected["done"].set_exception(error)
+            await self.connection._send_file_frame({"type": "file-reject", "id": transfer_id, "reason": str(error)})
+            return
+
+        self._incoming[transfer_id] = incoming
+        await self.connection._send_file_frame({"type": "file-accept", "id": transfer_id, "offset": offset})
+
+    def _finish(self, incoming: _IncomingFile, error: Optional[Exception] = None) -> None:
+        self._incoming.pop(incoming.transfer_id, None)
+        incoming.close()
+        if incoming.done.done():
+            return
+        if error is None:
+            incoming.done.set_result(incoming.dest)
+        else:
+            incoming.done.set_exception(error)
+
+    def close(self) -> None:
+        error = FileTransferError("Connection closed")
+        for incoming in list(self._incoming.values()):
+            self._finish(incoming, error)
+        for expected in self._expected.values():
+            if not expected["done"].done():
+                expected["done"].set_exception(error)
+        self._expected.clear()
+        for accepted in self._accepts.values():
+            if not accepted.done():
+                accepted.set_exception(error)
@@ -5,7 +5,7 @@ from peerjs_py.base_connection import BaseConnection
 from peerjs_py.negotiator import Negotiator
 from peerjs_py.utils.random_token import random_token
 from peerjs_py.enums import ServerMessageType, ConnectionType, ConnectionEventType, DataConnectionErrorType, SerializationType
-from peerjs_py.logger import logger
+from peerjs_py.logger import logger, lazy, preview, Sampler, TRACE, TRACE_SAMPLE
 import logging
 
 class DataConnection(BaseConnection):
@@ -18,11 +18,20 @@ class DataConnection(BaseConnection):
         self.label = options.get('label') or self.connection_id
         self.reliable = bool(options.get('reliable'))
         self.serialization = options.get('serialization', SerializationType.JSON)
+        # Protocol extensions the remote peer advertised during negotiation.
+        self._remote_batching = bool((options.get('_payload') or {}).get('batching'))
+        self._remote_chunking = bool((options.get('_payload') or {}).get('chunking'))
         self._negotiator = Negotiator(self)
         self._open = False
+        self._closed = False
         self.open_future = asyncio.Future()
         self.data_channel = None
         self.peer_connection = None
+        # Set when the peer connection is shared with other connections to the same peer.
+        self._transport = None
+        # Thin out the per-message trace points.
+        self._trace_received = Sampler(TRACE_SAMPLE)
+        self._trace_sent = Sampler(TRACE_SAMPLE)
 
     async def initialize(self):
         await self._negotiator.start_connection(
@@ -54,7 +63,8 @@ class DataConnection(BaseConnection):
 
         @self.data_channel.on("message")
         async def on_message(msg):
-            logger.info(f"DC#{self.connection_id} Received message: {msg}")
+            if TRACE and self._trace_received():
+                logger.debug("DC#%s Received message: %s", self.connection_id, lazy(preview, msg))
             await self._handle_data_message(msg)
 
         @self.data_channel.on("close")
@@ -64,7 +74,7 @@ class DataConnection(BaseConnection):
 
         @self.data_channel.on("statechange")
         async def on_statechange():
-            logger.debug(f"DC#{self.connection_id} DataChannel state changed to: {self._dc.readyState}")
+            logger.debug("DC#%s DataChannel state changed to: %s", self.connection_id, self.data_channel.readyState if self.data_channel else None)
 
         logger.info(f"DC#{self.connection_id} Data channel initialized")
 
@@ -77,7 +87,17 @@ class DataConnection(BaseConnection):
             })
             return
 
-        if self._negotiator:
+        transport, self._transport = self._transport, None
+        if transport is not None:
+            # Only this connection's stream goes away, unless it is the last
+            # one on the shared peer connection.
+            if self.data_channel:
+                self.data_channel.close()
+            self._negotiator = None
+            self.peer_connection = None
+            if transport.release(self):
+                await transport.close()
+        elif self._negotiator:
             await self._negotiator.cleanup()
             self._negotiator = None
 
@@ -89,9 +109,11 @@ class DataConnection(BaseConnection):
             self.data_channel.remove_all_listeners()
             self.data_channel = None
 
-        if not self._open:
+        # Emitted once, also for a connection that closes before it opened,
+        # so whoever waits for it to open learns that it never will.
+        if self._closed:
             return
-
+        self._closed = True
         self._open = False
         super().emit(ConnectionEventType.Close.value)
 
@@ -106,6 +128,8 @@ class DataConnection(BaseConnection):
                 "Connection is not open. You should listen for the `open` event before sending messages."
             )
             return
+        if TRACE and self._trace_sent():
+            logger.debug("DC#%s Sending message: %s", self.connection_id, lazy(preview, data))
         return await self._send(data, chunked)
 
     async def _send(self, data: Any, chunked: bool):
@@ -119,9 +143,11 @@ class DataConnection(BaseConnection):
 
         if message['type'] == ServerMessageType.Answer.value:
             logger.info(f"DC#{self.connection_id} Received ANSWER from {self.peer}")
+            self._remote_batching = bool(payload.get('batching'))
+            self._remote_chunking = bool(payload.get('chunking'))
             await self._negotiator.handle_sdp(message['type'], payload['sdp'])
         elif message['type'] == ServerMessageType.Candidate.value:
-            logger.info(f"DC#{self.connection_id} Received ICE candidate from {self.peer}")
+            logger.debug("DC#%s Received ICE candidate from %s", self.connection_id, self.peer)
             await self._negotiator.handle_candidate(payload['candidate'])
         elif message['type'] == ServerMessageType.Offer.value:
             received_connection_id = payload.get('connectionId')
@@ -0,0 +1,63 @@
+from typing import Any, Callable, Optional, Set
+
+from aiortc import RTCPeerConnection
+
+from peerjs_py.logger import logger
+
+# Data channel protocol of channels opened on an existing peer connection.
+# Their label carries the JSON descriptor of the DataConnection (connection
+# ID, label, serialization, reliability, metadata), so the remote peer sets
+# up its end in-band, without another round of signaling.
+MUX_PROTOCOL = "peerjs-mux"
+
+
+class SharedTransport:
+    """An RTCPeerConnection shared by the data connections to one remote peer.
+
+    The connection that negotiated the peer connection and every connection
+    multiplexed onto it as an extra SCTP stream hold a reference; closing a
+    connection only closes its own data channel, and the peer connection is
+    closed together with the last one.
+    """
+
+    def __init__(self, peer_id: str, peer_connection: RTCPeerConnection,
+                 on_closed: Optional[Callable[["SharedTransport"], Any]] = None):
+        self.peer = peer_id
+        self.peer_connection = peer_connection
+        self._connections: Set[Any] = set()
+        self._on_closed = on_closed
+        self.closed = False
+
+    @property
+    def refcount(self) -> int:
+        return len(self._connections)
+
+    @property
+    def usable(self) -> bool:
+        """Whether new channels can be opened: the SCTP transport is up."""
+        return (not self.closed
+                and self.peer_connection.connectionState == "connected"
+                and self.peer_connection.sctp is not None)
+
+    def attach(self, connection) -> None:
+        connection.peer_connection = self.peer_connection
+        connection._transport = self
+        self._connections.add(connection)
+
+    def release(self, connection) -> bool:
+        """Drop ``connection``'s reference; returns True if it was the last one."""
+        self._connections.discard(connection)
+        return not self._connections
+
+    async def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._connections.clear()
+        if self._on_closed is not None:
+            self._on_closed(self)
+        logger.info("Closing shared peer connection to %s", self.peer)
+        await self.peer_connection.close()
+
+    def __repr__(self) -> str:
+        return f"<SharedTransport peer={self.peer} refcount={len(self._connections)}>"
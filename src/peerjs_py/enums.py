@@ -10,6 +10,7 @@ class ConnectionEventType(Enum):
     Close = "close"
     Error = "error"
     IceStateChanged = "iceStateChanged"
+    FileProgress = "fileProgress"
 
 
 class ConnectionType(Enum):
@@ -66,6 +67,8 @@ class SocketEventType(Enum):
     Disconnected = "disconnected"
     Error = "error"
     Close = "close"
+    Reconnecting = "reconnecting"
+    Reconnected = "reconnected"
 
 class ServerMessageType(Enum):
     Heartbeat = "HEARTBEAT"
@@ -0,0 +1,96 @@
+import asyncio
+import heapq
+import itertools
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from peerjs_py.logger import logger
+
+
+class HeartbeatScheduler:
+    """One timer for the heartbeats of every Socket on an event loop.
+
+    Sockets are kept in a heap by the time their next heartbeat is due, and a
+    single timer handle is armed for the earliest one. When it fires, every
+    socket due within ``RESOLUTION`` seconds is handled in the same pass: its
+    ``_on_heartbeat(now)`` returns the loop time it wants to be called at
+    next, or None to leave the schedule. Removal is lazy: entries of a socket
+    that was removed or re-added are skipped when they come up.
+    """
+
+    RESOLUTION = 0.05
+
+    _schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, HeartbeatScheduler]" = \
+        weakref.WeakKeyDictionary()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = 0.0
+        # Current schedule of each socket, by sequence number of its heap entry.
+        self._sockets: Dict[Any, int] = {}
+
+    @classmethod
+    def for_loop(cls, loop: Optional[asyncio.AbstractEventLoop] = None) -> "HeartbeatScheduler":
+        loop = loop or asyncio.get_running_loop()
+        scheduler = cls._schedulers.get(loop)
+        if scheduler is None:
+            scheduler = cls._schedulers[loop] = cls(loop)
+        return scheduler
+
+    def __len__(self) -> int:
+        return len(self._sockets)
+
+    def add(self, socket, when: float) -> None:
+        """Call ``socket._on_heartbeat`` at loop time ``when``, replacing any earlier schedule."""
+        seq = next(self._seq)
+        self._sockets[socket] = seq
+        heapq.heappush(self._heap, (when, seq, socket))
+        self._arm()
+
+    def remove(self, socket) -> None:
+        self._sockets.pop(socket, None)
+        if not self._sockets:
+            self._heap.clear()
+            self._cancel()
+
+    def _arm(self) -> None:
+        if not self._heap:
+            self._cancel()
+            return
+        when = self._heap[0][0]
+        if self._timer is not None and self._timer_at <= when:
+            return
+        self._cancel()
+        self._timer_at = when
+        self._timer = self._loop.call_at(when, self._run)
+
+    def _cancel(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _run(self) -> None:
+        self._timer = None
+        now = self._loop.time()
+        heap = self._heap
+        rescheduled = []
+        while heap and heap[0][0] <= now + self.RESOLUTION:
+            _, seq, socket = heapq.heappop(heap)
+            if self._sockets.get(socket) != seq:
+                continue
+            try:
+                when = socket._on_heartbeat(now)
+            except Exception:
+                logger.exception("Heartbeat of %r failed", socket)
+                when = None
+            if when is None:
+                del self._sockets[socket]
+            else:
+                # Pushed after the pass, so each socket is served once per pass.
+                rescheduled.append((max(when, now + self.RESOLUTION), seq, socket))
+        for entry in rescheduled:
+            heapq.heappush(heap, entry)
+        self._arm()
@@ -0,0 +1,98 @@
+import json
+from enum import Enum
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from peerjs_py.logger import logger
+
+
+def _enum_value(obj: Any) -> Any:
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JsonCodec:
+    """Standard library JSON codec.
+
+    A single encoder instance is built once and reused for every message,
+    instead of instantiating an encoder class per ``json.dumps`` call.
+    Enums are encoded as their value.
+    """
+
+    name = "json"
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(default=_enum_value)
+        self._decoder = json.JSONDecoder()
+
+    def dumps(self, obj: Any) -> str:
+        return self._encoder.encode(obj)
+
+    def encode(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj).encode('utf-8')
+
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        if not isinstance(data, str):
+            data = data.decode('utf-8')
+        return self._decoder.decode(data)
+
+
+class OrjsonCodec:
+    """``orjson`` backed codec; orjson encodes Enums natively.
+
+    Output is compact (no spaces after separators) and UTF-8 rather than
+    ASCII-escaped; any JSON parser reads it the same way.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> str:
+        return orjson.dumps(obj, option=self._options).decode('utf-8')
+
+    def encode(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, option=self._options)
+
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        return orjson.loads(data)
+
+
+_CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+}
+_instances = {}
+
+
+def get_json_codec(codec: Any = None):
+    """Resolve the ``json_codec`` option to a codec instance.
+
+    ``codec`` is a codec name (``"json"``, ``"orjson"``), ``"auto"`` for orjson
+    when it is installed and the standard library otherwise, an object with
+    ``dumps``, ``encode`` and ``loads`` methods, or ``None`` for ``"json"``.
+    """
+    if codec is None:
+        codec = "json"
+    elif codec == "auto":
+        codec = "orjson" if orjson is not None else "json"
+    elif not isinstance(codec, str):
+        if not all(callable(getattr(codec, method, None)) for method in ("dumps", "encode", "loads")):
+            raise TypeError("A JSON codec must provide dumps, encode and loads")
+        return codec
+
+    if codec not in _CODECS:
+        raise ValueError(f"Unknown JSON codec: {codec}")
+    instance = _instances.get(codec)
+    if instance is None:
+        instance = _instances[codec] = _CODECS[codec]()
+        logger.debug(f"Using {codec} JSON codec")
+    return instance
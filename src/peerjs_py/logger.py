@@ -1,10 +1,23 @@
 import logging
+import os
 from enum import IntEnum
 from functools import wraps
 import traceback
 
 LOG_PREFIX = "PeerJS: "
 
+# Per-message trace points are written as
+#
+#     if TRACE and self._trace_received():
+#         logger.debug("DC#%s Received message: %s", connection_id, lazy(preview, message))
+#
+# so with tracing off (the default) they cost a single global lookup, and no
+# argument is evaluated or formatted. Set PEERJS_TRACE=1 to enable them, and
+# PEERJS_TRACE_SAMPLE=N to log only one message in N per trace point.
+TRACE = os.environ.get("PEERJS_TRACE", "") not in ("", "0")
+TRACE_SAMPLE = max(int(os.environ.get("PEERJS_TRACE_SAMPLE") or 1), 1)
+PREVIEW_LENGTH = 200
+
 class LogLevel(IntEnum):
     Disabled = 0
     Errors = 1
@@ -48,11 +61,58 @@ def setup_logger(name=__name__, log_level=LogLevel.Disabled):
     logger.catch = catch
     return logger
 
+class lazy:
+    """Log argument computed only if the record is actually formatted.
+
+    ``logger.debug("state %s", lazy(describe, connection))`` never calls
+    ``describe`` while debug logging is off.
+    """
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+    def __repr__(self):
+        return repr(self.func(*self.args))
+
+class Sampler:
+    """Lets one call in ``every`` through, to thin out per-message log lines.
+
+    ``if sampler(): logger.debug(...)``; the first call always passes.
+    """
+
+    __slots__ = ("every", "_countdown")
+
+    def __init__(self, every: int):
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.every = every
+        self._countdown = 0
+
+    def __call__(self) -> bool:
+        if self._countdown:
+            self._countdown -= 1
+            return False
+        self._countdown = self.every - 1
+        return True
+
+def preview(value, limit: int = PREVIEW_LENGTH) -> str:
+    """``repr`` of a message, cut to ``limit`` characters."""
+    text = repr(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text)} chars)"
+
 # Create a default logger instance
 logger = setup_logger()
 
 # Usage example:
-# logger.debug('API options: %s', options)
+# logger.debug('API options: %s', options)  # %-style arguments are only formatted when emitted
 # logger.warning('This is a warning')
 # logger.error('This is an error')
 # 
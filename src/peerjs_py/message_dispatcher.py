@@ -0,0 +1,83 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable
+
+from peerjs_py.logger import logger
+
+
+def connection_key(message: Any) -> Hashable:
+    """Dispatch key of a signaling message: its connection ID, or None for server messages."""
+    payload = message.get('payload') if isinstance(message, dict) else None
+    return payload.get('connectionId') if isinstance(payload, dict) else None
+
+
+class MessageDispatcher:
+    """Runs a handler for each signaling message, in order per key and concurrently across keys.
+
+    Every key gets a FIFO lane that is drained by a worker task, started when
+    the first message for the key arrives and ended once the lane is empty.
+    A slow handler, such as an answer negotiation waiting for ICE, only holds
+    up later messages of its own connection.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]],
+                 key: Callable[[Any], Hashable] = connection_key):
+        self._handler = handler
+        self._key = key
+        self._lanes: Dict[Hashable, Deque[Any]] = {}
+        self._workers: Dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def active(self) -> int:
+        """Number of keys with a message being handled."""
+        return len(self._workers)
+
+    @property
+    def pending(self) -> int:
+        """Number of messages waiting behind the ones being handled."""
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def dispatch(self, message: Any) -> None:
+        key = self._key(message)
+        lane = self._lanes.get(key)
+        if lane is not None:
+            lane.append(message)
+            return
+        lane = self._lanes[key] = deque((message,))
+        self._workers[key] = asyncio.get_running_loop().create_task(self._drain(key, lane))
+
+    async def _drain(self, key: Hashable, lane: Deque[Any]) -> None:
+        try:
+            while lane:
+                message = lane.popleft()
+                try:
+                    await self._handler(message)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Error handling signaling message for %s", key)
+        finally:
+            # No await between the last check of the lane and this point, so
+            # nothing can be appended to a lane that is being dropped.
+            if self._lanes.get(key) is lane:
+                del self._lanes[key]
+                del self._workers[key]
+
+    async def join(self) -> None:
+        """Wait until every dispatched message has been handled."""
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+    def close(self) -> None:
+        """Drop queued messages and cancel running handlers, except the calling one."""
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            current = None
+        for key, worker in list(self._workers.items()):
+            if worker is current:
+                self._lanes[key].clear()
+            else:
+                worker.cancel()
+                del self._lanes[key]
+                del self._workers[key]
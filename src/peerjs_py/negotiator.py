@@ -1,10 +1,14 @@
 from typing import Any, Dict, Optional, Union, List
 import asyncio
+import time
 from aiortc import RTCPeerConnection, RTCSessionDescription, RTCIceCandidate, MediaStreamTrack, RTCDataChannel
 
 from aiortc.sdp import candidate_from_sdp, candidate_to_sdp
 from peerjs_py.enums import ConnectionType, ServerMessageType, BaseConnectionErrorType, PeerErrorType
 from peerjs_py.logger import logger
+from peerjs_py.dataconnection.SharedTransport import MUX_PROTOCOL
+from peerjs_py.certificates import CertificateStore
+import contextlib
 import logging
 # from .mediaconnection import MediaConnection
 # from .dataconnection.DataConnection import DataConnection
@@ -12,13 +16,36 @@ import logging
 class Negotiator:
     def __init__(self, connection):
         self.connection = connection
+        # Kept for channels multiplexed onto the peer connection after this
+        # connection itself closed (see SharedTransport).
+        self._provider = connection.provider
         self.ice_gathering_complete = asyncio.Event()
         self.local_description_set = asyncio.Event()
         self.offer_answer_sent = False
         self.connection_established = False
+        # Trickle ICE: send the SDP as soon as the local description is set and
+        # apply remote candidates as they arrive. Without it the SDP waits for
+        # the icegatheringstatechange event ("full gather").
+        self.trickle = bool((getattr(connection, 'options', None) or {}).get('trickleIce', True))
+        # Remote candidates received before the remote description.
+        self._pending_candidates: List[Optional[RTCIceCandidate]] = []
+        self._started_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+
+    def _mark(self, stage: str) -> None:
+        """Record when a setup stage was reached, in ms since start_connection."""
+        if self._started_at is not None and stage not in self.timings:
+            self.timings[stage] = (time.perf_counter() - self._started_at) * 1000
+
+    @property
+    def setup_latency(self) -> Optional[float]:
+        """Milliseconds from start_connection until the peer connection was connected."""
+        return self.timings.get("connected")
 
     async def start_connection(self, options: Dict[str, Any]) -> None:
         logger.info(f"Starting connection for {self.connection.connection_id}")
+        self._started_at = time.perf_counter()
+        self.timings = {}
         peer_connection:RTCPeerConnection = await self._start_peer_connection()
         self.connection.peer_connection = peer_connection
 
@@ -30,7 +57,7 @@ class Negotiator:
             logger.info(f"Adding tracks to connection for {self.connection.connection_id}")
             self._add_tracks_to_connection(options['_stream'], peer_connection)
 
-        logger.debug(f"start_connection => options: {options}")
+        logger.debug("start_connection => options: %s", options)
         if options.get('originator'):
             if not self.connection.data_channel:
                 logger.info(f"Creating data channel for {self.connection.connection_id}")
@@ -62,9 +89,11 @@ class Negotiator:
                 return self.connection.peer_connection
             
         logger.info("Creating a new peer_connection RTCPeerConnection ")
-        peer_connection: RTCPeerConnection = RTCPeerConnection(
-            configuration=self.connection.provider._options.get('config')
-        )
+        certificates = getattr(self.connection.provider, '_certificate_store', None)
+        with certificates.use() if isinstance(certificates, CertificateStore) else contextlib.nullcontext():
+            peer_connection: RTCPeerConnection = RTCPeerConnection(
+                configuration=self.connection.provider._options.get('config')
+            )
         if peer_connection.connectionState in ['closed', 'failed']:
             logger.info("new peer_connection peer connection is closed or failed: {peer_connection.connectionState }")
         else:
@@ -79,6 +108,9 @@ class Negotiator:
         peer_id = self.connection.peer
         connection_id = self.connection.connection_id
         provider = self.connection.provider
+        if channel.protocol == MUX_PROTOCOL:
+            await self._provider._accept_multiplexed_channel(self.connection, self._peer_connection, channel)
+            return
         logger.info(f"Received data channel: for self.connection.connection_id: {self.connection.connection_id}")
         connection = provider.get_connection(peer_id, connection_id)
         if connection:
@@ -105,6 +137,9 @@ class Negotiator:
         connection_id = self.connection.connection_id
         connection_type = self.connection.type
         provider = self.connection.provider
+        # Kept past cleanup of the connection: channels multiplexed onto a shared
+        # peer connection keep arriving here after it closed.
+        self._peer_connection = peer_connection
 
         logger.info("Listening for data channel iceconnectionstatechange")
         @peer_connection.on("iceconnectionstatechange")
@@ -151,7 +186,11 @@ class Negotiator:
         @peer_connection.on("connectionstatechange")
         async def on_connection_state_change():
             logger.info(f"Connection state changed to: {peer_connection.connectionState} peer_id:{peer_id}")
-            if peer_connection.connectionState == "failed":
+            if peer_connection.connectionState == "connected":
+                self._mark("connected")
+                logger.info("Connection %s set up in %.1f ms (trickle=%s): %s",
+                            self.connection.connection_id, self.timings["connected"], self.trickle, self.timings)
+            elif peer_connection.connectionState == "failed":
                 await peer_connection.close()
                 # pcs.discard(pc)
             self.connection.emit("connectionStateChanged", peer_connection.connectionState)
@@ -161,8 +200,10 @@ class Negotiator:
             logger.info(f"ICE gathering state changed to: {peer_connection.iceGatheringState} peer_id:{self.connection.peer}")
             self.connection.emit("iceGatheringStateChanged", peer_connection.iceGatheringState)
             if peer_connection.iceGatheringState == "complete":
+                self._mark("gathered")
                 self.ice_gathering_complete.set()
-                asyncio.create_task(self._try_send_offer_or_answer())
+                if not self.trickle:
+                    asyncio.create_task(self._try_send_offer_or_answer())
 
     async def cleanup(self) -> None:
         logger.info(f"Cleaning up PeerConnection to {self.connection.peer}")
@@ -215,7 +256,7 @@ class Negotiator:
             )
 
             logger.info("_make_offer: Offer created successfully.")
-            logger.debug(f"Offer SDP: {offer.sdp}")
+            logger.debug("Offer SDP: %s", offer.sdp)
 
             if (
                 self.connection.options.get('sdpTransform')
@@ -225,8 +266,9 @@ class Negotiator:
 
             logger.info("Attempting to set local description.")
             await peer_connection.setLocalDescription(offer)
+            self._mark("local_description")
             self.local_description_set.set()
-            logger.info(f"Set localDescription: {offer} for: {self.connection.peer}")
+            logger.info("Set localDescription: %s for: %s", offer.type, self.connection.peer)
 
             await self._try_send_offer_or_answer()
 
@@ -239,6 +281,7 @@ class Negotiator:
         logger.info("Creating answer")
         answer = await self.connection.peer_connection.createAnswer()
         await self.connection.peer_connection.setLocalDescription(answer)
+        self._mark("local_description")
         self.local_description_set.set()
         logger.info("Local description set for ANSWER")
         # The actual sending of the answer will be triggered by the icegatheringstatechange event
@@ -250,7 +293,10 @@ class Negotiator:
         if self.offer_answer_sent:
             return
 
-        await asyncio.gather(self.local_description_set.wait(), self.ice_gathering_complete.wait())
+        if self.trickle:
+            await self.local_description_set.wait()
+        else:
+            await asyncio.gather(self.local_description_set.wait(), self.ice_gathering_complete.wait())
         
         if not self.offer_answer_sent:
             self.offer_answer_sent = True
@@ -288,15 +334,23 @@ class Negotiator:
                 "reliable": data_connection.reliable,
                 "serialization": data_connection.serialization,
             })
+            if getattr(data_connection, "supports_batching", False):
+                payload["batching"] = True
+            if getattr(data_connection, "supports_chunking", False):
+                payload["chunking"] = True
+            # Channels multiplexed onto this peer connection are accepted.
+            payload["multiplex"] = True
 
         message_type = ServerMessageType.Offer if local_description.type == "offer" else ServerMessageType.Answer
-        logger.info(f"_send_offer_or_answer Sending {message_type.value} with payload: {payload}")
+        logger.info("_send_offer_or_answer Sending %s to %s", message_type.value, self.connection.peer)
+        logger.debug("_send_offer_or_answer payload: %s", payload)
         
         await provider._socket.send({
             "type": message_type.value,
             "payload": payload,
             "dst": self.connection.peer,
         })
+        self._mark("sdp_sent")
 
     async def handle_sdp(self, type_, sdp):
         logger.info(f"Negotiator handling SDP: {type_}")
@@ -307,8 +361,7 @@ class Negotiator:
             logger.info(f"Ignoring {type_} as connection is already established")
             return
             
-        logger.debug(f"Received SDP: {sdp}")
-        logger.debug(f"SDP type: {type(sdp)}")
+        logger.debug("Received SDP: %s", sdp)
 
         if type_ == ServerMessageType.Offer.value:
             if peer_connection.signalingState != "stable":
@@ -319,7 +372,9 @@ class Negotiator:
                 sdp_type = sdp['type'].lower()
                 sdp_obj = RTCSessionDescription(sdp=sdp_string, type=sdp_type)
                 await peer_connection.setRemoteDescription(sdp_obj)
+                self._mark("remote_description")
                 logger.info(f"Set remoteDescription:{type_} for:{self.connection.peer}")
+                await self._add_pending_candidates()
                 await self._make_answer()
                 # The actual sending of the answer will be triggered by the icegatheringstatechange event
             except Exception as err:
@@ -335,8 +390,10 @@ class Negotiator:
                 sdp_type = sdp['type'].lower()
                 sdp_obj = RTCSessionDescription(sdp=sdp_string, type=sdp_type)
                 await peer_connection.setRemoteDescription(sdp_obj)
+                self._mark("remote_description")
                 logger.info(f"Remote description set for {type_} from peer {self.connection.peer}")
                 self.connection_established = True
+                await self._add_pending_candidates()
             except Exception as err:
                 logger.error(f"handle_sdp: ServerMessageType.Answer Failed to set remote description: {err}")
                 await provider.emit_error(PeerErrorType.WebRTC.value, err)
@@ -344,23 +401,41 @@ class Negotiator:
         else:
             logger.warning(f"Unsupported SDP type: {type_}")
 
-    async def handle_candidate(self, ice: Dict[str, Any]) -> None:
-        logger.debug(f"handle_candidate Handling ICE candidate: {ice}")
+    async def handle_candidate(self, ice: Optional[Dict[str, Any]]) -> None:
+        """Add a trickled remote candidate; an empty candidate ends the remote candidates."""
+        logger.debug("handle_candidate Handling ICE candidate: %s", ice)
 
         try:
-            rtc_ice_candidate = candidate_from_sdp(ice['candidate'])
-            rtc_ice_candidate.sdpMid = ice.get('sdpMid')
-            rtc_ice_candidate.sdpMLineIndex = ice.get('sdpMLineIndex')
-
-            logger.debug(f"Created RTCIceCandidate: {rtc_ice_candidate}")
-            logger.debug(f"PeerConnection: {self.connection.peer_connection}")
+            rtc_ice_candidate = None
+            if ice and ice.get('candidate'):
+                sdp = ice['candidate']
+                rtc_ice_candidate = candidate_from_sdp(sdp[len("candidate:"):] if sdp.startswith("candidate:") else sdp)
+                rtc_ice_candidate.sdpMid = ice.get('sdpMid')
+                rtc_ice_candidate.sdpMLineIndex = ice.get('sdpMLineIndex')
+                logger.debug("Created RTCIceCandidate: %s", rtc_ice_candidate)
+
+            peer_connection = self.connection.peer_connection
+            if peer_connection is None or peer_connection.remoteDescription is None:
+                # aiortc drops candidates it has no transport for yet.
+                self._pending_candidates.append(rtc_ice_candidate)
+                return
 
-            await self.connection.peer_connection.addIceCandidate(rtc_ice_candidate)
-            logger.info(f"Added ICE candidate for peer: {self.connection.peer}")
+            await peer_connection.addIceCandidate(rtc_ice_candidate)
+            logger.debug("Added ICE candidate for peer: %s", self.connection.peer)
         except Exception as err:
             await self.connection.provider.emit_error(PeerErrorType.WebRTC, err)
             logger.exception(f"Failed to handle ICE candidate: {err}")
 
+    async def _add_pending_candidates(self) -> None:
+        candidates, self._pending_candidates = self._pending_candidates, []
+        for candidate in candidates:
+            try:
+                await self.connection.peer_connection.addIceCandidate(candidate)
+            except Exception as err:
+                logger.warning("Failed to add buffered ICE candidate for %s: %s", self.connection.peer, err)
+        if candidates:
+            logger.debug("Added %d buffered ICE candidates for peer: %s", len(candidates), self.connection.peer)
+
     def _add_tracks_to_connection(self, stream: Union[Any, List[MediaStreamTrack]], peer_connection: RTCPeerConnection) -> None:
         if isinstance(stream, list):
             # If stream is already a list of tracks
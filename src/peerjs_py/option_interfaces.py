@@ -13,12 +13,33 @@ class PeerJSOption:
     config: Optional[dict] = None  # Equivalent to RTCConfiguration
     debug: Optional[int] = None
     referrer_policy: Optional[str] = None  # Equivalent to ReferrerPolicy
+    json_codec: Optional[str] = None  # "auto" (default), "orjson", "json" or a codec object
+    pong_timeout: Optional[float] = None  # seconds to wait for the answer to a heartbeat ping before the connection counts as dead; ping_interval by default
+    reconnect: Optional[bool] = None  # reconnect to the signaling server when the connection drops; default True
+    max_reconnect_attempts: Optional[int] = None  # before giving up and disconnecting, unlimited by default
+    reconnect_delay: Optional[float] = None  # base of the jittered exponential backoff, 0.5 seconds by default
+    reconnect_max_delay: Optional[float] = None  # cap of the backoff, 30 seconds by default
+    api_timeout: Optional[float] = None  # seconds per PeerServer API request attempt, 10 by default
+    api_retries: Optional[int] = None  # retries of failed API requests, 3 by default
+    pending_message_ttl: Optional[float] = None  # seconds to keep messages for unknown connections
+    max_pending_messages: Optional[int] = None  # per connection
+    max_pending_bytes: Optional[int] = None  # across all connections
+    max_concurrent_negotiations: Optional[int] = None  # inbound data connections negotiated at once, unlimited by default
+    negotiation_timeout: Optional[float] = None  # seconds an inbound data connection may take to open before it is dropped, 30 by default
+    trickle_ice: Optional[bool] = None  # send SDP without waiting for ICE gathering, apply candidates as received; default True
+    multiplex: Optional[bool] = None  # open further data connections to a peer as channels on its existing peer connection, if the peer advertised support
+    prewarm: Optional[dict] = None  # {remote peer ID: number of idle connections to keep ready for connect()}
+    prewarm_ttl: Optional[float] = None  # seconds an idle pre-warmed connection is kept, 60 by default
+    reuse_certificate: Optional[bool] = None  # one DTLS certificate for all peer connections
+    certificate_path: Optional[str] = None  # load/save that certificate here (implies reuse_certificate)
+    certificate_rotation: Optional[float] = None  # seconds before the certificate is replaced, 7 days by default
 
 class PeerConnectOption:
     label: Optional[str] = None
     metadata: Any = None
     serialization: Optional[str] = None
     reliable: Optional[bool] = None
+    multiplex: Optional[bool] = None
 
 class CallOption:
     metadata: Any = None
@@ -3,17 +3,24 @@ import asyncio
 # import threading
 import json
 from enum import Enum
-from typing import Dict, List, Optional, Callable, Any, TypedDict, Union, Type
+from typing import Dict, List, Optional, Callable, Any, TypedDict, Union, Type, Set
 from pyee.asyncio import AsyncIOEventEmitter
 
 from peerjs_py.utils.validateId import validateId
 from peerjs_py.socket import Socket
 from peerjs_py.mediaconnection import MediaConnection
 from peerjs_py.dataconnection.DataConnection import DataConnection
+from peerjs_py.dataconnection.SharedTransport import MUX_PROTOCOL, SharedTransport
 from peerjs_py.api import API
+from peerjs_py.connection_registry import ConnectionRegistry
+from peerjs_py.connection_pool import ConnectionPool
+from peerjs_py.certificates import CertificateStore
+from peerjs_py.pending_messages import PendingMessageStore
+from peerjs_py.message_dispatcher import MessageDispatcher
+from peerjs_py.json_codec import get_json_codec
 from peerjs_py.peer_error import PeerError
 from peerjs_py.enums import ServerMessageType, ConnectionType, PeerErrorType, PeerEventType, SocketEventType, ConnectionEventType
-from peerjs_py.logger import LogLevel, logger
+from peerjs_py.logger import LogLevel, logger, TRACE
 from peerjs_py.dataconnection.BufferedConnection import Raw as RawSerializer, Json as JsonSerializer, BinaryPack as BinaryPackSerializer
 from peerjs_py.utils.random_token import random_token
 
@@ -57,21 +64,53 @@ class PeerEvents(TypedDict):
 
 class Peer(AsyncIOEventEmitter):
     DEFAULT_KEY = "peerjs"
+    DEFAULT_NEGOTIATION_TIMEOUT = 30.0
 
     def __init__(self, id=None, options=None):
         super().__init__() 
         self._options = options or {}
+        # JSON codec shared by the signaling socket and Json data connections.
+        self._json_codec = get_json_codec(self._options.get('json_codec', 'auto'))
         self._api = API(self._options)
+        # Signaling messages are handled in order per connection, connections in parallel.
+        self._dispatcher = MessageDispatcher(self._handle_message)
+        max_negotiations = self._options.get('max_concurrent_negotiations')
+        self._negotiation_slots = asyncio.Semaphore(max_negotiations) if max_negotiations else None
+        self._negotiation_timeout = self._options.get('negotiation_timeout', self.DEFAULT_NEGOTIATION_TIMEOUT)
+        # Peer connections that data connections are multiplexed onto, by remote peer ID.
+        self._transports: Dict[str, SharedTransport] = {}
+        # Remote peers whose last offer or answer advertised they accept multiplexed channels.
+        self._multiplex_peers: Set[str] = set()
+        # One DTLS certificate for all peer connections instead of one each.
+        self._certificate_store: Optional[CertificateStore] = None
+        if self._options.get('reuse_certificate') or self._options.get('certificate_path'):
+            self._certificate_store = CertificateStore(
+                self._options.get('certificate_path'),
+                self._options.get('certificate_rotation', CertificateStore.DEFAULT_ROTATION),
+            )
+        # Pre-warmed connections to designated remote peers.
+        self._pool = ConnectionPool(self._connect, ttl=self._options.get('prewarm_ttl', ConnectionPool.DEFAULT_TTL))
+        for remote_id, size in (self._options.get('prewarm') or {}).items():
+            self._pool.add_target(remote_id, size)
+        # Inbound connections waiting for their data channel to open.
+        self._negotiations: Set[asyncio.Task] = set()
         self._socket = self._create_server_connection()
 
         self._id = id
         self._last_server_id = None
+        # Lets the server hand our ID back to us when the socket reconnects.
+        self._token = self._options.get('token') or random_token()
 
         self._destroyed = False
         self._disconnected = False
         self._open = False
-        self._connections: Dict[str, List[Any]] = {}
-        self._lost_messages: Dict[str, List[Any]] = {}
+        self._connections = ConnectionRegistry()
+        # Signaling messages that arrived before their connection was created.
+        self._lost_messages = PendingMessageStore(
+            ttl=self._options.get('pending_message_ttl', PendingMessageStore.DEFAULT_TTL),
+            max_per_connection=self._options.get('max_pending_messages', PendingMessageStore.DEFAULT_MAX_PER_CONNECTION),
+            max_bytes=self._options.get('max_pending_bytes', PendingMessageStore.DEFAULT_MAX_BYTES),
+        )
         
         # self._lock = threading.Lock()
 
@@ -102,17 +141,16 @@ class Peer(AsyncIOEventEmitter):
     def id(self):
         return self._id
 
+    @property
+    def open(self) -> bool:
+        """Whether the signaling server has confirmed this peer's ID."""
+        return self._open
+
     async def start(self):
         """Activate Peer instance."""
         logger.info(f"Starting peer with ID: {self._id}")
-        try:
-            self._socket = self._create_server_connection()
-            await self._socket.start(id=self._id, token=self)
-            logger.info("Successfully connected to signaling server")
-        except Exception as e:
-            logger.exception(f"Failed to connect to signaling server: {e}")
-            await self.emit_error(PeerErrorType.SocketError.value, "Could not connect to signaling server")
-            return
+        if self._certificate_store is not None:
+            await self._certificate_store.prepare()
         # Sanity checks
         # Ensure alphanumeric id
         if self._id and not validateId(self._id):
@@ -121,6 +159,7 @@ class Peer(AsyncIOEventEmitter):
                                f'ID "{self._id}" is invalid')
             return
 
+        # Without an ID, ask the server for one before the socket handshake.
         if self._id is None:
             try:
                 logger.debug('Peer start()self._id: %s', self._id)
@@ -130,30 +169,46 @@ class Peer(AsyncIOEventEmitter):
             except Exception as e:
                 await self._abort(PeerErrorType.SERVER_ERROR, e)
                 return
-            
+
+        try:
+            self._socket = self._create_server_connection()
+            await self._socket.start(id=self._id, token=self._token)
+            logger.info("Successfully connected to signaling server")
+        except Exception as e:
+            logger.exception(f"Failed to connect to signaling server: {e}")
+            await self.emit_error(PeerErrorType.SocketError.value, "Could not connect to signaling server")
+            return
         await self._initialize(self._id)
 
         # await self._socket.start(self._id, self._options.get('token'))
         logger.info('Peer started with ID: %s', self._id)
 
     def _create_server_connection(self):
-        logger.debug(f"_create_server_connection with options: {self._options}")
+        logger.debug("_create_server_connection with options: %s", self._options)
         socket = Socket(
             self._options.get('secure', True),
             self._options.get('host', 'localhost'),
             self._options.get('port', 9000),
             self._options.get('path', '/'),
             self._options.get('key', self.DEFAULT_KEY),
-            self._options.get('ping_interval', 5)
+            self._options.get('ping_interval', 5),
+            json_codec=self._json_codec,
+            reconnect=self._options.get('reconnect', True),
+            max_reconnect_attempts=self._options.get('max_reconnect_attempts'),
+            reconnect_delay=self._options.get('reconnect_delay', 0.5),
+            reconnect_max_delay=self._options.get('reconnect_max_delay', 30.0),
+            pong_timeout=self._options.get('pong_timeout'),
         )
 
         # socket.on(SocketEventType.Message.value, self._handle_message)
-        socket.on(SocketEventType.Message.value, lambda msg: asyncio.create_task(self._handle_message(msg)))
+        socket.on(SocketEventType.Message.value, self._dispatcher.dispatch)
         socket.on(SocketEventType.Error.value, lambda error: self._abort(PeerErrorType.SocketError, error))
         socket.on(SocketEventType.Disconnected.value, self._on_disconnected)
+        socket.on(SocketEventType.Reconnecting.value, self._on_reconnecting)
+        socket.on(SocketEventType.Reconnected.value, self._on_reconnected)
         socket.on(SocketEventType.Close.value, self._on_close)
 
-        logger.debug(f"_create_server_connection with options: {self._options} : Done")
+        logger.debug("_create_server_connection with options: %s : Done", self._options)
         return socket
 
     async def _on_disconnected(self):
@@ -163,6 +218,14 @@ class Peer(AsyncIOEventEmitter):
         await self.emit_error(PeerErrorType.Network.value, "Lost connection to server.")
         await self.disconnect()
 
+    def _on_reconnecting(self):
+        # Data connections are peer-to-peer and stay up; only signaling is paused.
+        logger.warning("Lost connection to signaling server, reconnecting as %s.", self._id)
+        self._open = False
+
+    def _on_reconnected(self, latency: float):
+        logger.info("Signaling reconnected as %s after %.3fs", self._id, latency)
+
     def _on_close(self):
         logger.debug(f"peer socket close event id: {self._id}")
         if self._disconnected:
@@ -172,18 +235,27 @@ class Peer(AsyncIOEventEmitter):
 
     async def _initialize(self, id: str):
         self._id = id
-        await self._socket.start(id, self._options.get('token'))
+        await self._socket.start(id, self._token)
 
     async def _handle_message(self, message):
-        logger.debug(f"peer  on socket.on {SocketEventType.Message.value} message: {message}")
+        if TRACE:
+            logger.debug("peer  on socket.on %s message: %s", SocketEventType.Message.value, message)
         type_ = message['type']
         payload = message.get('payload', {})
         peer_id = message.get('src')
 
+        if type_ in (ServerMessageType.Offer.value, ServerMessageType.Answer.value) and isinstance(payload, dict) \
+                and payload.get('type') == ConnectionType.Data.value:
+            if payload.get('multiplex'):
+                self._multiplex_peers.add(peer_id)
+            else:
+                self._multiplex_peers.discard(peer_id)
+
         if type_ == ServerMessageType.Open.value:
             self._last_server_id = self._id
             self._open = True
             self.emit(PeerEventType.Open.value, self._id)
+            self._pool.start()
         elif type_ == ServerMessageType.Error.value:
             await self._abort(PeerErrorType.SERVER_ERROR, payload['msg'])
         elif type_ == ServerMessageType.IdTaken.value:
@@ -191,9 +263,10 @@ class Peer(AsyncIOEventEmitter):
         elif type_ == ServerMessageType.InvalidKey.value:
             await self._abort(PeerErrorType.InvalidKey, f'API KEY "{self._options.get("key")}" is invalid')
         elif type_ == ServerMessageType.Leave.value:
-            logger.log(f"Received leave message from {peer_id}")
-            self._cleanup_peer(peer_id)
-            self._connections.pop(peer_id, None)
+            logger.info(f"Received leave message from {peer_id}")
+            await self._cleanupPeer(peer_id)
+            self._connections.pop_peer(peer_id)
+            self._multiplex_peers.discard(peer_id)
         elif type_ == ServerMessageType.Expire.value:
             await self.emit_error(PeerErrorType.PeerUnavailable.value, f"Could not connect to peer {peer_id}")
         elif type_ == ServerMessageType.Offer.value:
@@ -236,45 +309,74 @@ class Peer(AsyncIOEventEmitter):
                         'metadata': payload.get('metadata'),
                         'label': payload.get('label'),
                         'serialization': payload['serialization'],
-                        'reliable': payload.get('reliable')
+                        'reliable': payload.get('reliable'),
+                        'json_codec': self._json_codec,
+                        'trickleIce': self._options.get('trickle_ice', True),
                     }
                 )
 
                 data_connection.connection_id = connection_id
 
-                data_connection._negotiator.on_data_channel_org=data_connection._negotiator.on_data_channel 
-                data_channel_initialized = asyncio.Future()
+                negotiator = data_connection._negotiator
+                negotiator.on_data_channel_org = negotiator.on_data_channel
+                data_channel_initialized = asyncio.get_running_loop().create_future()
                 async def on_data_channel_wrapper(channel):
+                    # Multiplexed channels belong to new connections, which the
+                    # negotiator hands to _accept_multiplexed_channel.
+                    if channel.protocol == MUX_PROTOCOL:
+                        await negotiator.on_data_channel_org(channel)
+                        return
+                    if data_connection._closed:
+                        return
                     await data_connection._initialize_data_channel(channel)
-                    await data_connection._negotiator.on_data_channel_org(channel)
-                    data_channel_initialized.set_result(True)
+                    await negotiator.on_data_channel_org(channel)
+                    if not data_channel_initialized.done():
+                        data_channel_initialized.set_result(True)
 
-                data_connection._negotiator.on_data_channel = on_data_channel_wrapper
+                negotiator.on_data_channel = on_data_channel_wrapper
 
-                await data_connection._negotiator.start_connection({
-                    'originator': False,
-                    'sdp': payload.get('sdp'),
-                    'connectionId': connection_id
-                })
-                logger.info(f"wait data_channel_initialized connection_id:{connection_id}")
-                await data_channel_initialized
-                # await data_connection.open_future
-                logger.info(f"wait data_channel_initialized connection_id:{connection_id} done")
-                if not data_connection._open: # assume it's response to connect, so should be opened. just workaround as it does not triggered by on_data_channel->data_channel.on("open") event.
-                    data_connection._open = True
-                    data_connection.open_future.set_result(True)
+                # A connection that fails or closes before its channel opens
+                # must still give its negotiation slot back.
+                def on_gone(*_):
+                    if not data_channel_initialized.done():
+                        data_channel_initialized.set_result(False)
 
+                def on_state(state):
+                    if state in ("failed", "closed"):
+                        on_gone()
+
+                data_connection.once(ConnectionEventType.Close.value, on_gone)
+                data_connection.on("connectionStateChanged", on_state)
+
+                # Registered before negotiating so trickled candidates reach it
+                # straight away; the Connection event still waits for the channel.
                 connection = data_connection
-                logger.info(f"serializer data_connection for {payload['serialization']}")
                 self._add_connection(peer_id, connection)
-                logger.info(f"Connection added, current connections: {self._connections}")
-                self.emit(PeerEventType.Connection.value, data_connection)
+
+                if self._negotiation_slots is not None:
+                    await self._negotiation_slots.acquire()
+                try:
+                    await data_connection._negotiator.start_connection({
+                        'originator': False,
+                        'sdp': payload.get('sdp'),
+                        'connectionId': connection_id
+                    })
+                    # Waiting for the channel must not hold up this connection's
+                    # signaling lane: the remote peer may still be trickling
+                    # candidates. The task owns the slot from here on.
+                    task = asyncio.create_task(self._open_inbound_connection(data_connection, data_channel_initialized))
+                except BaseException:
+                    if self._negotiation_slots is not None:
+                        self._negotiation_slots.release()
+                    raise
+                self._negotiations.add(task)
+                task.add_done_callback(self._negotiations.discard)
             else:
                 logger.warning(f"Received malformed connection type:{payload['type']}")
                 return
 
             msgs_rcvd_before_data_conn = self._get_messages(connection_id)
-            logger.debug(f"connection_id: {connection_id} handle previous message: {len(msgs_rcvd_before_data_conn)}  current message: {message}")
+            logger.debug("connection_id: %s handle previous message: %d  current message: %s", connection_id, len(msgs_rcvd_before_data_conn), message)
             if msgs_rcvd_before_data_conn:
                 for msg_rcvd_before_data_conn in msgs_rcvd_before_data_conn:
                     await connection.handle_message(msg_rcvd_before_data_conn)
@@ -291,19 +393,43 @@ class Peer(AsyncIOEventEmitter):
             connection = self.get_connection(peer_id, connection_id)
 
             if connection and connection.peer_connection:
-                logger.debug(f"connection Pass message peer_id:{peer_id} of type:{type_} to connection_id:{connection_id}")
+                if TRACE:
+                    logger.debug("connection Pass message peer_id:%s of type:%s to connection_id:%s", peer_id, type_, connection_id)
                 #pass to next connection
                 await connection.handle_message(message)
             # elif connection:  # to be fixed
             #     logger.debug(f"connection exists but peer_connection not ready, handling message directly")
             #     await connection.handle_message(message)
             elif connection_id:
-                logger.debug(f"store message peer_id:{peer_id} of type:{type_} to connection_id: {connection_id} but connection.peer_connection not ready")
+                logger.debug("store message peer_id:%s of type:%s to connection_id: %s but connection.peer_connection not ready", peer_id, type_, connection_id)
                 self._store_message(connection_id, message)
             else:
-                logger.warning("You received an unrecognized message:", message)
+                logger.warning("You received an unrecognized message: %s", message)
 
 
+    async def _open_inbound_connection(self, data_connection, data_channel_initialized: asyncio.Future) -> None:
+        connection_id = data_connection.connection_id
+        try:
+            logger.info(f"wait data_channel_initialized connection_id:{connection_id}")
+            opened = await asyncio.wait_for(data_channel_initialized, self._negotiation_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("connection_id:%s did not open within %ss", connection_id, self._negotiation_timeout)
+            opened = False
+        finally:
+            if self._negotiation_slots is not None:
+                self._negotiation_slots.release()
+        if not opened:
+            logger.info(f"connection_id:{connection_id} closed before its data channel opened")
+            await data_connection.close()
+            return
+        logger.info(f"wait data_channel_initialized connection_id:{connection_id} done")
+        if not data_connection._open: # assume it's response to connect, so should be opened. just workaround as it does not triggered by on_data_channel->data_channel.on("open") event.
+            data_connection._open = True
+            data_connection.open_future.set_result(True)
+
+        logger.info(f"serializer data_connection for {data_connection.serialization}")
+        self.emit(PeerEventType.Connection.value, data_connection)
+
     async def connect(self, peer_id: str, options: Dict[str, Any] = None):
         if self._disconnected:
             logger.warning(
@@ -312,7 +438,32 @@ class Peer(AsyncIOEventEmitter):
             await self.emit_error(PeerErrorType.Disconnected.value, "Cannot connect to new Peer after disconnecting from server.")
             return None
 
-        options = options or {}
+        connection = self._pool.take(peer_id, options)
+        if connection is not None:
+            logger.debug("connect peer_id:%s using pre-warmed connection %s", peer_id, connection.connection_id)
+            return connection
+        return await self._connect(peer_id, options)
+
+    def prewarm(self, peer_id: str, size: int = 1, serialization: str = 'json', reliable: bool = True) -> None:
+        """Keep ``size`` idle connections to ``peer_id`` open, ready for connect().
+
+        A connect() call with the same serialization and reliability, and no
+        other options, gets one of them without waiting for a handshake.
+        Pass a size of 0 to stop pre-warming.
+        """
+        self._pool.add_target(peer_id, size, serialization, reliable)
+        if self._open:
+            self._pool.start()
+
+    @property
+    def pool_stats(self) -> Dict[str, int]:
+        """Idle pre-warmed connections and pool hit/miss counters."""
+        return self._pool.stats
+
+    async def _connect(self, peer_id: str, options: Dict[str, Any] = None):
+        options = dict(options or {})
+        options.setdefault('json_codec', self._json_codec)
+        options.setdefault('trickleIce', self._options.get('trickle_ice', True))
         connection_id = f"dc_{random_token()}"
         options["_payload"] = {
             "originator": True,
@@ -327,17 +478,25 @@ class Peer(AsyncIOEventEmitter):
             await self.emit_error(PeerErrorType.InvalidSerialization.value, f"Unknown serialization type: {serialization}")
             return None
 
+        multiplex = options.get('multiplex', self._options.get('multiplex', False))
+        # Browsers and older versions would take the extra channel for a new connection.
+        transport = self._transports.get(peer_id) if multiplex and peer_id in self._multiplex_peers else None
+        if transport is not None and transport.usable:
+            return await self._connect_multiplexed(transport, peer_id, connection_id, DataConnectionClass, options)
+
         try:
-            logger.debug(f"connect peer_id:{peer_id} options: {options}")
+            logger.debug("connect peer_id:%s options: %s", peer_id, options)
             data_connection = DataConnectionClass(peer_id, self, options)
             data_connection.connection_id = connection_id
-            logger.debug(f"connect peer_id:{peer_id} options: {options} data_connection.initialize()")
+            logger.debug("connect peer_id:%s data_connection.initialize()", peer_id)
             await data_connection.initialize()
             self._add_connection(peer_id, data_connection)
+            if multiplex:
+                self._shared_transport(data_connection)
             logger.info(f"Connection initialized for peer_id:{peer_id} _add_connection added")
 
             logger.debug(f"Waiting for data channel to open for peer_id:{peer_id}")
-            await asyncio.wait_for(data_connection.open_future, timeout=1)
+            await asyncio.wait_for(asyncio.shield(data_connection.open_future), timeout=1)
             logger.info(f"Data channel opened for peer_id:{peer_id}")
         except asyncio.TimeoutError:
             logger.warning(f"Timeout waiting for data channel to open for peer_id:{peer_id}, but continuing anyway")
@@ -346,13 +505,123 @@ class Peer(AsyncIOEventEmitter):
             # raise e
         return data_connection
     
+    async def _connect_multiplexed(self, transport: SharedTransport, peer_id: str, connection_id: str,
+                                   DataConnectionClass, options: Dict[str, Any]):
+        """Open a data connection as a new SCTP stream on an established peer connection."""
+        data_connection = DataConnectionClass(peer_id, self, options)
+        data_connection.connection_id = connection_id
+        reliable = options.get("reliable", True)
+        descriptor = {
+            "connectionId": connection_id,
+            "label": data_connection.label,
+            "serialization": data_connection.serialization,
+            "reliable": reliable,
+            "metadata": data_connection.metadata,
+        }
+        if getattr(data_connection, "supports_batching", False):
+            descriptor["batching"] = True
+        if getattr(data_connection, "supports_chunking", False):
+            descriptor["chunking"] = True
+        # A peer that advertised multiplexing runs this library and speaks
+        # the same protocol extensions.
+        data_connection._remote_batching = data_connection._remote_chunking = True
+
+        channel = transport.peer_connection.createDataChannel(
+            label=self._json_codec.dumps(descriptor),
+            ordered=reliable,
+            protocol=MUX_PROTOCOL,
+        )
+        transport.attach(data_connection)
+        await data_connection._initialize_data_channel(channel)
+        self._add_connection(peer_id, data_connection)
+        logger.debug("connect peer_id:%s multiplexed %s onto %s", peer_id, connection_id, transport)
+        try:
+            await asyncio.wait_for(asyncio.shield(data_connection.open_future), timeout=1)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout waiting for data channel to open for peer_id:{peer_id}, but continuing anyway")
+        return data_connection
+
+    async def _accept_multiplexed_channel(self, connection, peer_connection, channel) -> None:
+        """Set up the data connection for a channel the remote peer multiplexed onto ``peer_connection``.
+
+        ``connection`` negotiated that peer connection and may have closed since.
+        """
+        peer_id = connection.peer
+        try:
+            descriptor = self._json_codec.loads(channel.label)
+            DataConnectionClass = self._serializers[descriptor['serialization']]
+            connection_id = descriptor['connectionId']
+        except (ValueError, TypeError, KeyError) as err:
+            logger.warning("Rejecting multiplexed channel from %s: %s", peer_id, err)
+            channel.close()
+            return
+
+        transport = self._shared_transport(connection, peer_connection)
+        if transport is None:
+            logger.warning("Rejecting multiplexed channel from %s: its peer connection is no longer shared", peer_id)
+            channel.close()
+            return
+        data_connection = DataConnectionClass(peer_id, self, {
+            'connectionId': connection_id,
+            '_payload': descriptor,
+            'metadata': descriptor.get('metadata'),
+            'label': descriptor.get('label'),
+            'serialization': descriptor['serialization'],
+            'reliable': descriptor.get('reliable'),
+            'json_codec': self._json_codec,
+        })
+        data_connection.connection_id = connection_id
+        transport.attach(data_connection)
+        await data_connection._initialize_data_channel(channel)
+        self._add_connection(peer_id, data_connection)
+        if channel.readyState == "open" and not data_connection._open:
+            data_connection._open = True
+            data_connection.open_future.set_result(True)
+        logger.debug("Accepted multiplexed connection %s from %s", connection_id, peer_id)
+        self.emit(PeerEventType.Connection.value, data_connection)
+
+    def _shared_transport(self, connection, peer_connection=None) -> Optional[SharedTransport]:
+        """The shared transport of ``connection``'s peer connection, created on first use.
+
+        Once ``connection`` has closed it holds no transport, so the one still
+        shared by other connections over ``peer_connection`` is looked up
+        instead; None if there is none.
+        """
+        transport = connection._transport
+        if transport is None and connection._closed:
+            return next((other._transport for other in self._connections.by_peer(connection.peer)
+                         if getattr(other, "_transport", None) is not None
+                         and other._transport.peer_connection is peer_connection), None)
+        if transport is None:
+            transport = SharedTransport(connection.peer, connection.peer_connection, self._forget_transport)
+            transport.attach(connection)
+            current = self._transports.get(connection.peer)
+            if current is None or not current.usable:
+                self._transports[connection.peer] = transport
+        return transport
+
+    def _forget_transport(self, transport: SharedTransport) -> None:
+        if self._transports.get(transport.peer) is transport:
+            del self._transports[transport.peer]
+
+    @property
+    def connections(self) -> ConnectionRegistry:
+        """All open connections, indexed by connection ID, peer ID and type."""
+        return self._connections
+
+    @property
+    def signaling_stats(self) -> Dict[str, Any]:
+        """Signaling socket counters, including reconnects and their latency in seconds."""
+        return self._socket.stats
+
+    @property
+    def pending_message_stats(self) -> Dict[str, int]:
+        """Counters of the messages held for connections that do not exist yet."""
+        return self._lost_messages.stats
+
     def _add_connection(self, peer_id: str, connection):
-        if peer_id not in self._connections:
-            self._connections[peer_id] = []
-        logger.info(f"_add_connection : peer_id: {peer_id}  connection: {connection.connection_id}")
-        self._connections[peer_id].append(connection)
-        # Add this line to log the current state of connections
-        logger.info(f"Current connections after adding: {self._connections}")
+        self._connections.add(peer_id, connection)
+        logger.debug("_add_connection : peer_id: %s  connection: %s total: %d", peer_id, connection.connection_id, len(self._connections))
 
     def get_connection(self, peer_id: str, connection_id: str) -> Optional[Union[DataConnection, MediaConnection]]:
         """
@@ -362,18 +631,13 @@ class Peer(AsyncIOEventEmitter):
         :param connection_id: The ID of the connection.
         :return: The connection if found, otherwise None.
         """
-        logger.info(f"Searching for connection - peer_id: {peer_id}, connection_id: {connection_id}")
-        logger.info(f"Current connections: {self._connections}")
         if not peer_id:
             logger.error(f"get_connection ==> peer_id none")
             return None
-        connections = self._connections.get(peer_id, [])
-        for connection in connections:
-            if connection.connection_id == connection_id:
-                logger.info(f"get_connection : Found peer_id: {peer_id}  connection: {connection_id} connection: {connection}")
-                return connection
-        logger.warning(f"get_connection : Failed peer_id: {peer_id}  connection: {connection_id} connections:{connections}  self._connections: {self._connections}")
-        return None
+        connection = self._connections.get(peer_id, connection_id)
+        if connection is None:
+            logger.debug("get_connection : no connection peer_id: %s  connection: %s", peer_id, connection_id)
+        return connection
     
     async def call(self, peer_id: str, stream: Any, options: Dict[str, Any] = None) -> MediaConnection:
         logger.info(f"Initiating call from {self._id} to {peer_id}")
@@ -405,34 +669,32 @@ class Peer(AsyncIOEventEmitter):
 
     async def _remove_connection(self, connection):
         """Remove a connection from the list of connections."""
-        if connection.peer in self._connections:
-            self._connections[connection.peer].remove(connection)
-            if not self._connections[connection.peer]:
-                del self._connections[connection.peer]
-        
-        if connection.peer in self._lost_messages:
-            del self._lost_messages[connection.peer]
+        self._connections.remove(connection)
+        self._lost_messages.discard(connection.connection_id)
 
 
     async def _cleanup(self) -> None:
         """Disconnects every connection on this peer."""
+        await self._pool.close()
         # we need to iterate over a copy
         # in order to remove elements from the original dict
-        keys_copy = list(self._connections.keys())
-        for peerId in keys_copy:
+        for peerId in self._connections.peer_ids():
             await self._cleanupPeer(peerId)
-            self._connections.pop(peerId, None)
+            self._connections.pop_peer(peerId)
+        self._lost_messages.clear()
+        self._dispatcher.close()
+        for task in list(self._negotiations):
+            task.cancel()
+        self._transports.clear()
+        self._multiplex_peers.clear()
         if self._socket:
             await self._socket._cleanup()
             # await self._socket.remove_all_listeners()
-        #    await self._api.close()
+        await self._api.close()
 
     async def _cleanupPeer(self, peerId: str) -> None:
         """Close all connections to this peer."""
-        connections = self._connections.get(peerId)
-        if not connections:
-            return
-        for connection in connections:
+        for connection in self._connections.by_peer(peerId):
             await connection.close()
 
     async def _abort(self, type: PeerErrorType, message: str) -> None:
@@ -526,13 +788,8 @@ class Peer(AsyncIOEventEmitter):
 
     def _store_message(self, connection_id: str, message: Any) -> None:
         """Stores messages without a set up connection, to be claimed later."""
-        if connection_id not in self._lost_messages:
-            self._lost_messages[connection_id] = []
-        self._lost_messages[connection_id].append(message)
+        self._lost_messages.store(connection_id, message)
 
     def _get_messages(self, connection_id: str) -> List[Any]:
         """Retrieve messages from lost message store."""
-        messages = self._lost_messages.get(connection_id, [])
-        if messages:
-            del self._lost_messages[connection_id]
-        return messages
+        return self._lost_messages.claim(connection_id)
@@ -0,0 +1,120 @@
+import asyncio
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Type
+
+from peerjs_py.api import API
+from peerjs_py.enums import PeerEventType
+from peerjs_py.logger import logger
+from peerjs_py.peer import Peer
+from peerjs_py.utils.validateId import validateId
+
+
+def local_id() -> str:
+    """A random peer ID that passes validateId, generated without the server."""
+    return uuid.uuid4().hex
+
+
+class IdPool:
+    """Peer IDs reserved ahead of Peer.start().
+
+    A Peer created without an ID asks the PeerServer for one in start(), one
+    round trip per peer before its WebSocket handshake. The pool fetches IDs
+    ``concurrency`` at a time over one keep-alive API session instead, or,
+    with ``local=True``, makes them up: the PeerServer accepts any free ID that
+    passes validateId, and random UUIDs do not collide in practice.
+    """
+
+    DEFAULT_CONCURRENCY = 16
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None, local: bool = False,
+                 concurrency: int = DEFAULT_CONCURRENCY):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.local = local
+        self.concurrency = concurrency
+        self._options = options or {}
+        self._api: Optional[API] = None
+        self._ids: Deque[str] = deque()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    async def reserve(self, count: int) -> None:
+        """Add ``count`` IDs to the pool."""
+        if self.local:
+            self._ids.extend(local_id() for _ in range(count))
+            return
+        if self._api is None:
+            self._api = API(self._options)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch() -> str:
+            async with semaphore:
+                return await self._api.retrieve_id()
+
+        for id in await asyncio.gather(*(fetch() for _ in range(count))):
+            if not validateId(id):
+                raise ValueError(f'Server returned an invalid ID "{id}"')
+            self._ids.append(id)
+
+    def take(self) -> str:
+        """Hand out a reserved ID; local pools generate one when empty."""
+        if self._ids:
+            return self._ids.popleft()
+        if self.local:
+            return local_id()
+        raise LookupError("No reserved peer IDs left")
+
+    async def close(self) -> None:
+        if self._api is not None:
+            await self._api.close()
+            self._api = None
+
+
+async def start_peers(count: int, options: Optional[Dict[str, Any]] = None,
+                      concurrency: int = IdPool.DEFAULT_CONCURRENCY, local_ids: bool = False,
+                      open_timeout: float = 10.0, peer_class: Type[Peer] = Peer) -> List[Peer]:
+    """Create and start ``count`` peers, ``concurrency`` handshakes at a time.
+
+    IDs are reserved up front through an IdPool. Each peer is started and
+    awaited until the server confirms it (or reports an error, or
+    ``open_timeout`` passes) before its slot is given to the next one.
+    Returns all peers in creation order; check ``peer.open`` for the ones
+    that did not make it.
+    """
+    ids = IdPool(options, local=local_ids, concurrency=concurrency)
+    try:
+        await ids.reserve(count)
+    finally:
+        await ids.close()
+
+    peers = [peer_class(ids.take(), dict(options or {})) for _ in range(count)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def start(peer: Peer) -> None:
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            done = loop.create_future()
+
+            def on_open(_id):
+                if not done.done():
+                    done.set_result(None)
+
+            def on_error(error):
+                if not done.done():
+                    done.set_exception(error)
+
+            peer.once(PeerEventType.Open.value, on_open)
+            peer.once(PeerEventType.Error.value, on_error)
+            try:
+                await peer.start()
+                await asyncio.wait_for(done, open_timeout)
+            except Exception as err:
+                logger.error("Peer %s did not start: %r", peer._id, err)
+            finally:
+                peer.remove_listener(PeerEventType.Open.value, on_open)
+                peer.remove_listener(PeerEventType.Error.value, on_error)
+
+    await asyncio.gather(*(start(peer) for peer in peers))
+    return peers
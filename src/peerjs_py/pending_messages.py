@@ -0,0 +1,168 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from peerjs_py.logger import logger
+
+
+def estimate_size(message: Any) -> int:
+    """Rough encoded size of a signaling message, without encoding it."""
+    if isinstance(message, (str, bytes, bytearray)):
+        return len(message) + 2
+    if isinstance(message, dict):
+        return 2 + sum(estimate_size(key) + estimate_size(value) + 2 for key, value in message.items())
+    if isinstance(message, (list, tuple)):
+        return 2 + sum(estimate_size(item) + 1 for item in message)
+    return 8
+
+
+class _Pending:
+    __slots__ = ("messages", "size", "deadline")
+
+    def __init__(self, deadline: float):
+        self.messages: List[Any] = []
+        self.size = 0
+        self.deadline = deadline
+
+
+class PendingMessageStore:
+    """Signaling messages received before their connection exists.
+
+    Messages are kept per connection ID until the connection claims them, or
+    until ``ttl`` seconds after the first one arrived. A connection keeps at
+    most ``max_per_connection`` messages, further ones are dropped, and the
+    store as a whole holds at most ``max_bytes``: when full, the connections
+    that have waited longest are dropped first.
+
+    The TTL is the same for every entry, so entries expire in insertion order
+    and a single timer armed for the oldest deadline is enough to expire them
+    all, whatever the number of connections.
+    """
+
+    DEFAULT_TTL = 30.0
+    DEFAULT_MAX_PER_CONNECTION = 64
+    DEFAULT_MAX_BYTES = 1024 * 1024
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_per_connection: int = DEFAULT_MAX_PER_CONNECTION,
+                 max_bytes: int = DEFAULT_MAX_BYTES, clock: Callable[[], float] = time.monotonic,
+                 sizer: Callable[[Any], int] = estimate_size):
+        self.ttl = ttl
+        self.max_per_connection = max_per_connection
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._sizer = sizer
+        # Ordered by arrival of each connection's first message, hence by deadline.
+        self._pending: "OrderedDict[str, _Pending]" = OrderedDict()
+        self._bytes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stored = 0
+        self.claimed = 0
+        self.dropped = 0
+        self.expired = 0
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": len(self._pending),
+            "messages": sum(len(pending.messages) for pending in self._pending.values()),
+            "bytes": self._bytes,
+            "stored": self.stored,
+            "claimed": self.claimed,
+            "dropped": self.dropped,
+            "expired": self.expired,
+        }
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, connection_id: str) -> bool:
+        return connection_id in self._pending
+
+    def store(self, connection_id: str, message: Any) -> bool:
+        """Keep ``message`` for ``connection_id``; returns False if it was dropped."""
+        now = self._clock()
+        self.expire(now)
+
+        size = self._sizer(message)
+        pending = self._pending.get(connection_id)
+        if size > self.max_bytes or (pending is not None and len(pending.messages) >= self.max_per_connection):
+            self.dropped += 1
+            logger.debug("Dropping pending message for %s: limit reached", connection_id)
+            return False
+
+        while self._bytes + size > self.max_bytes:
+            oldest_id = next(iter(self._pending))
+            if oldest_id == connection_id:
+                # Only this connection's own messages are left; keep what it has.
+                self.dropped += 1
+                return False
+            self.dropped += len(self._remove(oldest_id).messages)
+            logger.debug("Dropping pending messages for %s: byte budget exceeded", oldest_id)
+
+        if pending is None:
+            pending = self._pending[connection_id] = _Pending(now + self.ttl)
+        pending.messages.append(message)
+        pending.size += size
+        self._bytes += size
+        self.stored += 1
+        self._schedule()
+        return True
+
+    def claim(self, connection_id: str) -> List[Any]:
+        """Remove and return the messages kept for ``connection_id``."""
+        pending = self._pending.get(connection_id)
+        if pending is None:
+            return []
+        self._remove(connection_id)
+        self.claimed += len(pending.messages)
+        return pending.messages
+
+    def discard(self, connection_id: str) -> None:
+        if connection_id in self._pending:
+            self.dropped += len(self._remove(connection_id).messages)
+
+    def expire(self, now: Optional[float] = None) -> None:
+        now = self._clock() if now is None else now
+        while self._pending:
+            connection_id, pending = next(iter(self._pending.items()))
+            if pending.deadline > now:
+                break
+            self._remove(connection_id)
+            self.expired += len(pending.messages)
+            logger.debug("Expired %d pending messages for %s", len(pending.messages), connection_id)
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._bytes = 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _remove(self, connection_id: str) -> _Pending:
+        pending = self._pending.pop(connection_id)
+        self._bytes -= pending.size
+        if not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return pending
+
+    def _schedule(self) -> None:
+        if self._timer is not None or not self._pending:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Without a loop entries still expire on the next store.
+            return
+        deadline = next(iter(self._pending.values())).deadline
+        self._timer = loop.call_later(max(0.0, deadline - self._clock()), self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self.expire()
+        self._schedule()
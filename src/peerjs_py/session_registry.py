@@ -0,0 +1,158 @@
+import asyncio
+import ssl
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from peerjs_py.logger import logger
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """Client SSL context that resumes earlier TLS sessions with the same host.
+
+    asyncio creates every TLS connection with ``wrap_bio()`` and has no way
+    to pass a session to resume, so each connection does a full handshake.
+    This context remembers the most recent connection per server name and,
+    when the next one to that name is created, offers that connection's
+    session (TLS 1.3 ticket or 1.2 session ID) while it is still valid.
+    """
+
+    def __new__(cls, protocol: int = ssl.PROTOCOL_TLS_CLIENT):
+        return super().__new__(cls, protocol)
+
+    def __init__(self, protocol: int = ssl.PROTOCOL_TLS_CLIENT):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._latest: Dict[Optional[str], "weakref.ref[ssl.SSLObject]"] = {}
+        self._sessions: Dict[Optional[str], ssl.SSLSession] = {}
+        self.resumed_offers = 0
+
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        if session is None and not server_side:
+            session = self._session_for(server_hostname)
+            if session is not None:
+                self.resumed_offers += 1
+        sslobj = super().wrap_bio(incoming, outgoing, server_side, server_hostname, session)
+        if not server_side:
+            with self._lock:
+                self._latest[server_hostname] = weakref.ref(sslobj)
+        return sslobj
+
+    def _session_for(self, server_hostname: Optional[str]) -> Optional[ssl.SSLSession]:
+        with self._lock:
+            latest = self._latest.get(server_hostname)
+            sslobj = latest() if latest is not None else None
+            # TLS 1.3 tickets arrive after the handshake, so pick the session
+            # up from the previous connection now rather than when it opened.
+            if sslobj is not None:
+                try:
+                    session = sslobj.session
+                except (ValueError, ssl.SSLError):
+                    session = None
+                if session is not None and (session.has_ticket or session.id):
+                    self._sessions[server_hostname] = session
+            session = self._sessions.get(server_hostname)
+            if session is not None and time.time() >= session.time + session.timeout:
+                del self._sessions[server_hostname]
+                session = None
+            return session
+
+
+_ssl_context: Optional[ResumingSSLContext] = None
+
+
+def ssl_context() -> ResumingSSLContext:
+    """The process-wide client SSL context, verifying certificates like aiohttp's default."""
+    global _ssl_context
+    if _ssl_context is None:
+        context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.load_default_certs()
+        _ssl_context = context
+    return _ssl_context
+
+
+def make_connector(limit: int = 0) -> aiohttp.TCPConnector:
+    """TCPConnector for signaling traffic: unlimited pool (WebSockets hold their
+    connection for their whole life), cached DNS and resumable TLS sessions."""
+    return aiohttp.TCPConnector(
+        limit=limit,
+        ttl_dns_cache=300,
+        keepalive_timeout=30,
+        ssl=ssl_context(),
+    )
+
+
+SessionKey = Tuple[asyncio.AbstractEventLoop, bool, str, int]
+
+
+class _Entry:
+    __slots__ = ("session", "refs")
+
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+        self.refs = 0
+
+
+class SessionRegistry:
+    """aiohttp ClientSessions shared by every Socket and API talking to one server.
+
+    ``acquire(secure, host, port)`` returns the session for that server on
+    the running event loop, creating it on first use; ``release`` gives it
+    back and closes it with its last reference. All sessions use
+    ``make_connector()``, so connections share the DNS cache of their
+    session and TLS sessions are resumed process-wide.
+    """
+
+    def __init__(self):
+        self._entries: Dict[SessionKey, _Entry] = {}
+        self._keys: Dict[int, SessionKey] = {}
+        self.created = 0
+        self.reused = 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._entries),
+            "references": sum(entry.refs for entry in self._entries.values()),
+            "created": self.created,
+            "reused": self.reused,
+            "tls_resumption_offers": _ssl_context.resumed_offers if _ssl_context is not None else 0,
+        }
+
+    def acquire(self, secure: bool, host: str, port: int) -> aiohttp.ClientSession:
+        key = (asyncio.get_running_loop(), bool(secure), host, int(port))
+        entry = self._entries.get(key)
+        if entry is None or entry.session.closed:
+            entry = self._entries[key] = _Entry(aiohttp.ClientSession(connector=make_connector()))
+            self._keys[id(entry.session)] = key
+            self.created += 1
+            logger.debug("Created shared session for %s:%s", host, port)
+        else:
+            self.reused += 1
+        entry.refs += 1
+        return entry.session
+
+    async def release(self, session: aiohttp.ClientSession) -> None:
+        key = self._keys.get(id(session))
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None or entry.session is not session:
+            return
+        entry.refs -= 1
+        if entry.refs <= 0:
+            del self._entries[key]
+            del self._keys[id(session)]
+            await session.close()
+
+    async def close_all(self) -> None:
+        """Close every session, whatever its references."""
+        entries, self._entries = list(self._entries.values()), {}
+        self._keys.clear()
+        for entry in entries:
+            await entry.session.close()
+
+
+# Shared by every Peer in the process.
+sessions = SessionRegistry()
@@ -1,111 +1,252 @@
-import json
 import asyncio
+import random
+from collections import deque
 import aiohttp
-from typing import Any, List, Optional
+from typing import Any, Deque, Dict, Iterable, List, Optional
 from pyee.asyncio import AsyncIOEventEmitter
 
 # Assuming these are defined elsewhere
-from peerjs_py.logger import logger
-from peerjs_py.enums import ServerMessageType, SocketEventType, EnumAwareJSONEncoder
+from peerjs_py.logger import logger, lazy, preview, Sampler, TRACE, TRACE_SAMPLE
+from peerjs_py.enums import ServerMessageType, SocketEventType
+from peerjs_py.json_codec import get_json_codec
+from peerjs_py.heartbeat import HeartbeatScheduler
+from peerjs_py.session_registry import sessions
 
 version = "0.1.0"
 
+# Outbox entry that makes the writer send a WebSocket ping frame.
+_PING = object()
+
+
 class Socket(AsyncIOEventEmitter):
-    def __init__(self, secure: bool, host: str, port: int, path: str, key: str, ping_interval: float = 5.0):
+    # Encoded messages waiting for the writer; past this many, send() waits for it.
+    MAX_QUEUED_FRAMES = 1024
+
+    def __init__(self, secure: bool, host: str, port: int, path: str, key: str, ping_interval: float = 5.0,
+                 json_codec: Any = None, reconnect: bool = False, max_reconnect_attempts: Optional[int] = None,
+                 reconnect_delay: float = 0.5, reconnect_max_delay: float = 30.0,
+                 pong_timeout: Optional[float] = None):
         super().__init__()
+        self._codec = get_json_codec(json_codec)
         self._disconnected: bool = True
         self._id: Optional[str] = None
         self._messages_queue: List[dict] = []
         self._session: Optional[aiohttp.ClientSession] = None
         self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
-        self._ws_ping_task: Optional[asyncio.Task] = None
+        # Every ping_interval the shared HeartbeatScheduler sends the server a
+        # JSON heartbeat and a WebSocket ping. A connection that has not
+        # received anything pong_timeout seconds after a ping is treated as dead.
+        self.ping_interval = ping_interval
+        self.pong_timeout = ping_interval if pong_timeout is None else pong_timeout
+        self._last_seen = 0.0
+        self._ping_sent_at: Optional[float] = None
+        self._next_ping_at = 0.0
+        self.dead_connections = 0
+        # Outbound frames, written in order by a single writer task. The events
+        # are created with the task, inside the running loop. Writes are only
+        # serialized, not merged: every frame is still its own WebSocket message.
+        self._outbox: Deque[Any] = deque()
+        self._outbox_ready: Optional[asyncio.Event] = None
+        self._outbox_empty: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self.messages_written = 0
+        self.writer_passes = 0
+        self._trace_received = Sampler(TRACE_SAMPLE)
+        self._trace_sent = Sampler(TRACE_SAMPLE)
+        # Reconnecting after the connection drops (not after close()), with
+        # full-jitter exponential backoff between attempts.
+        self.reconnect = reconnect
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self._token: Optional[str] = None
+        self._closing = False
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self.reconnects = 0
+        self.reconnect_attempts = 0
+        self.last_reconnect_latency: Optional[float] = None
+        self.max_reconnect_latency: Optional[float] = None
+        self.dropped_messages = 0
+        # Server the shared ClientSession is looked up by in the session registry.
+        self._server = (secure, host, port)
         ws_protocol = "wss://" if secure else "ws://"
         self._base_url = f"{ws_protocol}{host}:{port}{path}peerjs?key={key}"
-        self.ping_interval = ping_interval
+
+    @property
+    def reconnecting(self) -> bool:
+        return self._disconnected and self._reconnect_task is not None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "messages_written": self.messages_written,
+            "writer_passes": self.writer_passes,
+            "reconnects": self.reconnects,
+            "reconnect_attempts": self.reconnect_attempts,
+            "last_reconnect_latency": self.last_reconnect_latency,
+            "max_reconnect_latency": self.max_reconnect_latency,
+            "dropped_messages": self.dropped_messages,
+            "dead_connections": self.dead_connections,
+        }
 
     async def start(self, id: str, token: str) -> None:
         logger.debug(f"socket start: id:{id}")
         self._id = id
-        ws_url = f"{self._base_url}&id={id}&token={token}&version={version}"
+        self._token = token
 
         if self._ws or not self._disconnected:
             logger.info("Socket already connected")
             return
-        
-        self._session = aiohttp.ClientSession()
+
+        self._closing = False
+        if not await self._connect():
+            await self._cleanup()
+
+        logger.debug(f"socket start Done")
+
+    async def _connect(self) -> bool:
+        ws_url = f"{self._base_url}&id={self._id}&token={self._token}&version={version}"
+        if self._session is None or self._session.closed:
+            # Kept across reconnects, released in _cleanup().
+            self._session = sessions.acquire(*self._server)
 
         try:
-            self._ws = await self._session.ws_connect(ws_url)
+            # Pongs are handled by _listen(), to track liveness.
+            self._ws = await self._session.ws_connect(ws_url, autoping=False)
             self._disconnected = False
             logger.info(f"WebSocket connected to {self._base_url}")
             logger.debug(f"listen task start")
-            asyncio.create_task(self._listen())
+            asyncio.create_task(self._listen(self._ws))
             await self._on_open()
             logger.debug(f"set self._on_open()")
+            return True
         except Exception as e:
             logger.error(f"Failed to connect: {e}")
-            await self._cleanup()
+            return False
 
-        logger.debug(f"socket start Done")
-
-    async def _listen(self) -> None:
+    async def _listen(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        loop = asyncio.get_running_loop()
         try:
-            async for msg in self._ws:
+            async for msg in ws:
+                self._last_seen = loop.time()
                 if msg.type == aiohttp.WSMsgType.TEXT:
                     await self._on_message(msg.data)
+                elif msg.type == aiohttp.WSMsgType.PING:
+                    await ws.pong(msg.data)
                 elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
                     break
         finally:
-            await self._on_close()
+            # A connection given up on by the heartbeat has been replaced already.
+            if ws is self._ws:
+                await self._on_close()
 
     async def _on_message(self, message: str) -> None:
         try:
-            data = json.loads(message)
-            logger.debug(f"Socket Server message received: {message}")
+            data = self._codec.loads(message)
+            if TRACE and self._trace_received():
+                logger.debug("Socket Server message received: %s", lazy(preview, message))
             self.emit(SocketEventType.Message.value, data)
-        except json.JSONDecodeError:
-            logger.error("JSONDecodeError Invalid server message", message)
+        except ValueError:
+            logger.error("JSONDecodeError Invalid server message: %s", message)
 
     async def _on_close(self) -> None:
         if self._disconnected:
             return
 
+        self._disconnected = True
+        if self.reconnect and not self._closing:
+            logger.warning("Lost connection to signaling server, reconnecting.")
+            HeartbeatScheduler.for_loop().remove(self)
+            self._ws = None
+            self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+            self.emit(SocketEventType.Reconnecting.value)
+            return
+
         logger.info("Socket closed.")
+        # Listeners are dropped by _cleanup(), so tell them first.
+        self.emit(SocketEventType.Disconnected.value)
         await self._cleanup()
-        self._disconnected = True
+
+    async def _reconnect_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        attempt = 0
+        while self.max_reconnect_attempts is None or attempt < self.max_reconnect_attempts:
+            await asyncio.sleep(random.uniform(0, min(self.reconnect_max_delay, self.reconnect_delay * 2 ** attempt)))
+            attempt += 1
+            self.reconnect_attempts += 1
+            if await self._connect():
+                self._reconnect_task = None
+                latency = loop.time() - started
+                self.reconnects += 1
+                self.last_reconnect_latency = latency
+                self.max_reconnect_latency = max(latency, self.max_reconnect_latency or 0.0)
+                logger.info("Reconnected to signaling server after %.3fs (%d attempts)", latency, attempt)
+                self.emit(SocketEventType.Reconnected.value, latency)
+                return
+
+        logger.error("Could not reconnect to signaling server after %d attempts", attempt)
+        self._reconnect_task = None
         self.emit(SocketEventType.Disconnected.value)
+        await self._cleanup()
 
     async def _on_open(self) -> None:
         if self._disconnected:
             return
 
+        # Messages queued while reconnecting go out first, in order.
+        if self._outbox:
+            self._outbox_ready.set()
         await self._send_queued_messages()
         logger.debug(f"Socket open: self._id: {self._id}")
         self._schedule_heartbeat()
 
     def _schedule_heartbeat(self) -> None:
-        if self._ws_ping_task:
-            self._ws_ping_task.cancel()
-        self._ws_ping_task = asyncio.create_task(self._heartbeat_loop())
+        scheduler = HeartbeatScheduler.for_loop()
+        now = asyncio.get_running_loop().time()
+        self._last_seen = now
+        self._ping_sent_at = None
+        self._next_ping_at = now + self.ping_interval
+        scheduler.add(self, self._next_ping_at)
         logger.debug("_schedule_heartbeat Done")
 
-    async def _heartbeat_loop(self) -> None:
-        logger.debug(f"_heartbeat_loop start: {self.ping_interval}")
-        while True:
-            try:
-                # logger.info(f"_heartbeat_loop iteration sleep start interval:{self.ping_interval}  id:{self._id}")
-                await asyncio.sleep(self.ping_interval)
-                await self._send_heartbeat()
-            except Exception as e:
-                logger.error(f"Error in _heartbeat_loop: {e}")
-
-    async def _send_heartbeat(self) -> None:
+    def _on_heartbeat(self, now: float) -> Optional[float]:
+        """Called by the HeartbeatScheduler; returns when to be called next."""
+        if self._disconnected or not self._ws_open():
+            return None
+        if self._ping_sent_at is not None and self._last_seen < self._ping_sent_at:
+            deadline = self._ping_sent_at + self.pong_timeout
+            if now < deadline:
+                return deadline
+            self.dead_connections += 1
+            logger.warning("Signaling server did not answer within %.1fs, closing the connection.",
+                           self.pong_timeout)
+            asyncio.ensure_future(self._on_dead(self._ws))
+            return None
+        if now < self._next_ping_at:
+            return self._next_ping_at
+        self._send_heartbeat()
+        self._ping_sent_at = now
+        self._next_ping_at = now + self.ping_interval
+        return min(self._next_ping_at, now + self.pong_timeout)
+
+    def _send_heartbeat(self) -> None:
         if not self._ws_open():
             logger.info("Cannot send heartbeat, because socket closed")
             return
 
-        message = json.dumps({"type": ServerMessageType.Heartbeat.value}, cls=EnumAwareJSONEncoder)
-        await self._ws.send_str(message)
+        # The JSON heartbeat keeps the PeerServer from expiring us; the ping's
+        # pong tells us the connection is alive.
+        self._enqueue(self._codec.dumps({"type": ServerMessageType.Heartbeat.value}))
+        self._enqueue(_PING)
+
+    async def _on_dead(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        if ws is not self._ws:
+            return
+        # Waiting for a dead server's close frame could take the full close
+        # timeout; close in the background and go on as if it had dropped.
+        asyncio.ensure_future(ws.close())
+        await self._on_close()
 
     def _ws_open(self) -> bool:
         return self._ws and not self._ws.closed
@@ -116,9 +257,19 @@ class Socket(AsyncIOEventEmitter):
 
         for message in copied_queue:
             await self.send(message)
+        await self.flush()
 
     async def send(self, data: Any) -> None:
-        if self._disconnected:
+        """Queue a message for the server.
+
+        Messages are encoded here and written by a single writer task, in the
+        order they were sent, so messages to the same destination arrive in
+        order. Returns once the message is queued, unless more than
+        MAX_QUEUED_FRAMES are waiting, in which case it waits for the writer.
+        While reconnecting, messages are kept (the oldest dropped past
+        MAX_QUEUED_FRAMES) and sent once the connection is back.
+        """
+        if self._disconnected and not self.reconnecting:
             logger.info("Cannot send message, because socket disconnected")
             return
 
@@ -130,36 +281,98 @@ class Socket(AsyncIOEventEmitter):
             self.emit(SocketEventType.Error.value, "Invalid message")
             return
 
-        if not self._ws_open():
+        if not self.reconnecting and not self._ws_open():
             logger.info("Cannot send message, because _ws_open is False")
             return
 
-        message = json.dumps(data, cls=EnumAwareJSONEncoder)
-        if self._ws:
-            logger.debug("Sending _ws message: %s", message)
-            await self._ws.send_str(message)
-        else:
-            logger.error("Cannot send message, because _ws is None")
+        message = self._codec.dumps(data)
+        if TRACE and self._trace_sent():
+            logger.debug("Queueing _ws message: %s", lazy(preview, message))
+        self._enqueue(message)
+        if len(self._outbox) >= self.MAX_QUEUED_FRAMES:
+            if self.reconnecting:
+                self._outbox.popleft()
+                self.dropped_messages += 1
+                logger.warning("Signaling queue full while reconnecting, dropped the oldest message")
+            else:
+                await self.flush()
+
+    async def flush(self) -> None:
+        """Wait until every queued message has been handed to the WebSocket."""
+        if self._outbox_empty is not None and self._writer_task is not None:
+            await self._outbox_empty.wait()
+
+    def _enqueue(self, frame: Any) -> None:
+        if self._writer_task is None or self._writer_task.done():
+            self._outbox_ready = asyncio.Event()
+            self._outbox_empty = asyncio.Event()
+            self._writer_task = asyncio.get_running_loop().create_task(self._write_loop())
+        self._outbox.append(frame)
+        self._outbox_empty.clear()
+        self._outbox_ready.set()
+
+    async def _write_loop(self) -> None:
+        while True:
+            await self._outbox_ready.wait()
+            # Yield once, so that everything sent in this loop iteration
+            # (e.g. a burst of candidates) is written in a single pass.
+            await asyncio.sleep(0)
+            self._outbox_ready.clear()
+            if self.reconnecting:
+                # Keep everything for the new connection; _on_open wakes us.
+                continue
+            frames, self._outbox = self._outbox, deque()
+            await self._write_frames(frames)
+            if not self._outbox:
+                self._outbox_empty.set()
+
+    async def _write_frames(self, frames: Iterable[Any]) -> None:
+        """Hand ``frames`` to the WebSocket in order, one send_str() or ping() each."""
+        if not self._ws_open():
+            logger.info("Dropping queued messages, because _ws_open is False")
+            return
+        ws = self._ws
+        self.writer_passes += 1
+        try:
+            for frame in frames:
+                if frame is _PING:
+                    await ws.ping()
+                else:
+                    await ws.send_str(frame)
+                self.messages_written += 1
+        except Exception as e:
+            logger.error("Failed to send queued messages: %s", e)
 
     async def close(self) -> None:
-        if self._disconnected:
+        if self._disconnected and not self.reconnecting:
             return
 
         await self._cleanup()
         self._disconnected = True
 
     async def _cleanup(self) -> None:
+        self._closing = True
+        if self._reconnect_task and self._reconnect_task is not asyncio.current_task():
+            self._reconnect_task.cancel()
+        self._reconnect_task = None
+        if self._writer_task:
+            self._writer_task.cancel()
+        self._writer_task = None
+        if self._outbox:
+            frames, self._outbox = self._outbox, deque()
+            await self._write_frames(frames)
+        if self._outbox_empty is not None:
+            self._outbox_empty.set()
+
         if self._ws:
             await self._ws.close()
         self._ws = None
 
         if self._session:
-            await self._session.close() # aiohttp.ClientSession()
+            await sessions.release(self._session)
         self._session = None
 
-        if self._ws_ping_task:
-            self._ws_ping_task.cancel()
-        self._ws_ping_task = None  
+        HeartbeatScheduler.for_loop().remove(self)
         
         # Remove all event listeners
         self._events.clear()
\ No newline at end of file
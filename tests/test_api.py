@@ -0,0 +1,101 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from peerjs_py.api import API
+from peerjs_py.peer import ReferrerPolicy
+
+
+class TestAPI(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.responses = []
+        self.requests = []
+        self.headers = []
+        self.peers = set()
+        app = web.Application()
+        app.router.add_get("/peerjs/{method}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.api = API({"host": "127.0.0.1", "port": port, "secure": False, "path": "/",
+                        "api_timeout": 0.5, "api_retries": 2})
+        self.api.BACKOFF_BASE = 0.01
+
+    async def asyncTearDown(self):
+        await self.api.close()
+        await self.runner.cleanup()
+
+    async def handle(self, request):
+        self.requests.append(request.match_info["method"])
+        self.headers.append(request.headers.get("Referrer-Policy"))
+        self.peers.add(request.transport.get_extra_info("peername"))
+        status, body = self.responses.pop(0) if self.responses else (200, "abc123")
+        if status == "slow":
+            await asyncio.sleep(2)
+            status = 200
+        return web.Response(status=status, text=body)
+
+    async def test_retrieve_id_reuses_connection(self):
+        self.assertEqual(await self.api.retrieve_id(), "abc123")
+        self.assertEqual(await self.api.retrieve_id(), "abc123")
+        self.assertEqual(self.requests, ["id", "id"])
+        self.assertEqual(len(self.peers), 1)
+
+    async def test_referrer_policy_header(self):
+        self.api._options["referrerPolicy"] = ReferrerPolicy.NO_REFERRER
+        await self.api.retrieve_id()
+        self.api._options["referrerPolicy"] = "origin"
+        await self.api.retrieve_id()
+        self.assertEqual(self.headers, ["no-referrer", "origin"])
+
+    async def test_list_all_peers(self):
+        self.responses.append((200, '["a", "b"]'))
+        self.assertEqual(await self.api.list_all_peers(), ["a", "b"])
+
+    async def test_server_errors_are_retried(self):
+        self.responses += [(503, ""), (500, ""), (200, "later")]
+        self.assertEqual(await self.api.retrieve_id(), "later")
+        self.assertEqual(len(self.requests), 3)
+
+    async def test_client_errors_are_not_retried(self):
+        self.responses.append((401, ""))
+        with self.assertRaisesRegex(Exception, "permission to list peers"):
+            await self.api.list_all_peers()
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_gives_up_after_retries(self):
+        self.responses += [(503, "")] * 5
+        with self.assertRaisesRegex(Exception, "Could not get an ID"):
+            await self.api.retrieve_id()
+        self.assertEqual(len(self.requests), 3)
+
+    async def test_timeout_does_not_block_the_loop(self):
+        self.responses += [("slow", "")] * 3
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        with self.assertRaises(Exception):
+            await self.api.retrieve_id()
+        task.cancel()
+        self.assertEqual(len(self.requests), 3)
+        self.assertGreater(ticks, 50)
+
+    async def test_close(self):
+        await self.api.retrieve_id()
+        session = self.api._session
+        await self.api.close()
+        self.assertTrue(session.closed)
+        self.assertEqual(await self.api.retrieve_id(), "abc123")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from peerjs_py.dataconnection.BufferedConnection.BinaryPack import BinaryPack
+from peerjs_py.dataconnection.BufferedConnection.Json import Json
+from peerjs_py.enums import ConnectionEventType
+
+
+class RecordingDataChannel(AsyncIOEventEmitter):
+    def __init__(self):
+        super().__init__()
+        self.readyState = "open"
+        self.bufferedAmount = 0
+        self.bufferedAmountLowThreshold = 0
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+
+def open_connection(connection_class, options, remote_batching=True):
+    if remote_batching:
+        options = dict(options, _payload={'batching': True})
+    connection = connection_class("remote", Mock(), options)
+    connection.data_channel = RecordingDataChannel()
+    connection._open = True
+    return connection
+
+
+async def deliver(frames, connection_class):
+    receiver = connection_class("remote", None, {})
+    received = []
+    receiver.on(ConnectionEventType.Data.value, received.append)
+    for frame in frames:
+        await receiver._handle_data_message(frame)
+    return received
+
+
+class BatchingTests:
+    connection_class = None
+
+    async def test_batches_within_interval(self):
+        sender = open_connection(self.connection_class, {'batchInterval': 2000})
+        self.assertTrue(sender.batching)
+        messages = [{'n': i, 'text': 'x' * i} for i in range(10)]
+        for message in messages:
+            await sender.send(message)
+        self.assertEqual(sender.data_channel.sent, [])
+
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(sender.data_channel.sent), 1)
+        self.assertEqual(await deliver(sender.data_channel.sent, self.connection_class), messages)
+
+    async def test_flushes_at_max_bytes(self):
+        sender = open_connection(self.connection_class, {'batchInterval': 10_000_000, 'batchMaxBytes': 100})
+        for i in range(40):
+            await sender.send('abcdefghij')
+        self.assertGreater(len(sender.data_channel.sent), 1)
+        await sender._flush_batch()
+        frames = sender.data_channel.sent
+        self.assertTrue(all(len(frame) <= 150 for frame in frames))
+        self.assertEqual(await deliver(frames, self.connection_class), ['abcdefghij'] * 40)
+
+    async def test_single_message_is_not_framed(self):
+        sender = open_connection(self.connection_class, {'batchInterval': 100})
+        await sender.send({'only': 1})
+        await asyncio.sleep(0.05)
+        plain = open_connection(self.connection_class, {})
+        await plain.send({'only': 1})
+        self.assertEqual(sender.data_channel.sent, plain.data_channel.sent)
+
+    async def test_no_batching_without_remote_support(self):
+        sender = open_connection(self.connection_class, {'batchInterval': 2000}, remote_batching=False)
+        self.assertFalse(sender.batching)
+        for i in range(5):
+            await sender.send(i)
+        self.assertEqual(len(sender.data_channel.sent), 5)
+        self.assertEqual(await deliver(sender.data_channel.sent, self.connection_class), list(range(5)))
+
+    async def test_flush_on_close(self):
+        sender = open_connection(self.connection_class, {'batchInterval': 10_000_000})
+        await sender.send('a')
+        await sender.send('b')
+        await sender.close({'flush': True})
+        self.assertEqual(len(sender.data_channel.sent), 1)
+        self.assertEqual(await deliver(sender.data_channel.sent, self.connection_class), ['a', 'b'])
+
+
+class TestBinaryPackBatching(BatchingTests, unittest.IsolatedAsyncioTestCase):
+    connection_class = BinaryPack
+
+    async def test_large_message_keeps_order(self):
+        sender = open_connection(BinaryPack, {'batchInterval': 10_000_000})
+        large = b'L' * 40000
+        await sender.send('before')
+        await sender.send(large)
+        await sender.send('after')
+        await sender._flush_batch()
+        self.assertEqual(await deliver(sender.data_channel.sent, BinaryPack), ['before', large, 'after'])
+
+
+class TestJsonBatching(BatchingTests, unittest.IsolatedAsyncioTestCase):
+    connection_class = Json
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import struct
+import unittest
+from unittest import mock
+
+from peerjs_py.binarypack import binarypack
+from peerjs_py.binarypack.binarypack import pack, unpack, pack_into, packed_size, pack_array_header, Packer, Unpacker, OutOfData
+
+
+def fixstr(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return bytes([0xb0 | len(data)]) + data
+
+
+class TestUnpacker(unittest.TestCase):
+    def test_immediates(self):
+        self.assertEqual(unpack(b'\x05'), 5)
+        self.assertEqual(unpack(b'\x7f'), 127)
+        self.assertEqual(unpack(b'\xff'), -1)
+        self.assertEqual(unpack(b'\xe0'), -32)
+        self.assertIsNone(unpack(b'\xc0'))
+        self.assertIs(unpack(b'\xc2'), False)
+        self.assertIs(unpack(b'\xc3'), True)
+
+    def test_scalars(self):
+        self.assertEqual(unpack(b'\xcc\xff'), 255)
+        self.assertEqual(unpack(b'\xcd' + struct.pack('!H', 65535)), 65535)
+        self.assertEqual(unpack(b'\xce' + struct.pack('!I', 2 ** 32 - 1)), 2 ** 32 - 1)
+        self.assertEqual(unpack(b'\xcf' + struct.pack('!Q', 2 ** 64 - 1)), 2 ** 64 - 1)
+        self.assertEqual(unpack(b'\xd0' + struct.pack('!b', -100)), -100)
+        self.assertEqual(unpack(b'\xd1' + struct.pack('!h', -1000)), -1000)
+        self.assertEqual(unpack(b'\xd2' + struct.pack('!i', -100000)), -100000)
+        self.assertEqual(unpack(b'\xd3' + struct.pack('!q', -2 ** 40)), -2 ** 40)
+        self.assertEqual(unpack(b'\xca' + struct.pack('!f', 0.5)), 0.5)
+        self.assertEqual(unpack(b'\xcb' + struct.pack('!d', 1.25)), 1.25)
+
+    def test_strings_and_raw(self):
+        self.assertEqual(unpack(fixstr('héllo')), 'héllo')
+        long_string = 'x' * 300
+        self.assertEqual(unpack(b'\xd8' + struct.pack('!H', 300) + long_string.encode()), long_string)
+        self.assertEqual(unpack(b'\xa3abc'), b'abc')
+        self.assertEqual(unpack(b'\xda' + struct.pack('!H', 1000) + bytes(1000)), bytes(1000))
+        self.assertEqual(unpack(b'\xdb' + struct.pack('!I', 3) + b'xyz'), b'xyz')
+
+    def test_containers(self):
+        data = (b'\x83'
+                + fixstr('list') + b'\x94\x01\xff' + fixstr('a') + b'\xcd\x01\x00'
+                + fixstr('nested') + b'\x81' + fixstr('k') + b'\x91\xc0'
+                + fixstr('raw') + b'\xa2\x00\x01')
+        self.assertEqual(unpack(data), {
+            'list': [1, -1, 'a', 256],
+            'nested': {'k': [None]},
+            'raw': b'\x00\x01',
+        })
+        self.assertEqual(unpack(b'\xdc' + struct.pack('!H', 20) + b'\x01' * 20), [1] * 20)
+        self.assertEqual(unpack(b'\xde' + struct.pack('!H', 1) + fixstr('a') + b'\x02'), {'a': 2})
+
+    def test_zero_copy_returns_views(self):
+        data = b'\x82' + fixstr('data') + b'\xa3abc' + b'\xa1k' + b'\x01'
+        result = unpack(data, zero_copy=True)
+        self.assertIsInstance(result['data'], memoryview)
+        self.assertEqual(result['data'].tobytes(), b'abc')
+        # raw map keys are still hashable
+        self.assertEqual(result[b'k'], 1)
+
+    def test_sequential_values(self):
+        unpacker = Unpacker(b'\x01' + fixstr('ab') + b'\xc0')
+        self.assertEqual(unpacker.unpack(), 1)
+        self.assertEqual(unpacker.unpack(), 'ab')
+        self.assertIsNone(unpacker.unpack())
+        self.assertEqual(unpacker.offset, 5)
+
+    def test_truncated_input(self):
+        for data in (b'', b'\xcd\x01', b'\xb5abc', b'\xda\x00\x10abc', b'\x92\x01'):
+            with self.assertRaises(OutOfData):
+                unpack(data)
+
+    def test_unknown_type_byte(self):
+        with self.assertRaises(ValueError):
+            unpack(b'\xc1')
+
+
+class TestPacker(unittest.TestCase):
+    VALUES = [
+        None, True, False, 0, 127, -1, -32, -33, -128, -129, 128, 255, 256, 65535, 65536,
+        2 ** 32, 2 ** 64 - 1, -2 ** 63, 1.5, -0.25, '', 'a' * 15, 'a' * 16, 'é' * 40000,
+        b'', b'x' * 15, b'x' * 16, b'y' * 70000, [1, [2, [3]]], list(range(20)),
+        {'a': {'b': [None, 'c']}}, {str(i): i for i in range(17)},
+    ]
+
+    def test_round_trip_and_size(self):
+        for value in self.VALUES:
+            packed = pack(value)
+            self.assertEqual(len(packed), packed_size(value), value)
+            self.assertEqual(unpack(packed), value)
+
+    def test_binarypack_wire_format(self):
+        self.assertEqual(pack('abc'), b'\xb3abc')
+        self.assertEqual(pack(b'abc'), b'\xa3abc')
+        self.assertEqual(pack('a' * 16), b'\xd8\x00\x10' + b'a' * 16)
+        self.assertEqual(pack(b'a' * 16), b'\xda\x00\x10' + b'a' * 16)
+        self.assertEqual(pack([1, 2]), b'\x92\x01\x02')
+        self.assertEqual(pack({'a': None}), b'\x81\xb1a\xc0')
+        self.assertEqual(pack(-100), b'\xd0\x9c')
+        self.assertEqual(pack(1.0), b'\xcb' + struct.pack('!d', 1.0))
+
+    def test_bytes_like_and_tuples(self):
+        self.assertEqual(unpack(pack(bytearray(b'ab'))), b'ab')
+        self.assertEqual(unpack(pack(memoryview(b'cd'))), b'cd')
+        self.assertEqual(unpack(pack((1, 'x'))), [1, 'x'])
+
+    def test_pack_into(self):
+        buffer = bytearray(32)
+        end = pack_into({'n': 1}, buffer, offset=4)
+        self.assertEqual(bytes(buffer[4:end]), pack({'n': 1}))
+        with self.assertRaises(ValueError):
+            pack_into(list(range(40)), bytearray(8))
+
+    def test_pack_array_header(self):
+        for items in ([], ['a', 1], list(range(20)), list(range(70000))):
+            joined = pack_array_header(len(items)) + b''.join(pack(item) for item in items)
+            self.assertEqual(joined, pack(items))
+
+    def test_pack_to_buffer_reuses_buffer(self):
+        buffer = bytearray(64)
+        packer = Packer(buffer)
+        view = packer.pack_to_buffer([1, 'two'])
+        self.assertIs(packer.buffer, buffer)
+        self.assertEqual(bytes(view), pack([1, 'two']))
+        view = packer.pack_to_buffer(b'z' * 100)
+        self.assertEqual(unpack(bytes(view)), b'z' * 100)
+        self.assertGreaterEqual(len(packer.buffer), 100)
+
+    def test_unpackable_values(self):
+        with self.assertRaises(TypeError):
+            pack(object())
+        with self.assertRaises(OverflowError):
+            pack(2 ** 64)
+
+
+class TestStreamingUnpacker(unittest.TestCase):
+    MESSAGES = [{'seq': 1, 'data': b'x' * 50000}, [1, 2, 'three'], None, 's' * 300, -5]
+
+    def test_feed_at_any_byte_boundary(self):
+        stream = b''.join(pack(message) for message in self.MESSAGES)
+        for step in (1, 3, 1000, len(stream)):
+            unpacker = Unpacker()
+            received = []
+            for start in range(0, len(stream), step):
+                unpacker.feed(stream[start:start + step])
+                received.extend(unpacker)
+            self.assertEqual(received, self.MESSAGES)
+            self.assertIs(type(received[0]['data']), bytes)
+            self.assertEqual(unpacker.buffered, 0)
+
+    def test_yields_message_when_last_byte_arrives(self):
+        packed = pack({'k': 'value'})
+        unpacker = Unpacker()
+        unpacker.feed(packed[:-1])
+        self.assertEqual(list(unpacker), [])
+        unpacker.feed(packed[-1:] + pack(7)[:1])
+        self.assertEqual(list(unpacker), [{'k': 'value'}, 7])
+
+    def test_consumed_bytes_are_compacted(self):
+        unpacker = Unpacker()
+        for _ in range(100):
+            unpacker.feed(pack(b'y' * 1000))
+            self.assertEqual(len(list(unpacker)), 1)
+        unpacker.feed(pack(1)[:0])
+        self.assertEqual(len(unpacker._data), 0)
+
+    def test_initial_data_is_not_modified(self):
+        initial = bytearray(pack(1))
+        unpacker = Unpacker(initial)
+        unpacker.feed(pack(2))
+        self.assertEqual(list(unpacker), [1, 2])
+        self.assertEqual(initial, bytearray(pack(1)))
+
+    def test_feed_completes_partial_message_of_initial_data(self):
+        first, second = pack({'a': 'y' * 100}), pack({'payload': 'z' * 40})
+        unpacker = Unpacker(first + second[:15])
+        self.assertEqual(list(unpacker), [{'a': 'y' * 100}])
+        unpacker.feed(second[15:])
+        self.assertEqual(list(unpacker), [{'payload': 'z' * 40}])
+        self.assertEqual(unpacker.buffered, 0)
+
+    def test_partial_message_is_not_decoded_again_per_byte(self):
+        message = {f'k{i}': {'v': [i, 'x' * 20, b'\x00' * 3]} for i in range(200)}
+        packed = pack(message) + pack(1)
+        unpacker = Unpacker()
+        received = []
+        with mock.patch('peerjs_py.binarypack.binarypack._decode',
+                        wraps=binarypack._decode) as decode:
+            for index in range(len(packed)):
+                unpacker.feed(packed[index:index + 1])
+                received.extend(unpacker)
+        self.assertEqual(received, [message, 1])
+        # one full decode of the message (plus the attempt on its first byte), not one per byte fed
+        calls_per_decode = 1 + 200 * 3
+        self.assertLess(decode.call_count, 2 * calls_per_decode)
+
+    def test_zero_copy_unpacker_cannot_be_fed(self):
+        with self.assertRaises(ValueError):
+            Unpacker(b'', zero_copy=True).feed(b'\x01')
+
+
+if __name__ == '__main__':
+    unittest.main()
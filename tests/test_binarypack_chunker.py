@@ -0,0 +1,116 @@
+import asyncio
+import io
+import mmap
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from peerjs_py.binarypack.binarypack import pack, unpack
+from peerjs_py.dataconnection.BufferedConnection.BinaryPack import BinaryPack
+from peerjs_py.dataconnection.BufferedConnection.binaryPackChunker import BinaryPackChunker
+from peerjs_py.dataconnection.BufferedConnection.chunkReassembler import ChunkReassembler
+
+
+def reassemble(chunks):
+    reassembler = ChunkReassembler()
+    result = None
+    for chunk in chunks:
+        result = reassembler.add(chunk["__peerData"], chunk["n"], chunk["total"], chunk["data"])
+    return result
+
+
+async def collect(iterator):
+    return [chunk async for chunk in iterator]
+
+
+class TestBinaryPackChunker(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.chunker = BinaryPackChunker()
+        self.blob = bytes(range(256)) * 200
+
+    def test_iter_chunks_is_lazy_and_zero_copy(self):
+        chunks = self.chunker.iter_chunks(self.blob)
+        first = next(chunks)
+        self.assertIsInstance(first["data"], memoryview)
+        self.assertEqual(first["total"], 4)
+        self.assertEqual(reassemble([first, *chunks]), self.blob)
+
+    def test_chunk_ids_increase_per_message(self):
+        first = self.chunker.chunk(self.blob)
+        second = self.chunker.chunk(self.blob)
+        self.assertEqual({c["__peerData"] for c in first}, {1})
+        self.assertEqual({c["__peerData"] for c in second}, {2})
+
+    async def test_file_object_source(self):
+        chunks = await collect(self.chunker.aiter_chunks(io.BytesIO(self.blob)))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(reassemble(chunks), self.blob)
+
+    async def test_mmap_source(self):
+        with tempfile.TemporaryFile() as file:
+            file.write(self.blob)
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                chunks = await collect(self.chunker.aiter_chunks(mapped))
+                self.assertEqual(reassemble(chunks), self.blob)
+                del chunks
+
+    async def test_async_iterator_source_is_rechunked(self):
+        async def pieces():
+            for start in range(0, len(self.blob), 1000):
+                yield self.blob[start:start + 1000]
+
+        chunks = await collect(self.chunker.aiter_chunks(pieces(), size=len(self.blob)))
+        self.assertTrue(all(len(c["data"]) == self.chunker.chunked_mtu for c in chunks[:-1]))
+        self.assertEqual(reassemble(chunks), self.blob)
+
+    async def test_size_mismatch(self):
+        with self.assertRaises(ValueError):
+            await collect(self.chunker.aiter_chunks(iter([b'abc']), size=10))
+        with self.assertRaises(ValueError):
+            await collect(self.chunker.aiter_chunks(iter([b'abc']), size=2))
+        with self.assertRaises(ValueError):
+            await collect(self.chunker.aiter_chunks(iter([b'abc'])))
+
+
+class FakeDataChannel(AsyncIOEventEmitter):
+    def __init__(self):
+        super().__init__()
+        self.readyState = "open"
+        self.bufferedAmount = 0
+        self.bufferedAmountLowThreshold = 0
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+        self.bufferedAmount += len(data)
+
+    def drain(self):
+        self.bufferedAmount = 0
+        self.emit("bufferedamountlow")
+
+
+class TestBinaryPackChunkWindow(unittest.IsolatedAsyncioTestCase):
+    async def test_chunks_wait_for_buffered_amount(self):
+        connection = BinaryPack("remote", Mock(), {'chunkWindow': 2})
+        channel = FakeDataChannel()
+        connection.data_channel = channel
+        connection._open = True
+
+        payload = bytes(16300 * 6)
+        send_task = asyncio.create_task(connection.send(payload))
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(channel.sent), 2)
+        self.assertFalse(send_task.done())
+
+        while not send_task.done():
+            channel.drain()
+            await asyncio.sleep(0.01)
+        chunks = [unpack(data) for data in channel.sent]
+        self.assertEqual(unpack(bytes(reassemble(chunks))), payload)
+
+
+if __name__ == '__main__':
+    unittest.main()
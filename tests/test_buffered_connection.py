@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from peerjs_py.dataconnection.BufferedConnection.Raw import Raw
+
+
+class SlowDataChannel(AsyncIOEventEmitter):
+    """Queues what is sent until the test lets the network take it."""
+
+    def __init__(self):
+        super().__init__()
+        self.readyState = "open"
+        self.bufferedAmount = 0
+        self.bufferedAmountLowThreshold = 0
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+        self.bufferedAmount += len(data)
+
+    def transmit(self, amount=None):
+        amount = self.bufferedAmount if amount is None else amount
+        self.bufferedAmount = max(0, self.bufferedAmount - amount)
+        if self.bufferedAmount <= self.bufferedAmountLowThreshold:
+            self.emit("bufferedamountlow")
+
+
+def open_connection(options):
+    connection = Raw("remote", Mock(), options)
+    connection.data_channel = SlowDataChannel()
+    connection._open = True
+    return connection
+
+
+class TestBufferedConnection(unittest.IsolatedAsyncioTestCase):
+    async def test_sends_directly_below_high_water_mark(self):
+        connection = open_connection({'highWaterMark': 100})
+        await connection.send(b'x' * 10)
+        self.assertEqual(connection.data_channel.sent, [b'x' * 10])
+        self.assertEqual(connection.buffer_size, 0)
+
+    async def test_queues_and_drains_on_buffered_amount_low(self):
+        connection = open_connection({'highWaterMark': 100, 'lowWaterMark': 50})
+        channel = connection.data_channel
+        for i in range(20):
+            await connection.send(bytes([i]) * 10)
+
+        self.assertLess(len(channel.sent), 20)
+        self.assertGreater(connection.buffer_size, 0)
+
+        while len(channel.sent) < 20:
+            channel.transmit()
+            await asyncio.sleep(0)
+        self.assertEqual(channel.sent, [bytes([i]) * 10 for i in range(20)])
+        self.assertEqual(connection.buffer_size, 0)
+        self.assertEqual(connection.buffered_bytes, 0)
+
+    async def test_send_blocks_producer_until_queue_drains(self):
+        connection = open_connection({'highWaterMark': 100, 'lowWaterMark': 20})
+        channel = connection.data_channel
+        channel.bufferedAmount = 1000
+
+        for _ in range(10):
+            await connection.send(b'x' * 10)
+        blocked = asyncio.create_task(connection.send(b'y' * 10))
+        await asyncio.sleep(0.01)
+        self.assertFalse(blocked.done())
+        self.assertEqual(connection.buffer_stats["peakBytes"], 110)
+
+        channel.transmit()
+        await asyncio.wait_for(blocked, 1)
+        self.assertLessEqual(connection.buffered_bytes, 20)
+
+    async def test_burst_of_small_messages(self):
+        connection = open_connection({'highWaterMark': 64 * 1024})
+        channel = connection.data_channel
+        count = 100_000
+
+        async def produce():
+            for i in range(count):
+                await connection.send(i.to_bytes(4, 'big'))
+
+        producer = asyncio.create_task(produce())
+        while not producer.done() or connection.buffer_size:
+            channel.transmit()
+            await asyncio.sleep(0)
+        await producer
+
+        self.assertEqual(len(channel.sent), count)
+        self.assertEqual(int.from_bytes(channel.sent[-1], 'big'), count - 1)
+        self.assertLessEqual(connection.buffer_stats["peakBytes"], 64 * 1024 + 4)
+
+    async def test_close_releases_blocked_producers(self):
+        connection = open_connection({'highWaterMark': 10, 'lowWaterMark': 0})
+        connection.data_channel.bufferedAmount = 1000
+        blocked = asyncio.create_task(connection.send(b'x' * 20))
+        await asyncio.sleep(0.01)
+        self.assertFalse(blocked.done())
+
+        connection.provider = None
+        await connection.close()
+        await asyncio.wait_for(blocked, 1)
+        self.assertEqual(connection.buffer_size, 0)
+
+    async def test_waiters_share_one_buffered_amount_low_listener(self):
+        connection = open_connection({'highWaterMark': 100, 'lowWaterMark': 50})
+        channel = connection.data_channel
+        channel.bufferedAmount = 1000
+        waiters = [asyncio.create_task(connection._wait_for_buffered_amount(limit)) for limit in (50, 80, 200)]
+        await asyncio.sleep(0.01)
+        self.assertEqual(channel.bufferedAmountLowThreshold, 50)
+        self.assertEqual(len(channel.listeners("bufferedamountlow")), 1)
+
+        channel.transmit(960)
+        await asyncio.wait_for(asyncio.gather(*waiters), 0.5)
+
+    def test_invalid_water_marks(self):
+        with self.assertRaises(ValueError):
+            Raw("remote", Mock(), {'highWaterMark': 10, 'lowWaterMark': 20})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import stat
+import tempfile
+import unittest
+
+import aiortc.rtcpeerconnection
+from aiortc import RTCPeerConnection
+from aiortc.rtcdtlstransport import RTCCertificate
+
+from peerjs_py.certificates import CertificateStore
+
+
+def fingerprint(peer_connection):
+    certificate = peer_connection._RTCPeerConnection__certificates[0]
+    return certificate.getFingerprints()[0].value
+
+
+class FakeClock:
+    def __init__(self):
+        import time
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+class TestCertificateStore(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "dtls.pem")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def test_peer_connections_share_certificate(self):
+        store = CertificateStore()
+        with store.use():
+            first = RTCPeerConnection()
+        with store.use():
+            second = RTCPeerConnection()
+        # aiortc is only patched inside use().
+        self.assertIs(aiortc.rtcpeerconnection.RTCCertificate, RTCCertificate)
+        unrelated = RTCPeerConnection()
+
+        self.assertEqual(fingerprint(first), fingerprint(second))
+        self.assertNotEqual(fingerprint(first), fingerprint(unrelated))
+        self.assertEqual(store.stats, {"generated": 1, "loaded": 0, "uses": 2})
+        for peer_connection in (first, second, unrelated):
+            await peer_connection.close()
+
+    async def test_persisted_certificate_is_reloaded(self):
+        store = CertificateStore(self.path)
+        await store.prepare()
+        expected = store.certificate.getFingerprints()[0].value
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+        reloaded = CertificateStore(self.path)
+        await reloaded.prepare()
+        self.assertEqual(reloaded.certificate.getFingerprints()[0].value, expected)
+        self.assertEqual(reloaded.stats["loaded"], 1)
+        self.assertEqual(reloaded.stats["generated"], 0)
+
+    async def test_unreadable_file_is_replaced(self):
+        with open(self.path, "w") as f:
+            f.write("not a certificate")
+        store = CertificateStore(self.path)
+        await store.prepare()
+        self.assertEqual(store.stats["generated"], 1)
+        self.assertEqual(CertificateStore(self.path).certificate.getFingerprints(),
+                         store.certificate.getFingerprints())
+
+    async def test_rotation_happens_in_background(self):
+        clock = FakeClock()
+        store = CertificateStore(rotate_after=60, clock=clock)
+        first = store.certificate
+
+        clock.now += 61
+        self.assertIs(store.certificate, first)
+        await store._rotation
+        await asyncio.sleep(0)
+        self.assertIsNot(store.certificate, first)
+        self.assertEqual(store.stats["generated"], 2)
+
+    async def test_expiring_certificate_is_replaced_immediately(self):
+        clock = FakeClock()
+        store = CertificateStore(clock=clock)
+        first = store.certificate
+        clock.now = first.expires.timestamp() - 60
+        self.assertIsNot(store.certificate, first)
+
+    async def test_stale_persisted_certificate_is_not_loaded(self):
+        clock = FakeClock()
+        CertificateStore(self.path, clock=clock).rotate()
+        clock.now += CertificateStore.DEFAULT_ROTATION + 1
+        store = CertificateStore(self.path, clock=clock)
+        await store.prepare()
+        self.assertEqual(store.stats["loaded"], 0)
+        self.assertEqual(store.stats["generated"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import random
+import unittest
+from unittest.mock import Mock
+
+from peerjs_py.binarypack.binarypack import pack
+from peerjs_py.dataconnection.BufferedConnection.BinaryPack import BinaryPack
+from peerjs_py.dataconnection.BufferedConnection.binaryPackChunker import BinaryPackChunker
+from peerjs_py.dataconnection.BufferedConnection.chunkReassembler import ChunkReassembler
+from peerjs_py.enums import ConnectionEventType
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestChunkReassembler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.reassembler = ChunkReassembler(chunk_size=10, timeout=5, max_buffered_bytes=100, clock=self.clock)
+
+    def test_out_of_order_chunks(self):
+        payload = bytes(range(35))
+        chunks = [payload[i:i + 10] for i in range(0, 35, 10)]
+        order = [3, 1, 0, 2]
+        results = [self.reassembler.add(1, n, 4, memoryview(chunks[n])) for n in order]
+        self.assertEqual(results[:3], [None, None, None])
+        self.assertEqual(results[3], payload)
+        self.assertEqual(self.reassembler.buffered_bytes, 0)
+        self.assertEqual(len(self.reassembler), 0)
+
+    def test_duplicate_chunks_are_ignored(self):
+        self.assertIsNone(self.reassembler.add(1, 0, 2, b'a' * 10))
+        self.assertIsNone(self.reassembler.add(1, 0, 2, b'b' * 10))
+        self.assertEqual(self.reassembler.add(1, 1, 2, b'c'), b'a' * 10 + b'c')
+
+    def test_single_chunk_message(self):
+        self.assertEqual(self.reassembler.add(7, 0, 1, b'abc'), b'abc')
+
+    def test_timeout_eviction(self):
+        self.reassembler.add(1, 0, 2, b'a' * 10)
+        self.clock.now = 6
+        self.reassembler.add(2, 0, 2, b'b' * 10)
+        self.assertEqual(len(self.reassembler), 1)
+        self.assertEqual(self.reassembler.evicted, 1)
+        self.assertIsNone(self.reassembler.add(1, 1, 2, b'a'))
+
+    def test_memory_budget_eviction(self):
+        self.reassembler.add(1, 0, 5, b'a' * 10)
+        self.reassembler.add(2, 0, 5, b'b' * 10)
+        self.assertEqual(self.reassembler.buffered_bytes, 100)
+        self.reassembler.add(3, 0, 2, b'c' * 10)
+        self.assertEqual(self.reassembler.buffered_bytes, 70)
+        self.assertEqual(self.reassembler.evicted, 1)
+        # larger than the whole budget
+        self.assertIsNone(self.reassembler.add(4, 0, 20, b'd' * 10))
+        self.assertEqual(len(self.reassembler), 2)
+
+    def test_last_chunk_first_with_smaller_chunk_size(self):
+        payload = bytes(range(14))
+        chunks = [payload[i:i + 4] for i in range(0, 14, 4)]
+        results = [self.reassembler.add(1, n, 4, chunks[n]) for n in (3, 1, 0, 2)]
+        self.assertEqual(results, [None, None, None, payload])
+        self.assertEqual(self.reassembler.buffered_bytes, 0)
+
+    def test_unexpected_chunk_size_drops_message(self):
+        self.reassembler.add(1, 0, 3, b'a' * 10)
+        self.assertIsNone(self.reassembler.add(1, 1, 3, b'short'))
+        self.assertEqual(len(self.reassembler), 0)
+
+
+class TestBinaryPackChunks(unittest.IsolatedAsyncioTestCase):
+    async def test_chunked_message_is_reassembled(self):
+        connection = BinaryPack("remote", Mock(), {})
+        received = []
+        connection.on(ConnectionEventType.Data.value, received.append)
+
+        message = {'file': bytes(random.getrandbits(8) for _ in range(50000)), 'name': 'blob.bin'}
+        chunks = BinaryPackChunker().chunk(pack(message))
+        self.assertGreater(len(chunks), 1)
+        random.shuffle(chunks)
+        for chunk in chunks:
+            await connection._handle_data_message(pack(chunk))
+
+        self.assertEqual(received, [message])
+        self.assertIsInstance(received[0]['file'], bytes)
+        self.assertEqual(connection._reassembler.buffered_bytes, 0)
+
+    async def test_regular_message_mentioning_peer_data(self):
+        connection = BinaryPack("remote", Mock(), {})
+        received = []
+        connection.on(ConnectionEventType.Data.value, received.append)
+
+        await connection._handle_data_message(pack({'note': '__peerData', 'raw': b'abc'}))
+        self.assertEqual(received, [{'note': '__peerData', 'raw': b'abc'}])
+        self.assertIsInstance(received[0]['raw'], bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import asyncio
+import unittest
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from peerjs_py.connection_pool import ConnectionPool
+from peerjs_py.enums import ConnectionEventType, PeerEventType
+from peerjs_py.peer import Peer
+
+
+class FakeConnection(AsyncIOEventEmitter):
+    def __init__(self, peer_id, options):
+        super().__init__()
+        self.peer = peer_id
+        self.options = options
+        self.open = True
+        self.open_future = asyncio.get_running_loop().create_future()
+        self.open_future.set_result(True)
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+        if self.open:
+            self.open = False
+            self.emit(ConnectionEventType.Close.value)
+
+
+class Connector:
+    def __init__(self):
+        self.connections = []
+
+    async def __call__(self, peer_id, options):
+        await asyncio.sleep(0)
+        connection = FakeConnection(peer_id, options)
+        self.connections.append(connection)
+        return connection
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+class TestConnectionPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.connector = Connector()
+        self.pool = ConnectionPool(self.connector)
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+
+    async def test_fills_and_hands_out(self):
+        self.pool.add_target("worker", 2)
+        self.pool.start()
+        await settle()
+        self.assertEqual(self.pool.idle_count("worker"), 2)
+        self.assertEqual(self.connector.connections[0].options, {"serialization": "json", "reliable": True})
+
+        connection = self.pool.take("worker", {"serialization": "json"})
+        self.assertIs(connection, self.connector.connections[0])
+        await settle()
+        self.assertEqual(self.pool.idle_count("worker"), 2)
+        self.assertEqual(self.pool.stats["hits"], 1)
+        self.assertEqual(self.pool.stats["created"], 3)
+
+    async def test_miss_when_empty_or_not_matching(self):
+        self.pool.add_target("worker", 1)
+        self.assertIsNone(self.pool.take("worker"))
+        self.assertEqual(self.pool.stats["misses"], 1)
+
+        self.pool.start()
+        await settle()
+        self.assertIsNone(self.pool.take("worker", {"metadata": {"job": 1}}))
+        self.assertIsNone(self.pool.take("worker", {"serialization": "binary"}))
+        self.assertIsNone(self.pool.take("other"))
+        self.assertEqual(self.pool.stats["misses"], 1)
+        self.assertEqual(self.pool.idle_count("worker"), 1)
+
+    async def test_connection_options_bypass_the_pool(self):
+        self.pool.add_target("worker", 1)
+        self.pool.start()
+        await settle()
+        for options in ({"batchInterval": 50}, {"batchMaxBytes": 4096}, {"highWaterMark": 1 << 20},
+                        {"chunkWindow": 8}, {"trickleIce": False}, {"json_codec": "json"},
+                        {"label": "jobs"}, {"serialization": "json", "sdpTransform": str}):
+            self.assertIsNone(self.pool.take("worker", options), options)
+        self.assertIs(self.pool.take("worker", {"serialization": "json", "reliable": True, "metadata": None}),
+                      self.connector.connections[0])
+
+    async def test_closed_idle_connection_is_replaced(self):
+        self.pool.add_target("worker", 1)
+        self.pool.start()
+        await settle()
+        await self.connector.connections[0].close()
+        await settle()
+        self.assertEqual(len(self.connector.connections), 2)
+        self.assertIs(self.pool.take("worker"), self.connector.connections[1])
+
+    async def test_idle_connections_expire(self):
+        self.pool.ttl = 0.02
+        self.pool.add_target("worker", 1)
+        self.pool.start()
+        await settle()
+        first = self.connector.connections[0]
+        await asyncio.sleep(0.05)
+        await settle()
+
+        self.assertTrue(first.closed)
+        self.assertGreaterEqual(self.pool.stats["expired"], 1)
+        self.assertEqual(self.pool.idle_count("worker"), 1)
+
+    async def test_close_closes_idle_connections(self):
+        self.pool.add_target("worker", 2)
+        self.pool.start()
+        await settle()
+        await self.pool.close()
+        self.assertTrue(all(connection.closed for connection in self.connector.connections))
+        self.assertEqual(self.pool.stats["idle"], 0)
+
+    def test_negative_size(self):
+        with self.assertRaises(ValueError):
+            self.pool.add_target("worker", -1)
+
+
+class Relay:
+    def __init__(self, peer, peers):
+        self.peer = peer
+        self.peers = peers
+
+    async def send(self, message):
+        codec = self.peer._json_codec
+        self.peers[message["dst"]]._dispatcher.dispatch(codec.loads(codec.dumps({**message, "src": self.peer._id})))
+
+    async def close(self):
+        pass
+
+    async def _cleanup(self):
+        pass
+
+
+class TestPeerPrewarm(unittest.IsolatedAsyncioTestCase):
+    async def test_connect_uses_prewarmed_connection(self):
+        peers = {}
+        for peer_id, options in (("left", {"prewarm": {"right": 1}}), ("right", {})):
+            peer = Peer(peer_id, options)
+            peer._socket = Relay(peer, peers)
+            peers[peer_id] = peer
+        left, right = peers["left"], peers["right"]
+        accepted = []
+        right.on(PeerEventType.Connection.value, accepted.append)
+        try:
+            await left._handle_message({"type": "OPEN"})
+            for _ in range(500):
+                if left.pool_stats["idle"]:
+                    break
+                await asyncio.sleep(0.01)
+
+            connection = await left.connect("right")
+            self.assertTrue(connection.open)
+            self.assertEqual(left.pool_stats["hits"], 1)
+            received = asyncio.get_running_loop().create_future()
+            accepted[0].once("data", received.set_result)
+            await connection.send({"job": 1})
+            self.assertEqual(await asyncio.wait_for(received, 5), {"job": 1})
+        finally:
+            await left.destroy()
+            await right.destroy()
+
+
+if __name__ == '__main__':
+    unittest.main()
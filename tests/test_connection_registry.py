@@ -0,0 +1,69 @@
+import unittest
+
+from peerjs_py.connection_registry import ConnectionRegistry
+from peerjs_py.enums import ConnectionType
+
+
+class FakeConnection:
+    def __init__(self, connection_id, connection_type=ConnectionType.Data):
+        self.connection_id = connection_id
+        self.type = connection_type
+
+
+class TestConnectionRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ConnectionRegistry()
+        self.data = FakeConnection("dc_1")
+        self.media = FakeConnection("mc_1", ConnectionType.Media)
+        self.other = FakeConnection("dc_2")
+        self.registry.add("alice", self.data)
+        self.registry.add("alice", self.media)
+        self.registry.add("bob", self.other)
+
+    def test_indexes(self):
+        self.assertIs(self.registry.get("alice", "dc_1"), self.data)
+        self.assertIsNone(self.registry.get("bob", "dc_1"))
+        self.assertIs(self.registry.get_by_id("dc_2"), self.other)
+        self.assertEqual(self.registry.by_peer("alice"), [self.data, self.media])
+        self.assertEqual(self.registry.by_type(ConnectionType.Data), [self.data, self.other])
+        self.assertEqual(self.registry.count(ConnectionType.Media), 1)
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(self.registry.peer_count, 2)
+
+    def test_peer_keyed_compatibility(self):
+        self.assertIn("alice", self.registry)
+        self.assertIn(self.media, self.registry["alice"])
+        self.assertNotIn("carol", self.registry)
+
+    def test_remove_uses_registration_keys(self):
+        self.data.connection_id = "renamed"
+        self.assertTrue(self.registry.remove(self.data))
+        self.assertFalse(self.registry.remove(self.data))
+        self.assertIsNone(self.registry.get_by_id("dc_1"))
+        self.assertEqual(self.registry.by_type(ConnectionType.Data), [self.other])
+
+        self.registry.remove(self.media)
+        self.assertNotIn("alice", self.registry)
+        self.assertEqual(self.registry.peer_ids(), ["bob"])
+
+    def test_same_id_from_different_peers(self):
+        clash = FakeConnection("dc_2")
+        self.registry.add("carol", clash)
+        self.assertIs(self.registry.get("bob", "dc_2"), self.other)
+        self.assertIs(self.registry.get("carol", "dc_2"), clash)
+        self.assertEqual(self.registry.count(ConnectionType.Data), 3)
+
+        self.registry.remove(self.other)
+        self.assertIs(self.registry.get_by_id("dc_2"), clash)
+
+    def test_pop_peer_and_iteration(self):
+        for connection in self.registry:
+            if connection is self.other:
+                self.registry.remove(connection)
+        self.assertEqual(self.registry.pop_peer("alice"), [self.data, self.media])
+        self.assertEqual(len(self.registry), 0)
+        self.assertEqual(list(self.registry), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
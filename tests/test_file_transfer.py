@@ -0,0 +1,153 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from peerjs_py.dataconnection.BufferedConnection.BinaryPack import BinaryPack
+from peerjs_py.dataconnection.BufferedConnection.Raw import FILE_FRAME_MAGIC, Raw
+from peerjs_py.dataconnection.BufferedConnection.fileTransfer import FILE_PIECE_SIZE, FileTransferError
+from peerjs_py.enums import ConnectionEventType
+
+
+class LoopbackDataChannel(AsyncIOEventEmitter):
+    """Delivers sent messages, in order, to the connection on the other end."""
+
+    def __init__(self):
+        super().__init__()
+        self.readyState = "open"
+        self.bufferedAmount = 0
+        self.bufferedAmountLowThreshold = 0
+        self.sent = 0
+        self._queue = asyncio.Queue()
+        self._pump = None
+
+    def connect(self, remote):
+        self._pump = asyncio.create_task(self._deliver(remote))
+
+    def send(self, data):
+        self.sent += 1
+        self._queue.put_nowait(data)
+
+    async def _deliver(self, remote):
+        while True:
+            data = await self._queue.get()
+            await remote._handle_data_message(data)
+
+    def close(self):
+        self._pump.cancel()
+
+
+def connect_pair(connection_class):
+    left = connection_class("left", Mock(), {})
+    right = connection_class("right", Mock(), {})
+    for connection in (left, right):
+        connection.data_channel = LoopbackDataChannel()
+        connection._open = True
+    left.data_channel.connect(right)
+    right.data_channel.connect(left)
+    return left, right
+
+
+class FileTransferTests:
+    connection_class = None
+
+    async def asyncSetUp(self):
+        self.left, self.right = connect_pair(self.connection_class)
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, "source.bin")
+        self.dest = os.path.join(self.directory.name, "dest.bin")
+        self.payload = os.urandom(FILE_PIECE_SIZE * 3 + 123)
+        with open(self.source, "wb") as file:
+            file.write(self.payload)
+
+    async def asyncTearDown(self):
+        self.left.data_channel.close()
+        self.right.data_channel.close()
+        self.directory.cleanup()
+
+    def read_dest(self):
+        with open(self.dest, "rb") as file:
+            return file.read()
+
+    async def test_send_and_receive_file(self):
+        progress = []
+        self.right.on(ConnectionEventType.FileProgress.value, progress.append)
+
+        receiving = asyncio.create_task(self.right.receive_file(self.dest))
+        await asyncio.sleep(0)
+        sent = await self.left.send_file(self.source)
+
+        self.assertEqual(await receiving, self.dest)
+        self.assertEqual(sent, len(self.payload))
+        self.assertEqual(self.read_dest(), self.payload)
+        self.assertEqual(len(progress), 4)
+        self.assertEqual(progress[-1]["transferred"], len(self.payload))
+
+    async def test_resume_from_offset(self):
+        offset = FILE_PIECE_SIZE * 2
+        with open(self.dest, "wb") as file:
+            file.write(self.payload[:offset])
+
+        receiving = asyncio.create_task(self.right.receive_file(self.dest, offset=offset))
+        await asyncio.sleep(0)
+        sent = await self.left.send_file(self.source)
+
+        await receiving
+        self.assertEqual(sent, len(self.payload) - offset)
+        self.assertEqual(self.read_dest(), self.payload)
+
+    async def test_empty_file(self):
+        open(self.source, "wb").close()
+        receiving = asyncio.create_task(self.right.receive_file(self.dest))
+        await asyncio.sleep(0)
+        await self.left.send_file(self.source)
+        await receiving
+        self.assertEqual(self.read_dest(), b"")
+
+    async def test_unexpected_transfer_is_rejected(self):
+        with self.assertRaises(FileTransferError):
+            await self.left.send_file(self.source)
+
+    async def test_regular_messages_still_delivered(self):
+        received = []
+        self.right.on(ConnectionEventType.Data.value, received.append)
+        await self.left.send(b"hello")
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, [b"hello"])
+
+
+class TestBinaryPackFileTransfer(FileTransferTests, unittest.IsolatedAsyncioTestCase):
+    connection_class = BinaryPack
+
+
+class TestRawFileTransfer(FileTransferTests, unittest.IsolatedAsyncioTestCase):
+    connection_class = Raw
+
+    async def test_unexpected_transfer_is_rejected(self):
+        # Without a pending receive_file() the announcement is ordinary data.
+        received = []
+        self.right.on(ConnectionEventType.Data.value, received.append)
+        self.left._files.accept_timeout = 0.05
+        with self.assertRaises(FileTransferError):
+            await self.left.send_file(self.source)
+        self.assertEqual(len(received), 1)
+        self.assertTrue(received[0].startswith(FILE_FRAME_MAGIC))
+
+    async def test_magic_prefixed_data_is_delivered(self):
+        received = []
+        self.right.on(ConnectionEventType.Data.value, received.append)
+        receiving = asyncio.create_task(self.right.receive_file(self.dest))
+        await asyncio.sleep(0)
+        messages = [FILE_FRAME_MAGIC, FILE_FRAME_MAGIC + b"\x00\x00", FILE_FRAME_MAGIC + b"\xff\xff\xff\xff", FILE_FRAME_MAGIC + b"\x00\x00\x00\x01\xc1"]
+        for message in messages:
+            await self.left.send(message)
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, messages)
+        receiving.cancel()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import unittest
+
+from aiohttp import web
+
+from peerjs_py.enums import SocketEventType
+from peerjs_py.heartbeat import HeartbeatScheduler
+from peerjs_py.logger import logger, LogLevel
+from peerjs_py.socket import Socket
+
+
+class FakeSocket:
+    def __init__(self, interval, fail=False):
+        self.interval = interval
+        self.fail = fail
+        self.calls = []
+
+    def _on_heartbeat(self, now):
+        self.calls.append(now)
+        if self.fail:
+            raise RuntimeError("boom")
+        return now + self.interval
+
+
+class TestHeartbeatScheduler(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.loop = asyncio.get_running_loop()
+        self.scheduler = HeartbeatScheduler.for_loop()
+
+    async def test_one_scheduler_per_loop(self):
+        self.assertIs(HeartbeatScheduler.for_loop(), self.scheduler)
+
+    async def test_many_sockets_share_one_timer(self):
+        tasks = len(asyncio.all_tasks())
+        sockets = [FakeSocket(0.02) for _ in range(500)]
+        start = self.loop.time()
+        for i, socket in enumerate(sockets):
+            self.scheduler.add(socket, start + 0.02 + i * 0.00001)
+        self.assertEqual(len(self.scheduler), 500)
+        self.assertEqual(len(asyncio.all_tasks()), tasks)
+
+        await asyncio.sleep(0.15)
+        self.assertTrue(all(len(socket.calls) >= 3 for socket in sockets))
+        # Sockets due within RESOLUTION of each other are served in the same pass.
+        self.assertEqual(len({socket.calls[0] for socket in sockets}), 1)
+
+        for socket in sockets:
+            self.scheduler.remove(socket)
+        self.assertEqual(len(self.scheduler), 0)
+        self.assertIsNone(self.scheduler._timer)
+
+    async def test_remove_and_replace(self):
+        removed, replaced = FakeSocket(0.01), FakeSocket(0.01)
+        now = self.loop.time()
+        self.scheduler.add(removed, now + 0.01)
+        self.scheduler.add(replaced, now + 0.01)
+        self.scheduler.add(replaced, now + 0.5)
+        self.scheduler.remove(removed)
+
+        await asyncio.sleep(0.1)
+        self.assertEqual(removed.calls, [])
+        self.assertEqual(replaced.calls, [])
+        self.scheduler.remove(replaced)
+
+    async def test_failing_socket_leaves_schedule(self):
+        failing, healthy = FakeSocket(0.01, fail=True), FakeSocket(0.01)
+        now = self.loop.time()
+        self.scheduler.add(failing, now)
+        self.scheduler.add(healthy, now)
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(failing.calls), 1)
+        self.assertGreater(len(healthy.calls), 1)
+        self.assertEqual(len(self.scheduler), 1)
+        self.scheduler.remove(healthy)
+
+
+class TestSocketLiveness(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        logger.set_log_level(LogLevel.Disabled)
+        self.answer_pings = True
+        self.received = []
+        app = web.Application()
+        app.router.add_get("/peerjs", self.handle_socket)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        self.addAsyncCleanup(self.runner.cleanup)
+        self.socket = Socket(secure=False, host="127.0.0.1", port=self.runner.addresses[0][1], path="/",
+                             key="test_key", ping_interval=0.05, pong_timeout=0.05)
+        self.disconnected = asyncio.get_running_loop().create_future()
+        self.socket.on(SocketEventType.Disconnected.value, lambda: self.disconnected.set_result(None))
+        self.addAsyncCleanup(self.socket.close)
+
+    async def handle_socket(self, request):
+        ws = web.WebSocketResponse(autoping=self.answer_pings)
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type == web.WSMsgType.TEXT:
+                self.received.append(json.loads(msg.data))
+        return ws
+
+    async def test_live_connection_is_kept(self):
+        await self.socket.start("test_id", "test_token")
+        await asyncio.sleep(0.4)
+        self.assertFalse(self.disconnected.done())
+        self.assertEqual(self.socket.stats["dead_connections"], 0)
+        self.assertGreaterEqual(self.received.count({"type": "HEARTBEAT"}), 4)
+
+    async def test_unanswered_pings_trigger_disconnect(self):
+        self.answer_pings = False
+        await self.socket.start("test_id", "test_token")
+        started = asyncio.get_running_loop().time()
+        await asyncio.wait_for(self.disconnected, 2)
+        elapsed = asyncio.get_running_loop().time() - started
+        # One ping interval, plus the pong timeout, plus timer slack.
+        self.assertLess(elapsed, 0.05 + 0.05 + 0.1)
+        self.assertEqual(self.socket.stats["dead_connections"], 1)
+        self.assertTrue(self.socket._disconnected)
+
+
+if __name__ == '__main__':
+    unittest.main()
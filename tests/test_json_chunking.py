@@ -0,0 +1,108 @@
+import random
+import unittest
+from unittest.mock import Mock
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from peerjs_py.dataconnection.BufferedConnection.Json import Json, CHUNKED_MTU
+from peerjs_py.enums import ConnectionEventType
+from peerjs_py.json_codec import orjson
+
+
+class RecordingDataChannel(AsyncIOEventEmitter):
+    def __init__(self):
+        super().__init__()
+        self.readyState = "open"
+        self.bufferedAmount = 0
+        self.bufferedAmountLowThreshold = 0
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+
+def open_connection(remote_chunking=True, **options):
+    if remote_chunking:
+        options['_payload'] = {'chunking': True}
+    connection = Json("remote", Mock(), options)
+    connection.data_channel = RecordingDataChannel()
+    connection._open = True
+    return connection
+
+
+async def deliver(frames, shuffle=False):
+    receiver = Json("remote", None, {})
+    received = []
+    receiver.on(ConnectionEventType.Data.value, received.append)
+    frames = list(frames)
+    if shuffle:
+        random.Random(3).shuffle(frames)
+    for frame in frames:
+        await receiver._handle_data_message(frame)
+    return received, receiver
+
+
+class TestJsonChunking(unittest.IsolatedAsyncioTestCase):
+    async def test_large_ascii_payload(self):
+        sender = open_connection()
+        snapshot = {"items": [{"id": i, "name": f"item \"{i}\"", "path": "a\\b"} for i in range(3000)]}
+        await sender.send(snapshot)
+
+        frames = sender.data_channel.sent
+        self.assertGreater(len(frames), 1)
+        self.assertTrue(all(len(frame) < CHUNKED_MTU for frame in frames))
+        received, receiver = await deliver(frames, shuffle=True)
+        self.assertEqual(received, [snapshot])
+        self.assertEqual(len(receiver._reassembler), 0)
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    async def test_large_non_ascii_payload(self):
+        # orjson emits UTF-8 rather than ASCII escapes.
+        sender = open_connection(json_codec='orjson')
+        snapshot = {"text": "ünïcødé ✓ " * 5000}
+        await sender.send(snapshot)
+
+        frames = sender.data_channel.sent
+        self.assertTrue(all(len(frame) < CHUNKED_MTU for frame in frames))
+        received, _ = await deliver(frames)
+        self.assertEqual(received, [snapshot])
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    async def test_large_non_ascii_payload_out_of_order(self):
+        sender = open_connection(json_codec='orjson')
+        snapshot = {"text": "ünïcødé ✓ " * 5000}
+        await sender.send(snapshot)
+
+        frames = sender.data_channel.sent
+        # the short last chunk arriving first must not fix the chunk size
+        received, receiver = await deliver(frames[-1:] + frames[:-1][::-1])
+        self.assertEqual(received, [snapshot])
+        self.assertEqual(len(receiver._reassembler), 0)
+
+    async def test_too_big_without_remote_support(self):
+        sender = open_connection(remote_chunking=False)
+        errors = []
+        sender.on("error", errors.append)
+        await sender.send({"blob": "x" * CHUNKED_MTU})
+        self.assertEqual(sender.data_channel.sent, [])
+        self.assertEqual(len(errors), 1)
+
+    async def test_small_messages_unchanged(self):
+        sender = open_connection()
+        await sender.send({"small": True})
+        self.assertEqual(sender.data_channel.sent, [b'{"small": true}'])
+
+    async def test_malformed_chunks_are_delivered_as_data(self):
+        messages = [
+            {"__peerData": "user value"},
+            {"__peerData": 1, "n": 0},
+            {"__peerData": 1, "n": "0", "total": 2, "data": "x"},
+            {"__peerData": [1], "n": 0, "total": 2, "data": "x"},
+        ]
+        received, receiver = await deliver(Json("remote", None, {}).codec.dumps(message) for message in messages)
+        self.assertEqual(received, messages)
+        self.assertEqual(len(receiver._reassembler), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
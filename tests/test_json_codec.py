@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import AsyncMock
+
+from peerjs_py.enums import ServerMessageType, ConnectionType
+from peerjs_py.json_codec import JsonCodec, OrjsonCodec, get_json_codec, orjson
+from peerjs_py.socket import Socket
+
+
+class TestJsonCodec(unittest.TestCase):
+    def check_codec(self, codec):
+        message = {"type": ServerMessageType.Offer, "payload": {"type": ConnectionType.Data, "n": [1, 2.5, None]}}
+        expected = {"type": "OFFER", "payload": {"type": "data", "n": [1, 2.5, None]}}
+        self.assertEqual(codec.loads(codec.dumps(message)), expected)
+        self.assertEqual(codec.loads(codec.encode(message)), expected)
+        self.assertEqual(codec.loads(bytearray(codec.encode("ünï"))), "ünï")
+        with self.assertRaises(ValueError):
+            codec.loads("{not json")
+        with self.assertRaises(TypeError):
+            codec.dumps(object())
+
+    def test_stdlib_codec(self):
+        codec = get_json_codec("json")
+        self.assertIsInstance(codec, JsonCodec)
+        self.check_codec(codec)
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_codec(self):
+        codec = get_json_codec("orjson")
+        self.assertIsInstance(codec, OrjsonCodec)
+        self.check_codec(codec)
+        self.assertEqual(codec.loads(codec.dumps({1: "a"})), {"1": "a"})
+
+    def test_resolution(self):
+        self.assertIs(get_json_codec(), get_json_codec("json"))
+        self.assertEqual(get_json_codec("auto").name, "orjson" if orjson is not None else "json")
+        custom = JsonCodec()
+        self.assertIs(get_json_codec(custom), custom)
+        with self.assertRaises(ValueError):
+            get_json_codec("yaml")
+        with self.assertRaises(TypeError):
+            get_json_codec(object())
+
+
+class TestSocketCodec(unittest.IsolatedAsyncioTestCase):
+    async def test_socket_uses_codec(self):
+        codec = JsonCodec()
+        socket = Socket(secure=False, host="localhost", port=9000, path="/", key="test_key", json_codec=codec)
+        socket._id = "test_id"
+        socket._ws = AsyncMock()
+        socket._ws_open = lambda: True
+        socket._disconnected = False
+
+        await socket.send({"type": ServerMessageType.Candidate, "dst": "other"})
+        await socket.flush()
+        socket._ws.send_str.assert_called_once_with(codec.dumps({"type": "CANDIDATE", "dst": "other"}))
+
+        received = []
+        socket.on("message", received.append)
+        await socket._on_message('{"type": "OPEN"}')
+        self.assertEqual(received, [{"type": "OPEN"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
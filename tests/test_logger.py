@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import unittest
+from unittest.mock import Mock, patch
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from peerjs_py.dataconnection.BufferedConnection.Raw import Raw
+from peerjs_py.logger import LogLevel, Sampler, lazy, logger, preview
+
+
+class Probe(bytes):
+    formatted = 0
+
+    def __str__(self):
+        Probe.formatted += 1
+        return bytes.__repr__(self)
+
+    __repr__ = __str__
+
+    def __format__(self, spec):
+        Probe.formatted += 1
+        return bytes.__repr__(self)
+
+
+class FakeDataChannel(AsyncIOEventEmitter):
+    readyState = "open"
+    bufferedAmount = 0
+    bufferedAmountLowThreshold = 0
+
+
+class RecordCounter(logging.Filter):
+    def __init__(self):
+        super().__init__()
+        self.records = 0
+
+    def filter(self, record):
+        self.records += 1
+        record.getMessage()
+        return False
+
+
+class TestLazyLogging(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.counter = RecordCounter()
+        logger.addFilter(self.counter)
+        self.previous_level = logger.level
+        logger.set_log_level(LogLevel.Disabled)
+
+    def tearDown(self):
+        logger.removeFilter(self.counter)
+        logger.setLevel(self.previous_level)
+
+    async def test_received_message_is_not_formatted_when_disabled(self):
+        connection = Raw("remote", Mock(_id="local"), {})
+        channel = FakeDataChannel()
+        await connection._initialize_data_channel(channel)
+        received = []
+        connection.on("data", received.append)
+
+        Probe.formatted = 0
+        for _ in range(10):
+            channel.emit("message", Probe(b"payload"))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(len(received), 10)
+        self.assertEqual(Probe.formatted, 0)
+        self.assertEqual(self.counter.records, 0)
+
+    async def test_trace_points_are_sampled_and_lazy(self):
+        with patch("peerjs_py.dataconnection.DataConnection.TRACE", True), \
+                patch("peerjs_py.dataconnection.DataConnection.TRACE_SAMPLE", 4):
+            connection = Raw("remote", Mock(_id="local"), {})
+            channel = FakeDataChannel()
+            await connection._initialize_data_channel(channel)
+
+            Probe.formatted = 0
+            logger.set_log_level(LogLevel.All)
+            for _ in range(10):
+                channel.emit("message", Probe(b"payload"))
+            await asyncio.sleep(0.01)
+            self.assertEqual(self.counter.records, 3)
+            self.assertEqual(Probe.formatted, 3)
+
+            # Tracing on but debug logging off: nothing is formatted.
+            logger.set_log_level(LogLevel.Disabled)
+            for _ in range(10):
+                channel.emit("message", Probe(b"payload"))
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(self.counter.records, 3)
+        self.assertEqual(Probe.formatted, 3)
+
+    def test_preview_truncates(self):
+        self.assertEqual(preview("short"), "'short'")
+        self.assertEqual(preview("x" * 500, limit=10), "'xxxxxxxxx... (502 chars)")
+
+    def test_lazy_argument(self):
+        calls = []
+
+        def describe():
+            calls.append(1)
+            return "state"
+
+        logger.debug("state %s", lazy(describe))
+        self.assertEqual(calls, [])
+        self.assertEqual(str(lazy(describe)), "state")
+
+    def test_sampler(self):
+        sampler = Sampler(3)
+        self.assertEqual([sampler() for _ in range(7)], [True, False, False, True, False, False, True])
+        with self.assertRaises(ValueError):
+            Sampler(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
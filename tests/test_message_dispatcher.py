@@ -0,0 +1,279 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from peerjs_py.dataconnection.BufferedConnection.Json import Json
+from peerjs_py.enums import ConnectionEventType, ConnectionType, PeerEventType, ServerMessageType
+from peerjs_py.message_dispatcher import MessageDispatcher, connection_key
+from peerjs_py.peer import Peer
+
+NEGOTIATION_TIME = 0.05
+
+
+def candidate(connection_id, index):
+    return {"type": "CANDIDATE", "payload": {"connectionId": connection_id, "index": index}}
+
+
+class TestMessageDispatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_ordered_per_connection(self):
+        handled = []
+
+        async def handler(message):
+            await asyncio.sleep(0.001 * (3 - message["payload"]["index"]))
+            handled.append((message["payload"]["connectionId"], message["payload"]["index"]))
+
+        dispatcher = MessageDispatcher(handler)
+        for index in range(3):
+            for connection_id in ("dc_a", "dc_b"):
+                dispatcher.dispatch(candidate(connection_id, index))
+        await dispatcher.join()
+
+        for connection_id in ("dc_a", "dc_b"):
+            self.assertEqual([i for c, i in handled if c == connection_id], [0, 1, 2])
+        self.assertEqual(dispatcher.active, 0)
+        self.assertEqual(dispatcher.pending, 0)
+
+    async def test_slow_connection_does_not_block_others(self):
+        slow_started = asyncio.Event()
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(message):
+            if message["payload"]["connectionId"] == "slow":
+                slow_started.set()
+                await release.wait()
+            handled.append(message["payload"]["connectionId"])
+
+        dispatcher = MessageDispatcher(handler)
+        dispatcher.dispatch(candidate("slow", 0))
+        dispatcher.dispatch(candidate("slow", 1))
+        await slow_started.wait()
+        dispatcher.dispatch(candidate("fast", 0))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(handled, ["fast"])
+        self.assertEqual(dispatcher.pending, 1)
+        release.set()
+        await dispatcher.join()
+        self.assertEqual(handled, ["fast", "slow", "slow"])
+
+    async def test_failing_handler_does_not_stop_lane(self):
+        handled = []
+
+        async def handler(message):
+            if message["payload"]["index"] == 0:
+                raise RuntimeError("boom")
+            handled.append(message["payload"]["index"])
+
+        dispatcher = MessageDispatcher(handler)
+        dispatcher.dispatch(candidate("dc_a", 0))
+        dispatcher.dispatch(candidate("dc_a", 1))
+        await dispatcher.join()
+        self.assertEqual(handled, [1])
+
+    async def test_close_cancels_pending_work(self):
+        handled = []
+
+        async def handler(message):
+            await asyncio.sleep(1)
+            handled.append(message)
+
+        dispatcher = MessageDispatcher(handler)
+        dispatcher.dispatch(candidate("dc_a", 0))
+        dispatcher.dispatch(candidate("dc_a", 1))
+        await asyncio.sleep(0)
+        dispatcher.close()
+        await asyncio.sleep(0)
+        self.assertEqual((dispatcher.active, dispatcher.pending), (0, 0))
+        self.assertEqual(handled, [])
+
+    def test_connection_key(self):
+        self.assertEqual(connection_key(candidate("dc_a", 0)), "dc_a")
+        self.assertIsNone(connection_key({"type": "OPEN"}))
+        self.assertIsNone(connection_key({"type": "LEAVE", "payload": None}))
+
+
+class FakeChannel:
+    protocol = ""
+
+
+class FakeNegotiator:
+    running = 0
+    peak = 0
+
+    async def on_data_channel(self, channel):
+        pass
+
+    async def start_connection(self, options):
+        FakeNegotiator.running += 1
+        FakeNegotiator.peak = max(FakeNegotiator.peak, FakeNegotiator.running)
+        await asyncio.sleep(NEGOTIATION_TIME)
+        FakeNegotiator.running -= 1
+        asyncio.get_running_loop().call_soon(lambda: asyncio.ensure_future(self.on_data_channel(FakeChannel())))
+
+
+class FakeDataConnection(AsyncIOEventEmitter):
+    type = ConnectionType.Data
+    serialization = "fake"
+
+    def __init__(self, peer_id, provider, options):
+        super().__init__()
+        self.peer = peer_id
+        self.connection_id = options["connectionId"]
+        self._negotiator = FakeNegotiator()
+        self._open = False
+        self._closed = False
+        self.open_future = asyncio.get_running_loop().create_future()
+        self.peer_connection = object()
+        self.handled = []
+
+    async def _initialize_data_channel(self, channel):
+        pass
+
+    async def handle_message(self, message):
+        self.handled.append(message)
+
+    async def close(self):
+        pass
+
+
+class StalledNegotiator(FakeNegotiator):
+    """Sets up the peer connection, but its data channel never opens."""
+
+    async def start_connection(self, options):
+        pass
+
+    async def cleanup(self):
+        pass
+
+
+class StalledJson(Json):
+    def __init__(self, peer_id, provider, options):
+        super().__init__(peer_id, provider, options)
+        self._negotiator = StalledNegotiator()
+
+
+class StalledDataConnection(FakeDataConnection):
+    def __init__(self, peer_id, provider, options):
+        super().__init__(peer_id, provider, options)
+        self._negotiator = StalledNegotiator()
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def offer(index, serialization="fake"):
+    return {
+        "type": ServerMessageType.Offer.value,
+        "src": f"remote_{index}",
+        "payload": {"type": ConnectionType.Data.value, "connectionId": f"dc_{index}", "serialization": serialization},
+    }
+
+
+class TestPeerOfferDispatch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.patchers = [patch('peerjs_py.peer.API'), patch('peerjs_py.peer.Socket')]
+        for patcher in self.patchers:
+            patcher.start()
+        FakeNegotiator.running = FakeNegotiator.peak = 0
+
+    async def asyncTearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    async def connect_burst(self, count, **options):
+        peer = Peer(id="local", options={"serializers": {"fake": FakeDataConnection}, **options})
+        opened = []
+        peer.on(PeerEventType.Connection.value, opened.append)
+        start = time.perf_counter()
+        for index in range(count):
+            peer._dispatcher.dispatch(offer(index))
+        await peer._dispatcher.join()
+        await asyncio.gather(*peer._negotiations)
+        return peer, opened, time.perf_counter() - start
+
+    async def test_offer_burst_negotiates_concurrently(self):
+        peer, opened, elapsed = await self.connect_burst(500)
+        self.assertEqual(len(opened), 500)
+        self.assertEqual(len(peer.connections), 500)
+        self.assertEqual(FakeNegotiator.peak, 500)
+        # Run one after the other, the burst would take 500 negotiations.
+        self.assertLess(elapsed, NEGOTIATION_TIME * 50)
+
+    async def test_negotiations_are_capped(self):
+        _, opened, _ = await self.connect_burst(20, max_concurrent_negotiations=4)
+        self.assertEqual(len(opened), 20)
+        self.assertEqual(FakeNegotiator.peak, 4)
+
+    async def offer_after_stalled_one(self, fail, **options):
+        peer = Peer(id="local", options={
+            "serializers": {"fake": FakeDataConnection, "stalled": StalledDataConnection},
+            "max_concurrent_negotiations": 1,
+            **options,
+        })
+        opened = []
+        peer.on(PeerEventType.Connection.value, opened.append)
+        peer._dispatcher.dispatch(offer(0, "stalled"))
+        await peer._dispatcher.join()
+        stalled = peer.get_connection("remote_0", "dc_0")
+        self.assertEqual(peer._negotiation_slots._value, 0)
+
+        fail(stalled)
+        peer._dispatcher.dispatch(offer(1))
+        await asyncio.wait_for(peer._dispatcher.join(), 5)
+        await asyncio.wait_for(asyncio.gather(*peer._negotiations), 5)
+
+        self.assertTrue(stalled.closed)
+        self.assertEqual([connection.connection_id for connection in opened], ["dc_1"])
+        self.assertEqual(peer._negotiation_slots._value, 1)
+
+    async def test_connection_closed_before_open_frees_its_slot(self):
+        await self.offer_after_stalled_one(lambda connection: connection.emit(ConnectionEventType.Close.value))
+
+    async def test_failed_peer_connection_frees_its_slot(self):
+        await self.offer_after_stalled_one(lambda connection: connection.emit("connectionStateChanged", "failed"))
+
+    async def test_closing_a_connection_that_never_opened(self):
+        peer = Peer(id="local", options={
+            "serializers": {"fake": FakeDataConnection, "stalled": StalledJson},
+            "max_concurrent_negotiations": 1,
+        })
+        opened = []
+        peer.on(PeerEventType.Connection.value, opened.append)
+        peer._dispatcher.dispatch(offer(0, "stalled"))
+        await peer._dispatcher.join()
+        stalled = peer.get_connection("remote_0", "dc_0")
+        closed = []
+        stalled.on(ConnectionEventType.Close.value, lambda: closed.append(True))
+
+        await stalled.close()
+        await stalled.close()
+        self.assertEqual(closed, [True])
+        self.assertIsNone(peer.get_connection("remote_0", "dc_0"))
+
+        peer._dispatcher.dispatch(offer(1))
+        await asyncio.wait_for(peer._dispatcher.join(), 5)
+        await asyncio.wait_for(asyncio.gather(*peer._negotiations), 5)
+        self.assertEqual([connection.connection_id for connection in opened], ["dc_1"])
+
+    async def test_negotiation_timeout_frees_its_slot(self):
+        await self.offer_after_stalled_one(lambda connection: None, negotiation_timeout=0.05)
+
+    async def test_candidates_follow_their_offer(self):
+        peer = Peer(id="local", options={"serializers": {"fake": FakeDataConnection}})
+        peer._dispatcher.dispatch(offer(0))
+        message = candidate("dc_0", 0)
+        message["src"] = "remote_0"
+        peer._dispatcher.dispatch(message)
+        await peer._dispatcher.join()
+
+        connection = peer.get_connection("remote_0", "dc_0")
+        self.assertEqual(connection.handled, [message])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from peerjs_py.dataconnection.SharedTransport import SharedTransport
+from peerjs_py.enums import PeerEventType
+from peerjs_py.peer import Peer
+
+
+class Relay:
+    """In-memory stand-in for the signaling server."""
+
+    def __init__(self, peer, peers):
+        self.peer = peer
+        self.peers = peers
+
+    async def send(self, message):
+        codec = self.peer._json_codec
+        self.peers[message["dst"]]._dispatcher.dispatch(codec.loads(codec.dumps({**message, "src": self.peer._id})))
+
+    async def close(self):
+        pass
+
+    async def _cleanup(self):
+        pass
+
+
+class LegacyRelay(Relay):
+    """Relays for a remote that does not advertise multiplexing."""
+
+    async def send(self, message):
+        message.get("payload", {}).pop("multiplex", None)
+        await super().send(message)
+
+
+class TestSharedTransport(unittest.IsolatedAsyncioTestCase):
+    async def test_last_release_closes_peer_connection(self):
+        peer_connection = Mock(connectionState="connected", sctp=object(), close=AsyncMock())
+        forgotten = []
+        transport = SharedTransport("remote", peer_connection, forgotten.append)
+        first, second = Mock(), Mock()
+        transport.attach(first)
+        transport.attach(second)
+
+        self.assertIs(second.peer_connection, peer_connection)
+        self.assertIs(second._transport, transport)
+        self.assertTrue(transport.usable)
+        self.assertFalse(transport.release(first))
+        self.assertTrue(transport.release(second))
+
+        await transport.close()
+        await transport.close()
+        peer_connection.close.assert_awaited_once()
+        self.assertEqual(forgotten, [transport])
+        self.assertFalse(transport.usable)
+
+
+class TestMultiplexedConnections(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        peers = {}
+        for peer_id in ("left", "right"):
+            peer = Peer(peer_id, {"multiplex": True})
+            peer._socket = Relay(peer, peers)
+            peer._open = True
+            peers[peer_id] = peer
+        self.left, self.right = peers["left"], peers["right"]
+        self.accepted = []
+        self.right.on(PeerEventType.Connection.value, self.accepted.append)
+
+    async def asyncTearDown(self):
+        await self.left.destroy()
+        await self.right.destroy()
+
+    async def connect(self, **options):
+        count = len(self.accepted)
+        connection = await self.left.connect("right", {"serialization": "json", **options})
+        await asyncio.wait_for(connection.open_future, 10)
+        for _ in range(500):
+            if len(self.accepted) > count:
+                break
+            await asyncio.sleep(0.01)
+        return connection, self.accepted[-1]
+
+    async def roundtrip(self, connection, remote, data):
+        received = asyncio.get_running_loop().create_future()
+        remote.once("data", received.set_result)
+        await connection.send(data)
+        return await asyncio.wait_for(received, 5)
+
+    async def test_channels_share_one_peer_connection(self):
+        first, first_remote = await self.connect()
+        second, second_remote = await self.connect(metadata={"n": 2}, label="second")
+        third, third_remote = await self.connect()
+
+        self.assertIs(second.peer_connection, first.peer_connection)
+        self.assertIs(third.peer_connection, first.peer_connection)
+        self.assertIs(second_remote.peer_connection, first_remote.peer_connection)
+        self.assertEqual(second_remote.connection_id, second.connection_id)
+        self.assertEqual(second_remote.metadata, {"n": 2})
+        self.assertEqual(second_remote.label, "second")
+        self.assertEqual(self.left._transports["right"].refcount, 3)
+        self.assertEqual(await self.roundtrip(third, third_remote, {"hello": 3}), {"hello": 3})
+        self.assertEqual(await self.roundtrip(first, first_remote, "one"), "one")
+
+    async def test_peer_connection_closes_with_last_channel(self):
+        first, _ = await self.connect()
+        second, second_remote = await self.connect()
+        peer_connection = first.peer_connection
+
+        await first.close()
+        self.assertEqual(peer_connection.connectionState, "connected")
+        self.assertEqual(await self.roundtrip(second, second_remote, "still here"), "still here")
+
+        await second.close()
+        self.assertEqual(peer_connection.connectionState, "closed")
+        self.assertNotIn("right", self.left._transports)
+
+    async def test_multiplexing_after_remote_original_connection_closed(self):
+        first, first_remote = await self.connect()
+        second, second_remote = await self.connect()
+        peer_connection = second_remote.peer_connection
+
+        await first_remote.close()
+        third, third_remote = await self.connect()
+
+        self.assertIs(third.peer_connection, second.peer_connection)
+        self.assertIs(third_remote.peer_connection, peer_connection)
+        self.assertIs(third_remote._transport, second_remote._transport)
+        self.assertEqual(second_remote._transport.refcount, 2)
+        self.assertEqual(await self.roundtrip(third, third_remote, "after close"), "after close")
+
+    async def test_without_multiplex_each_connection_negotiates(self):
+        first, _ = await self.connect()
+        second, _ = await self.connect(multiplex=False)
+        self.assertIsNot(second.peer_connection, first.peer_connection)
+
+    async def test_remote_without_multiplex_support_gets_new_peer_connections(self):
+        self.right._socket = LegacyRelay(self.right, self.right._socket.peers)
+        first, first_remote = await self.connect()
+        second, second_remote = await self.connect()
+
+        self.assertNotIn("right", self.left._multiplex_peers)
+        self.assertIsNot(second.peer_connection, first.peer_connection)
+        self.assertIsNot(second_remote.peer_connection, first_remote.peer_connection)
+        self.assertEqual(await self.roundtrip(second, second_remote, "plain"), "plain")
+        self.assertEqual(await self.roundtrip(first, first_remote, "still plain"), "still plain")
+
+
+if __name__ == '__main__':
+    unittest.main()
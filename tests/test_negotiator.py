@@ -14,6 +14,8 @@ class TestNegotiator(unittest.IsolatedAsyncioTestCase):
         self.mock_socket_patcher = patch('peerjs_py.peer.Socket')
         self.mock_api = self.mock_api_patcher.start()
         self.mock_socket = self.mock_socket_patcher.start()
+        self.addCleanup(self.mock_api_patcher.stop)
+        self.addCleanup(self.mock_socket_patcher.stop)
 
         self.mock_connection = Mock()
         self.mock_connection.peer = "test_peer"
@@ -145,5 +147,47 @@ class TestNegotiator(unittest.IsolatedAsyncioTestCase):
         mock_peer_connection.close.assert_called_once()
         # mock_peer_connection.on.assert_called_with("track", None)  # Assert that 'on' was called with correct arguments
 
+    async def test_candidates_before_remote_description_are_buffered(self):
+        mock_peer_connection = AsyncMock()
+        mock_peer_connection.remoteDescription = None
+        mock_peer_connection.signalingState = "have-local-offer"
+        self.mock_connection.peer_connection = mock_peer_connection
+
+        await self.negotiator.handle_candidate({
+            "sdpMid": "0",
+            "sdpMLineIndex": 0,
+            "candidate": "candidate:1 1 udp 2122260223 192.168.0.1 54321 typ host generation 0"
+        })
+        await self.negotiator.handle_candidate({"candidate": ""})
+        mock_peer_connection.addIceCandidate.assert_not_called()
+
+        await self.negotiator.handle_sdp("ANSWER", {"sdp": "v=0", "type": "answer"})
+
+        added = [call.args[0] for call in mock_peer_connection.addIceCandidate.await_args_list]
+        self.assertEqual(len(added), 2)
+        self.assertEqual((added[0].foundation, added[0].ip, added[0].port), ("1", "192.168.0.1", 54321))
+        self.assertIsNone(added[1])
+
+    async def test_trickle_sends_sdp_without_waiting_for_gathering(self):
+        self.negotiator._send_offer_or_answer = AsyncMock()
+        self.negotiator.local_description_set.set()
+
+        await asyncio.wait_for(self.negotiator._try_send_offer_or_answer(), 1)
+        self.negotiator._send_offer_or_answer.assert_awaited_once()
+
+    async def test_full_gather_waits_for_gathering(self):
+        self.mock_connection.options = {"trickleIce": False}
+        negotiator = Negotiator(self.mock_connection)
+        negotiator._send_offer_or_answer = AsyncMock()
+        negotiator.local_description_set.set()
+
+        task = asyncio.create_task(negotiator._try_send_offer_or_answer())
+        await asyncio.sleep(0.01)
+        negotiator._send_offer_or_answer.assert_not_awaited()
+
+        negotiator.ice_gathering_complete.set()
+        await task
+        negotiator._send_offer_or_answer.assert_awaited_once()
+
 if __name__ == '__main__':
     unittest.main()
@@ -156,6 +156,7 @@ class TestPeer(unittest.IsolatedAsyncioTestCase):
         mock_socket_instance.remove_all_listeners = AsyncMock()
         mock_socket_instance.close = AsyncMock()  # Add this line
         self.mock_socket.return_value = mock_socket_instance
+        self.mock_api.return_value.close = AsyncMock()
 
         peer = Peer()
         await peer.destroy()
@@ -164,6 +165,7 @@ class TestPeer(unittest.IsolatedAsyncioTestCase):
         self.assertTrue(peer._disconnected)
         mock_socket_instance.on.assert_any_call(SocketEventType.Close.value, peer._on_close)
         mock_socket_instance.close.assert_awaited_once()  # Add this line
+        self.mock_api.return_value.close.assert_awaited_once()
         # mock_socket_instance.remove_all_listeners.assert_awaited_once()
 
     async def test_disconnect(self):
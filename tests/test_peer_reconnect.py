@@ -0,0 +1,105 @@
+import asyncio
+import json
+import unittest
+
+from aiohttp import web
+
+from peerjs_py.enums import PeerEventType
+from peerjs_py.peer import Peer
+
+
+class SignalingServer:
+    """Minimal PeerServer: confirms clients and forwards messages by ``dst``."""
+
+    def __init__(self):
+        self.clients = {}
+        self.connects = []
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/peerjs", self.handle_socket)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        return self.runner.addresses[0][1]
+
+    async def handle_socket(self, request):
+        id = request.query["id"]
+        self.connects.append((id, request.query["token"]))
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients[id] = ws
+        await ws.send_str(json.dumps({"type": "OPEN"}))
+        async for msg in ws:
+            message = json.loads(msg.data)
+            destination = self.clients.get(message.get("dst"))
+            if message["type"] != "HEARTBEAT" and destination is not None and not destination.closed:
+                await destination.send_str(json.dumps({**message, "src": id}))
+        return ws
+
+    async def drop_clients(self):
+        clients, self.clients = list(self.clients.values()), {}
+        for ws in clients:
+            await ws.close()
+
+
+class TestPeerReconnect(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = SignalingServer()
+        port = await self.server.start()
+        options = {"host": "127.0.0.1", "port": port, "secure": False, "config": None,
+                   "reconnect_delay": 0.01, "reconnect_max_delay": 0.05}
+        self.left = Peer("left", dict(options))
+        self.right = Peer("right", dict(options))
+        self.accepted = []
+        self.right.on(PeerEventType.Connection.value, self.accepted.append)
+        await self.left.start()
+        await self.right.start()
+        await self.wait_for(lambda: self.left.open and self.right.open)
+
+    async def asyncTearDown(self):
+        await self.left.destroy()
+        await self.right.destroy()
+        await self.server.runner.cleanup()
+
+    async def wait_for(self, condition, timeout=10):
+        async def poll():
+            while not condition():
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(poll(), timeout)
+
+    async def connect(self):
+        count = len(self.accepted)
+        connection = await self.left.connect("right", {"serialization": "json"})
+        await asyncio.wait_for(connection.open_future, 10)
+        await self.wait_for(lambda: len(self.accepted) > count)
+        return connection, self.accepted[-1]
+
+    async def roundtrip(self, connection, remote, data):
+        received = asyncio.get_running_loop().create_future()
+        remote.once("data", received.set_result)
+        await connection.send(data)
+        return await asyncio.wait_for(received, 5)
+
+    async def test_data_connections_survive_signaling_reconnect(self):
+        connection, remote = await self.connect()
+
+        await self.server.drop_clients()
+        await self.wait_for(lambda: all(peer.signaling_stats["reconnects"] and peer.open
+                                        for peer in (self.left, self.right)))
+
+        self.assertEqual(self.left.signaling_stats["reconnects"], 1)
+        self.assertIsNotNone(self.left.signaling_stats["last_reconnect_latency"])
+        left_connects = [token for id, token in self.server.connects if id == "left"]
+        self.assertEqual(len(left_connects), 2)
+        self.assertEqual(left_connects[0], left_connects[1])
+        self.assertEqual(self.left.id(), "left")
+        self.assertTrue(connection.open)
+        self.assertEqual(await self.roundtrip(connection, remote, {"after": "reconnect"}), {"after": "reconnect"})
+
+        second, second_remote = await self.connect()
+        self.assertEqual(await self.roundtrip(second, second_remote, "new"), "new")
+
+
+if __name__ == '__main__':
+    unittest.main()
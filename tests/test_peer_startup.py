@@ -0,0 +1,125 @@
+import asyncio
+import json
+import unittest
+
+from aiohttp import web
+
+from peerjs_py.peer_startup import IdPool, local_id, start_peers
+from peerjs_py.utils.validateId import validateId
+
+
+class FakePeerServer:
+    """Hands out IDs and confirms WebSocket connections like a PeerServer."""
+
+    def __init__(self, delay=0.0, taken=()):
+        self.delay = delay
+        self.taken = set(taken)
+        self.issued = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.sockets = []
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/peerjs/id", self.handle_id)
+        app.router.add_get("/peerjs", self.handle_socket)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        return {"host": "127.0.0.1", "port": self.runner.addresses[0][1], "secure": False}
+
+    async def stop(self):
+        for ws in self.sockets:
+            await ws.close()
+        await self.runner.cleanup()
+
+    async def _slow(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+    async def handle_id(self, request):
+        await self._slow()
+        self.issued += 1
+        return web.Response(text=f"server{self.issued}")
+
+    async def handle_socket(self, request):
+        await self._slow()
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        id = request.query["id"]
+        type_ = "ID-TAKEN" if id in self.taken else "OPEN"
+        await ws.send_str(json.dumps({"type": type_}))
+        async for _ in ws:
+            pass
+        return ws
+
+
+class TestIdPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakePeerServer(delay=0.02)
+        self.options = await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    def test_local_id_is_valid(self):
+        ids = {local_id() for _ in range(100)}
+        self.assertEqual(len(ids), 100)
+        self.assertTrue(all(validateId(id) for id in ids))
+
+    async def test_local_pool_never_runs_dry(self):
+        pool = IdPool(local=True)
+        await pool.reserve(3)
+        self.assertEqual(len(pool), 3)
+        ids = {pool.take() for _ in range(5)}
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(self.server.issued, 0)
+
+    async def test_reserve_from_server_concurrently(self):
+        pool = IdPool(self.options, concurrency=4)
+        await pool.reserve(12)
+        await pool.close()
+        self.assertEqual(len(pool), 12)
+        self.assertEqual(self.server.max_in_flight, 4)
+        self.assertEqual(sorted(pool.take() for _ in range(12)),
+                         sorted(f"server{i}" for i in range(1, 13)))
+        with self.assertRaises(LookupError):
+            pool.take()
+
+
+class TestStartPeers(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakePeerServer(delay=0.01)
+        self.options = await self.server.start()
+        self.peers = []
+
+    async def asyncTearDown(self):
+        for peer in self.peers:
+            await peer.destroy()
+        await self.server.stop()
+
+    async def test_starts_all_peers_with_bounded_concurrency(self):
+        self.peers = await start_peers(10, self.options, concurrency=3)
+        self.assertEqual(len(self.peers), 10)
+        self.assertTrue(all(peer.open for peer in self.peers))
+        self.assertEqual(len({peer.id() for peer in self.peers}), 10)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+
+    async def test_local_ids_skip_the_id_endpoint(self):
+        self.peers = await start_peers(5, self.options, local_ids=True)
+        self.assertTrue(all(peer.open for peer in self.peers))
+        self.assertEqual(self.server.issued, 0)
+
+    async def test_failed_peer_is_returned_closed(self):
+        self.server.taken.add("server2")
+        self.peers = await start_peers(3, self.options, open_timeout=2)
+        self.assertEqual(sorted(peer.open for peer in self.peers), [False, True, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+
+from peerjs_py.pending_messages import PendingMessageStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPendingMessageStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make_store(self, **kwargs):
+        kwargs.setdefault("sizer", lambda message: 10)
+        return PendingMessageStore(clock=self.clock, **kwargs)
+
+    def test_store_and_claim(self):
+        store = self.make_store()
+        store.store("dc_1", {"type": "CANDIDATE", "n": 1})
+        store.store("dc_1", {"type": "CANDIDATE", "n": 2})
+        store.store("dc_2", {"type": "CANDIDATE", "n": 3})
+
+        self.assertEqual([m["n"] for m in store.claim("dc_1")], [1, 2])
+        self.assertEqual(store.claim("dc_1"), [])
+        self.assertIn("dc_2", store)
+        self.assertEqual(store.buffered_bytes, 10)
+        self.assertEqual(store.stats["claimed"], 2)
+        self.assertEqual(store.stats["stored"], 3)
+
+    def test_per_connection_cap(self):
+        store = self.make_store(max_per_connection=2)
+        self.assertTrue(store.store("dc_1", 1))
+        self.assertTrue(store.store("dc_1", 2))
+        self.assertFalse(store.store("dc_1", 3))
+        self.assertTrue(store.store("dc_2", 4))
+
+        self.assertEqual(store.claim("dc_1"), [1, 2])
+        self.assertEqual(store.stats["dropped"], 1)
+
+    def test_byte_budget_evicts_oldest_connection(self):
+        store = self.make_store(max_bytes=30)
+        store.store("old", 1)
+        store.store("old", 2)
+        store.store("new", 3)
+        store.store("newer", 4)
+
+        self.assertNotIn("old", store)
+        self.assertEqual(store.claim("new"), [3])
+        self.assertEqual(store.claim("newer"), [4])
+        self.assertEqual(store.stats["dropped"], 2)
+        self.assertEqual(store.buffered_bytes, 0)
+
+    def test_oversized_message_is_dropped(self):
+        store = self.make_store(max_bytes=30, sizer=len)
+        self.assertFalse(store.store("dc_1", "x" * 31))
+        self.assertEqual(len(store), 0)
+
+    def test_entries_expire_after_ttl(self):
+        store = self.make_store(ttl=5)
+        store.store("dc_1", 1)
+        self.clock.now = 3
+        store.store("dc_2", 2)
+        store.store("dc_1", 3)
+
+        self.clock.now = 5
+        store.expire()
+        self.assertNotIn("dc_1", store)
+        self.assertIn("dc_2", store)
+        self.assertEqual(store.stats["expired"], 2)
+
+        self.clock.now = 8
+        store.store("dc_3", 4)
+        self.assertNotIn("dc_2", store)
+        self.assertEqual(store.stats["expired"], 3)
+
+    def test_discard(self):
+        store = self.make_store()
+        store.store("dc_1", 1)
+        store.discard("dc_1")
+        store.discard("unknown")
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.stats["dropped"], 1)
+
+
+class TestPendingMessageTimer(unittest.IsolatedAsyncioTestCase):
+    async def test_single_timer_expires_idle_entries(self):
+        store = PendingMessageStore(ttl=0.02)
+        for index in range(100):
+            store.store(f"dc_{index}", {"type": "CANDIDATE"})
+        timer = store._timer
+        self.assertIsNotNone(timer)
+
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.stats["expired"], 100)
+        self.assertIsNone(store._timer)
+
+    async def test_claiming_last_entry_cancels_timer(self):
+        store = PendingMessageStore(ttl=10)
+        store.store("dc_1", {"type": "CANDIDATE"})
+        store.claim("dc_1")
+        self.assertIsNone(store._timer)
+
+
+if __name__ == '__main__':
+    unittest.main()
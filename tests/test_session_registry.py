@@ -0,0 +1,165 @@
+import asyncio
+import datetime
+import json
+import os
+import ssl
+import tempfile
+import unittest
+
+import aiohttp
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from peerjs_py.enums import PeerEventType
+from peerjs_py.peer import Peer
+from peerjs_py.session_registry import ResumingSSLContext, SessionRegistry, sessions
+
+
+def self_signed_certificate(directory):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+            .sign(key, hashes.SHA256()))
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+class TestSessionRegistry(unittest.IsolatedAsyncioTestCase):
+    async def test_refcounted_per_server(self):
+        registry = SessionRegistry()
+        first = registry.acquire(True, "example.com", 443)
+        second = registry.acquire(True, "example.com", 443)
+        other = registry.acquire(True, "example.com", 9000)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertIsInstance(first.connector._ssl, ResumingSSLContext)
+        self.assertEqual(registry.stats["sessions"], 2)
+        self.assertEqual(registry.stats["references"], 3)
+
+        await registry.release(first)
+        self.assertFalse(first.closed)
+        await registry.release(second)
+        self.assertTrue(first.closed)
+        await registry.release(other)
+        self.assertEqual(registry.stats["sessions"], 0)
+        self.assertEqual((registry.stats["created"], registry.stats["reused"]), (2, 1))
+
+        self.assertIsNot(registry.acquire(True, "example.com", 443), first)
+        await registry.close_all()
+
+
+class TestTLSResumption(unittest.IsolatedAsyncioTestCase):
+    async def test_later_connections_resume_the_session(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cert_path, key_path = self_signed_certificate(directory)
+            server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            server_context.load_cert_chain(cert_path, key_path)
+            connections = []
+
+            class RecordingContext(ResumingSSLContext):
+                def wrap_bio(self, *args, **kwargs):
+                    connections.append(super().wrap_bio(*args, **kwargs))
+                    return connections[-1]
+
+            context = RecordingContext()
+            context.load_verify_locations(cert_path)
+
+        async def handle(request):
+            return web.Response(text="ok")
+
+        app = web.Application()
+        app.router.add_get("/", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        self.addAsyncCleanup(runner.cleanup)
+        await web.TCPSite(runner, "127.0.0.1", 0, ssl_context=server_context).start()
+        url = f"https://localhost:{runner.addresses[0][1]}/"
+
+        for _ in range(3):
+            connector = aiohttp.TCPConnector(ssl=context, force_close=True)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                async with session.get(url) as response:
+                    self.assertEqual(await response.text(), "ok")
+
+        self.assertEqual([connection.session_reused for connection in connections], [False, True, True])
+        self.assertEqual(context.resumed_offers, 2)
+
+
+class TestPeerSessions(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sockets = []
+        app = web.Application()
+        app.router.add_get("/peerjs/id", self.handle_id)
+        app.router.add_get("/peerjs", self.handle_socket)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        self.options = {"host": "127.0.0.1", "port": self.runner.addresses[0][1], "secure": False,
+                        "reconnect_delay": 0.01}
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    async def handle_id(self, request):
+        return web.Response(text="generated")
+
+    async def handle_socket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        await ws.send_str(json.dumps({"type": "OPEN"}))
+        async for _ in ws:
+            pass
+        return ws
+
+    async def start(self, id=None):
+        peer = Peer(id, dict(self.options))
+        opened = asyncio.get_running_loop().create_future()
+        peer.once(PeerEventType.Open.value, opened.set_result)
+        await peer.start()
+        await asyncio.wait_for(opened, 5)
+        return peer
+
+    async def test_peers_api_and_reconnects_share_the_server_session(self):
+        created = sessions.stats["created"]
+        first = await self.start()
+        second = await self.start("second")
+        session = first._socket._session
+
+        self.assertEqual(first.id(), "generated")
+        self.assertIs(first._api._session, session)
+        self.assertIs(second._socket._session, session)
+        self.assertEqual(sessions.stats["created"], created + 1)
+
+        for ws in list(self.sockets):
+            await ws.close()
+        for _ in range(500):
+            if first.signaling_stats["reconnects"] and second.signaling_stats["reconnects"]:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(second.signaling_stats["reconnects"], 1)
+        self.assertIs(second._socket._session, session)
+        self.assertEqual(sessions.stats["created"], created + 1)
+
+        await first.destroy()
+        self.assertFalse(session.closed)
+        await second.destroy()
+        self.assertTrue(session.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import asyncio
 from unittest import IsolatedAsyncioTestCase
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
+from aiohttp import web
 from peerjs_py.socket import Socket
 from peerjs_py.enums import ServerMessageType, SocketEventType
 from peerjs_py.logger import logger, LogLevel
@@ -19,7 +20,7 @@ class TestSocket(IsolatedAsyncioTestCase):
         self.assertEqual(self.socket._messages_queue, [])
         self.assertIsNone(self.socket._session)
         self.assertIsNone(self.socket._ws)
-        self.assertIsNone(self.socket._ws_ping_task)
+        self.assertEqual(self.socket.pong_timeout, self.socket.ping_interval)
         self.assertEqual(self.socket._base_url, "ws://localhost:9000/peerjs?key=test_key")
 
     async def test_socket_start(self):
@@ -35,7 +36,8 @@ class TestSocket(IsolatedAsyncioTestCase):
             self.assertIsNotNone(self.socket._ws)
             
             mock_ws_connect.assert_called_once_with(
-                f"{self.socket._base_url}&id=test_id&token=test_token&version=0.1.0"
+                f"{self.socket._base_url}&id=test_id&token=test_token&version=0.1.0",
+                autoping=False,
             )
 
     async def test_socket_send_queued_messages(self):
@@ -69,4 +71,185 @@ class TestSocket(IsolatedAsyncioTestCase):
             await self.socket.close()
             
             self.assertTrue(self.socket._disconnected)
-            mock_cleanup.assert_called_once()
\ No newline at end of file
+            mock_cleanup.assert_called_once()
+
+    def _open_socket(self):
+        self.socket._id = "test_id"
+        self.socket._ws = AsyncMock()
+        self.socket._ws.closed = False
+        self.socket._disconnected = False
+        return self.socket._ws
+
+    async def test_socket_send_writes_burst_in_order(self):
+        ws = self._open_socket()
+        messages = [{"type": "CANDIDATE", "dst": f"peer{i % 3}", "payload": i} for i in range(50)]
+        for message in messages:
+            await self.socket.send(message)
+        ws.send_str.assert_not_called()
+
+        await self.socket.flush()
+        self.assertEqual([c.args[0] for c in ws.send_str.call_args_list],
+                         [json.dumps(message) for message in messages])
+        self.assertEqual(self.socket.writer_passes, 1)
+        self.assertEqual(self.socket.messages_written, 50)
+
+    async def test_socket_send_waits_when_queue_is_full(self):
+        ws = self._open_socket()
+        self.socket.MAX_QUEUED_FRAMES = 4
+        for i in range(3):
+            await self.socket.send({"type": "CANDIDATE", "payload": i})
+        ws.send_str.assert_not_called()
+        await self.socket.send({"type": "CANDIDATE", "payload": 3})
+        self.assertEqual(ws.send_str.call_count, 4)
+
+    async def test_socket_heartbeat_uses_queue(self):
+        ws = self._open_socket()
+        await self.socket.send({"type": "OFFER", "dst": "other"})
+        self.socket._send_heartbeat()
+        await self.socket.flush()
+        self.assertEqual([c.args[0] for c in ws.send_str.call_args_list],
+                         [json.dumps({"type": "OFFER", "dst": "other"}), json.dumps({"type": "HEARTBEAT"})])
+        ws.ping.assert_awaited_once()
+
+    async def test_socket_cleanup_writes_queued_messages(self):
+        ws = self._open_socket()
+        await self.socket.send({"type": "LEAVE", "dst": "other"})
+        await self.socket._cleanup()
+        ws.send_str.assert_called_once_with(json.dumps({"type": "LEAVE", "dst": "other"}))
+        ws.close.assert_awaited_once()
+        self.assertIsNone(self.socket._writer_task)
+
+    async def test_socket_burst_is_one_writer_pass(self):
+        received = []
+        all_received = asyncio.get_running_loop().create_future()
+
+        async def handle_socket(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            async for msg in ws:
+                received.append(json.loads(msg.data))
+                if len(received) == 20:
+                    all_received.set_result(None)
+            return ws
+
+        app = web.Application()
+        app.router.add_get("/peerjs", handle_socket)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        self.addAsyncCleanup(runner.cleanup)
+
+        socket = Socket(secure=False, host="127.0.0.1", port=runner.addresses[0][1], path="/", key="test_key")
+        await socket.start("test_id", "test_token")
+        self.addAsyncCleanup(socket.close)
+
+        messages = [{"type": "CANDIDATE", "dst": "other", "payload": i} for i in range(20)]
+        for message in messages:
+            await socket.send(message)
+        await asyncio.wait_for(all_received, 5)
+
+        self.assertEqual(received, messages)
+        self.assertEqual(socket.writer_passes, 1)
+        self.assertEqual(socket.messages_written, 20)
+
+
+class FlakyServer:
+    """WebSocket server that can drop its clients and refuse new ones."""
+
+    def __init__(self):
+        self.accepting = True
+        self.connects = []
+        self.received = []
+        self.sockets = []
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/peerjs", self.handle_socket)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        return self.runner.addresses[0][1]
+
+    async def handle_socket(self, request):
+        if not self.accepting:
+            return web.Response(status=503)
+        self.connects.append((request.query["id"], request.query["token"]))
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        async for msg in ws:
+            self.received.append(json.loads(msg.data))
+        return ws
+
+    async def drop_clients(self):
+        for ws in self.sockets:
+            await ws.close()
+        self.sockets.clear()
+
+
+class TestSocketReconnect(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        logger.set_log_level(LogLevel.Disabled)
+        self.server = FlakyServer()
+        port = await self.server.start()
+        self.addAsyncCleanup(self.server.runner.cleanup)
+        self.socket = Socket(secure=False, host="127.0.0.1", port=port, path="/", key="test_key",
+                             reconnect=True, reconnect_delay=0.01, reconnect_max_delay=0.05)
+        self.addAsyncCleanup(self.socket.close)
+        self.events = []
+        for event in (SocketEventType.Reconnecting, SocketEventType.Reconnected, SocketEventType.Disconnected):
+            self.socket.on(event.value, lambda *args, event=event: self.events.append(event))
+        await self.socket.start("test_id", "test_token")
+
+    async def wait_for(self, condition, timeout=5):
+        async def poll():
+            while not condition():
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(poll(), timeout)
+
+    async def test_reconnects_with_same_id_and_token(self):
+        await self.server.drop_clients()
+        await self.wait_for(lambda: SocketEventType.Reconnected in self.events)
+
+        self.assertEqual(self.server.connects, [("test_id", "test_token")] * 2)
+        self.assertEqual(self.events, [SocketEventType.Reconnecting, SocketEventType.Reconnected])
+        stats = self.socket.stats
+        self.assertEqual(stats["reconnects"], 1)
+        self.assertGreater(stats["last_reconnect_latency"], 0)
+        self.assertFalse(self.socket.reconnecting)
+
+    async def test_messages_sent_while_reconnecting_are_replayed_in_order(self):
+        self.server.accepting = False
+        await self.server.drop_clients()
+        await self.wait_for(lambda: self.socket.reconnecting)
+
+        messages = [{"type": "CANDIDATE", "dst": "other", "payload": i} for i in range(5)]
+        for message in messages:
+            await self.socket.send(message)
+        await self.wait_for(lambda: self.socket.stats["reconnect_attempts"] >= 2)
+        self.server.accepting = True
+        await self.wait_for(lambda: len(self.server.received) == 5)
+
+        self.assertEqual(self.server.received, messages)
+        self.assertEqual(self.socket.stats["reconnects"], 1)
+
+    async def test_gives_up_after_max_attempts(self):
+        self.socket.max_reconnect_attempts = 2
+        self.server.accepting = False
+        await self.server.drop_clients()
+        await self.wait_for(lambda: SocketEventType.Disconnected in self.events and self.socket._session is None)
+
+        self.assertEqual(self.events, [SocketEventType.Reconnecting, SocketEventType.Disconnected])
+        self.assertEqual(self.socket.stats["reconnect_attempts"], 2)
+        self.assertFalse(self.socket.reconnecting)
+
+    async def test_close_stops_reconnecting(self):
+        self.server.accepting = False
+        await self.server.drop_clients()
+        await self.wait_for(lambda: self.socket.reconnecting)
+        task = self.socket._reconnect_task
+
+        await self.socket.close()
+        await asyncio.sleep(0)
+        self.assertTrue(task.cancelled())
+        self.assertFalse(self.socket.reconnecting)